@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add the project root directory to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from config.project_config import ConfigManager
+from services.data_service.src.breeze_connector import BreezeConnector
+from services.data_service.src.bar_cache import BarCache
+from services.data_service.src.data_fetcher import DataFetcher
+from services.data_service.src.scheduler import MarketCalendar, RefreshScheduler
+from services.data_service.src.storage import DataStorage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    try:
+        # Initialize components
+        config = ConfigManager()
+        connector = BreezeConnector.from_config(config)
+        fetcher = DataFetcher(BarCache.from_config(connector, config), rate_limiter=connector.rate_limiter)
+        storage = DataStorage.from_config(os.getenv('MONGODB_URI', 'mongodb://localhost:27017'), config)
+
+        scheduler = RefreshScheduler(
+            fetcher,
+            storage,
+            config.get('data_service.stocks_to_fetch', []),
+            interval=config.get('scheduler.interval', '1minute'),
+            calendar=MarketCalendar.from_config(config),
+            jitter_seconds=config.get('scheduler.jitter_seconds', 2),
+            warmup_days=config.get('scheduler.warmup_days', 5),
+        )
+
+        logger.info("Starting refresh scheduler...")
+        asyncio.run(scheduler.run())
+
+    except KeyboardInterrupt:
+        logger.info("Scheduler stopped")
+    except Exception as e:
+        logger.error(f"Error in main: {e}")
+    finally:
+        if 'scheduler' in locals():
+            logger.info(f"Wake-to-ready latency: {scheduler.latency_stats()}")
+        if 'connector' in locals():
+            connector.disconnect()
+
+if __name__ == "__main__":
+    main()
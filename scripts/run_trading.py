@@ -8,9 +8,11 @@ from typing import List, Dict, Optional
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+from config.project_config import ConfigManager
 from services.data_service.src.breeze_connector import BreezeConnector
+from services.data_service.src.bar_cache import BarCache
 from services.data_service.src.data_fetcher import DataFetcher
-from services.data_service.src.data_processor import DataProcessor
+from services.strategy_service.src.signal_engine import MovingAverageCrossSignal, RsiSignal, SignalEngine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,8 +20,10 @@ logger = logging.getLogger(__name__)
 def main():
     try:
         # Initialize components
-        connector = BreezeConnector()
-        fetcher = DataFetcher(connector)
+        config = ConfigManager()
+        connector = BreezeConnector.from_config(config)
+        bar_cache = BarCache.from_config(connector, config)
+        fetcher = DataFetcher(bar_cache, rate_limiter=connector.rate_limiter)
         
         # List of stocks to analyze
         stocks = ["RELIANCE", "TCS", "INFY", "HDFCBANK", "ICICIBANK"]
@@ -28,26 +32,24 @@ def main():
         logger.info("Fetching stock data...")
         stock_data = fetcher.fetch_multiple_stocks(stocks)
         
-        # Process data
-        logger.info("Processing stock data...")
-        processed_data = DataProcessor.process_stock_data(stock_data)
-        
-        # Analyze each stock
-        for stock, df in processed_data.items():
+        # Strategies keep rolling state, so history is loaded once and only
+        # the latest bar is evaluated
+        engine = SignalEngine.from_config(config)
+        engine.register(MovingAverageCrossSignal(50, 200), stocks)
+        engine.register(RsiSignal(14), stocks)
+
+        logger.info("Evaluating signals...")
+        last_bars = {}
+        for stock, df in stock_data.items():
             if df is not None and not df.empty:
-                logger.info(f"\nAnalyzing {stock}:")
-                
-                # Get last closing price
-                last_close = df['close'].iloc[-1]
-                logger.info(f"Last Close: {last_close:.2f}")
-                
-                # Get trading signals
-                signals = DataProcessor.get_last_signals(df)
-                logger.info("Trading Signals:")
-                for indicator, signal in signals.items():
-                    logger.info(f"  {indicator}: {signal}")
+                engine.warm_up(stock, df.iloc[:-1])
+                last_bars[stock] = df.iloc[-1].to_dict()
+                logger.info(f"{stock} last close: {last_bars[stock]['close']:.2f}")
             else:
                 logger.warning(f"No data available for {stock}")
+
+        signals = engine.process(last_bars).to_frame()
+        logger.info(f"Trading Signals:\n{signals.to_string(index=False)}")
         
     except Exception as e:
         logger.error(f"Error in main: {e}")
@@ -0,0 +1,65 @@
+"""
+Compare the per-symbol preprocessing loop with the vectorized panel mode
+and the multi-process shared-memory mode.
+
+Run from services/data_service:
+    python -m benchmarks.bench_preprocessor --bars 1000 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.parallel_preprocessor import ParallelPreprocessor
+from src.preprocessor import DataPreprocessor
+
+
+def make_universe(symbols: int, bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01 09:15', periods=bars, freq='min')
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (bars, symbols)), axis=0))
+    return {
+        f'SYM{i}': pd.DataFrame({'datetime': index, 'close': closes[:, i]})
+        for i in range(symbols)
+    }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bars', type=int, default=1000)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[50, 500, 2000])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=64)
+    args = parser.parse_args()
+    parallel_engine = ParallelPreprocessor(workers=args.workers, chunk_size=args.chunk_size)
+
+    print(
+        f"{'symbols':>8} {'loop (s)':>10} {'panel (s)':>10} {'speedup':>8} "
+        f"{'procs (s)':>10} {'speedup':>8}"
+    )
+    for count in args.symbols:
+        universe = make_universe(count, args.bars)
+        loop = timed(
+            DataPreprocessor.preprocess_stock_data,
+            {symbol: df.copy() for symbol, df in universe.items()}
+        )
+        panel = timed(DataPreprocessor.preprocess_panel, universe)
+        parallel = timed(
+            parallel_engine.preprocess_stock_data,
+            {symbol: df.copy() for symbol, df in universe.items()}
+        )
+        print(
+            f"{count:>8} {loop:>10.3f} {panel:>10.3f} {loop / panel:>7.1f}x "
+            f"{parallel:>10.3f} {loop / parallel:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
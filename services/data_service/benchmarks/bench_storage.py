@@ -0,0 +1,135 @@
+"""
+Compare the old insert_many(to_dict('records')) write path with the
+column-wise bulk upsert path of DataStorage.
+
+Without --uri the writes go to an in-process stand-in, which isolates the
+document-building cost. With --uri they go to a real mongod.
+
+Run from services/data_service:
+    python -m benchmarks.bench_storage --rows 100000
+    python -m benchmarks.bench_storage --uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from src.storage import DataStorage
+
+
+class InProcessCollection:
+    """Keeps upserted documents in a dict keyed by the filter."""
+
+    def __init__(self):
+        self.docs = {}
+        self.rows = []
+
+    async def create_index(self, keys, unique=False, partialFilterExpression=None):
+        pass
+
+    # A fresh stand-in holds no legacy documents, so the migration finds nothing to do
+    async def count_documents(self, query):
+        return 0
+
+    async def update_many(self, query, pipeline):
+        pass
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        return self._no_documents()
+
+    async def _no_documents(self):
+        return
+        yield
+
+    async def delete_many(self, query):
+        pass
+
+    async def bulk_write(self, operations, ordered=True):
+        upserted = modified = 0
+        for op in operations:
+            key = (op._filter['symbol'], op._filter['interval'], op._filter['timestamp'])
+            if key in self.docs:
+                modified += 1
+            else:
+                upserted += 1
+            self.docs[key] = op._doc['$set']
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+    async def insert_many(self, docs, ordered=True):
+        self.rows.extend(docs)
+
+
+class InProcessDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, InProcessCollection())
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({
+        'datetime': pd.date_range('2024-01-01 09:15', periods=rows, freq='min').strftime('%Y-%m-%d %H:%M:%S'),
+        'open': close, 'high': close, 'low': close, 'close': close,
+        'volume': rng.integers(1, 1000, rows),
+        'return': rng.normal(0, 0.01, rows),
+        'ma_50': close, 'ma_200': close,
+        'rsi': rng.uniform(0, 100, rows),
+        'volatility': rng.uniform(0, 1, rows),
+    })
+
+
+async def legacy_write(db, processed_data):
+    for symbol, df in processed_data.items():
+        await db[f'processed_{symbol}'].insert_many(df.to_dict('records'))
+
+
+async def run(args):
+    processed_data = {'INFY': make_frame(args.rows)}
+    storage = DataStorage(args.uri or 'mongodb://localhost:27017', batch_size=args.batch_size)
+    if args.uri:
+        storage.db = storage.client['bench_storage']
+        legacy_db = storage.client['bench_storage_legacy']
+        await storage.client.drop_database('bench_storage')
+    else:
+        storage.db = InProcessDatabase()
+        legacy_db = InProcessDatabase()
+
+    started = time.perf_counter()
+    await legacy_write(legacy_db, processed_data)
+    legacy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    DataStorage.build_documents(processed_data['INFY'], 'INFY', '1minute')
+    build = time.perf_counter() - started
+
+    first = (await storage.store_processed_data(processed_data))['seconds']
+    rerun = await storage.store_processed_data(processed_data)
+
+    print(f"rows={args.rows} batch_size={args.batch_size} backend={'mongod' if args.uri else 'in-process'}")
+    print(f"  legacy insert_many(to_dict)  {legacy:8.3f}s (duplicates rows on re-run)")
+    print(f"  build_documents only         {build:8.3f}s")
+    print(f"  bulk upsert, first run       {first:8.3f}s")
+    print(f"  bulk upsert, re-run          {rerun['seconds']:8.3f}s "
+          f"({rerun['upserted']} new, {rerun['modified']} modified)")
+
+    if args.uri:
+        await storage.client.drop_database('bench_storage')
+        await storage.client.drop_database('bench_storage_legacy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--uri', default=None, help='MongoDB URI; omit to use the in-process stand-in')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,3 @@
-# services/data_service/__init__.py
-from .src.breeze_connector import BreezeConnector
-from .src.data_fetcher import DataFetcher
-
 # services/data_service/src/__init__.py
 from .breeze_connector import BreezeConnector
 from .data_fetcher import DataFetcher
\ No newline at end of file
@@ -0,0 +1,254 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bar handler: (symbol, interval, bar)
+BarHandler = Callable[[str, str, Dict[str, Any]], None]
+
+BAR_COLUMNS = ['datetime', 'stock_code', 'exchange_code', 'open', 'high', 'low', 'close', 'volume']
+
+
+class _BarState:
+    """Open and grace-pending bar of one (symbol, interval)."""
+
+    __slots__ = (
+        'start', 'open', 'high', 'low', 'close', 'volume', 'close_ts',
+        'pending', 'history',
+    )
+
+    def __init__(self, history: int):
+        self.start: Optional[int] = None
+        self.open = self.high = self.low = self.close = 0.0
+        self.volume = 0.0
+        # Exchange timestamp of the tick that set `close`
+        self.close_ts = 0
+        # Closed bar still accepting late ticks:
+        # [start, open, high, low, close, volume, close_ts]
+        self.pending: Optional[List[float]] = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history)
+
+
+class BarAggregator:
+    """
+    Incremental tick-to-bar aggregation at several intervals at once.
+
+    Each tick updates every interval's open bar in constant time. A bar is
+    closed once its boundary has passed plus the grace window, so with
+    grace 0 the close event fires exactly at the boundary. Ticks arriving
+    within the grace window still update the bar they belong to; later ones
+    are dropped and counted.
+
+    Bars carry the same columns as historical candles, so they can go
+    through DataPreprocessor.preprocess_stock_data unchanged.
+
+    `on_tick` (feed thread) and `advance` (timer thread) share one lock, so
+    a bar is closed and emitted exactly once. Closed bars queue in emission
+    order and one thread at a time delivers them to `on_bar` outside the
+    lock, so each symbol and interval's bars arrive in time order whichever
+    thread closed them.
+    """
+
+    INTERVAL_SECONDS = {
+        '1second': 1,
+        '1minute': 60,
+        '5minute': 300,
+        '15minute': 900,
+        '30minute': 1800,
+    }
+
+    def __init__(
+        self,
+        intervals: Iterable[str] = ('1minute',),
+        grace_seconds: float = 0.0,
+        on_bar: Optional[BarHandler] = None,
+        history: int = 1000,
+        exchange_code: str = 'NSE'
+    ):
+        """
+        Initialize the aggregator
+
+        Args:
+            intervals (Iterable[str]): Bar intervals to build, keys of INTERVAL_SECONDS
+            grace_seconds (float): How long after a boundary late ticks are accepted.
+                Capped at the bar width of each interval.
+            on_bar (Optional[BarHandler]): Called with every closed bar
+            history (int): Closed bars kept per symbol and interval for `to_frame`
+            exchange_code (str): Exchange written into each bar
+        """
+        unknown = [interval for interval in intervals if interval not in self.INTERVAL_SECONDS]
+        if unknown:
+            raise ValueError(
+                f"Invalid interval. Must be one of: {', '.join(self.INTERVAL_SECONDS)}"
+            )
+
+        self.intervals = list(intervals)
+        self.widths = {interval: self.INTERVAL_SECONDS[interval] * 10**9 for interval in self.intervals}
+        self.graces = {
+            interval: min(int(grace_seconds * 10**9), width)
+            for interval, width in self.widths.items()
+        }
+        self.on_bar = on_bar
+        self.history = history
+        self.exchange_code = exchange_code
+        self.states: Dict[str, Dict[str, _BarState]] = {}
+        self.late_dropped = 0
+        self.bars_emitted = 0
+        self._lock = threading.Lock()
+        # Closed bars awaiting `on_bar`, and whether a thread is delivering them
+        self._outbox: Deque[Tuple[str, str, Dict[str, Any]]] = deque()
+        self._delivering = False
+
+    def _states_for(self, symbol: str) -> Dict[str, _BarState]:
+        states = self.states.get(symbol)
+        if states is None:
+            states = {interval: _BarState(self.history) for interval in self.intervals}
+            self.states[symbol] = states
+        return states
+
+    def _emit(self, symbol: str, interval: str, bar: List[float]) -> None:
+        start, o, h, l, c, v = bar[:6]
+        record = {
+            'datetime': datetime.fromtimestamp(start / 1e9).strftime('%Y-%m-%d %H:%M:%S'),
+            'stock_code': symbol,
+            'exchange_code': self.exchange_code,
+            'open': o,
+            'high': h,
+            'low': l,
+            'close': c,
+            'volume': v,
+        }
+        self.states[symbol][interval].history.append(record)
+        self.bars_emitted += 1
+        if self.on_bar is not None:
+            self._outbox.append((symbol, interval, record))
+
+    def _dispatch(self) -> None:
+        """
+        Deliver queued bars in emission order unless another thread already is
+
+        A handler that raises stops delivery for this call; the bars behind
+        it stay queued for the next one.
+        """
+        with self._lock:
+            if self._delivering or not self._outbox:
+                return
+            self._delivering = True
+        while True:
+            with self._lock:
+                if not self._outbox:
+                    self._delivering = False
+                    return
+                symbol, interval, bar = self._outbox.popleft()
+            try:
+                self.on_bar(symbol, interval, bar)
+            except Exception:
+                with self._lock:
+                    self._delivering = False
+                raise
+
+    def _close_open_bar(self, symbol: str, interval: str, state: _BarState) -> None:
+        if state.pending is not None:
+            self._emit(symbol, interval, state.pending)
+            state.pending = None
+
+        bar = [state.start, state.open, state.high, state.low, state.close, state.volume, state.close_ts]
+        state.start = None
+        if self.graces[interval]:
+            state.pending = bar
+        else:
+            self._emit(symbol, interval, bar)
+
+    def on_tick(self, symbol: str, exchange_ts: int, price: float, volume: float) -> None:
+        """
+        Add a tick; signature matches TickStream listeners
+
+        Ticks may arrive out of order: high, low and volume take every tick
+        of the bar, the close only a tick newer than the one that set it.
+
+        Args:
+            symbol (str): Stock code
+            exchange_ts (int): Exchange timestamp in epoch nanoseconds
+            price (float): Traded price
+            volume (float): Traded quantity
+        """
+        with self._lock:
+            states = self._states_for(symbol)
+            for interval, state in states.items():
+                width = self.widths[interval]
+                start = exchange_ts - exchange_ts % width
+
+                if state.start is not None and start > state.start:
+                    self._close_open_bar(symbol, interval, state)
+
+                pending = state.pending
+                if pending is not None and exchange_ts >= pending[0] + width + self.graces[interval]:
+                    self._emit(symbol, interval, pending)
+                    state.pending = pending = None
+
+                if state.start is None and (pending is None or start > pending[0]):
+                    state.start = start
+                    state.open = state.high = state.low = state.close = price
+                    state.volume = volume
+                    state.close_ts = exchange_ts
+                elif start == state.start:
+                    if price > state.high:
+                        state.high = price
+                    elif price < state.low:
+                        state.low = price
+                    if exchange_ts >= state.close_ts:
+                        state.close = price
+                        state.close_ts = exchange_ts
+                    state.volume += volume
+                elif pending is not None and start == pending[0]:
+                    if price > pending[2]:
+                        pending[2] = price
+                    elif price < pending[3]:
+                        pending[3] = price
+                    if exchange_ts >= pending[6]:
+                        pending[4] = price
+                        pending[6] = exchange_ts
+                    pending[5] += volume
+                else:
+                    self.late_dropped += 1
+        self._dispatch()
+
+    def advance(self, now_ns: int) -> None:
+        """
+        Close bars whose boundary (plus grace) has passed without a new tick
+
+        Call this from a timer so quiet symbols still emit bars on time; it
+        is safe to run concurrently with `on_tick`.
+
+        Args:
+            now_ns (int): Current time in epoch nanoseconds
+        """
+        with self._lock:
+            for symbol, states in self.states.items():
+                for interval, state in states.items():
+                    width = self.widths[interval]
+                    grace = self.graces[interval]
+                    if state.start is not None and now_ns >= state.start + width:
+                        self._close_open_bar(symbol, interval, state)
+                    if state.pending is not None and now_ns >= state.pending[0] + width + grace:
+                        self._emit(symbol, interval, state.pending)
+                        state.pending = None
+        self._dispatch()
+
+    def to_frame(self, symbol: str, interval: str) -> pd.DataFrame:
+        """
+        Closed bars of one symbol and interval, oldest first
+
+        Returns:
+            pd.DataFrame: Bars with the historical candle columns
+        """
+        with self._lock:
+            states = self.states.get(symbol)
+            bars = list(states[interval].history) if states else []
+        return pd.DataFrame(bars, columns=BAR_COLUMNS)
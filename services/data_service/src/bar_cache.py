@@ -0,0 +1,274 @@
+import logging
+import time
+from datetime import datetime, date, timedelta, time as dtime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .breeze_connector import BreezeConnector
+from .rate_limiter import RateLimitedError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BarCache:
+    """
+    Persistent OHLCV cache placed in front of BreezeConnector.fetch_historical_data.
+
+    Bars are stored as Parquet files partitioned by symbol, interval and
+    trading date. A request only goes to the API for dates the cache does not
+    hold yet, plus any session that was still open when it was last written.
+    """
+
+    SESSION_CLOSE = dtime(15, 30)
+
+    def __init__(
+        self,
+        connector: BreezeConnector,
+        cache_dir: str = 'data/cache/bars',
+        enabled: bool = True,
+        ttl: int = 3600
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            connector (BreezeConnector): Connector used to fill gaps
+            cache_dir (str): Root directory of the Parquet partitions
+            enabled (bool): When False every call goes straight to the connector
+            ttl (int): Seconds an empty partition (holiday or failed session) is
+                trusted before it is fetched again
+        """
+        self.connector = connector
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.ttl = ttl
+
+    @classmethod
+    def from_config(cls, connector: BreezeConnector, config) -> 'BarCache':
+        """
+        Build a cache from the `caching` section of a ConfigManager
+
+        Args:
+            connector (BreezeConnector): Connector used to fill gaps
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(
+            connector,
+            cache_dir=config.get('caching.path', 'data/cache/bars'),
+            enabled=config.get('caching.enabled', True),
+            ttl=config.get('caching.ttl', 3600),
+        )
+
+    @property
+    def rate_limiter(self):
+        """The connector's limiter, which throttles every gap-fill request"""
+        return self.connector.rate_limiter
+
+    def _partition_path(self, stock_code: str, interval: str, day: date) -> Path:
+        return (
+            self.cache_dir
+            / f"symbol={stock_code}"
+            / f"interval={interval}"
+            / f"date={day.isoformat()}"
+            / "bars.parquet"
+        )
+
+    def _is_fresh(self, path: Path, day: date) -> bool:
+        """
+        Check whether a partition can be served without refetching
+
+        A partition is final once it was written after its session closed.
+        Empty partitions additionally expire after `ttl` seconds.
+        """
+        if not path.exists():
+            return False
+
+        written = path.stat().st_mtime
+        if written < datetime.combine(day, self.SESSION_CLOSE).timestamp():
+            return False
+        if pq.ParquetFile(path).metadata.num_rows == 0:
+            return time.time() - written < self.ttl
+        return True
+
+    def missing_ranges(
+        self,
+        stock_code: str,
+        interval: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Tuple[date, date]]:
+        """
+        List the contiguous date ranges that still have to be fetched
+
+        Args:
+            stock_code: Stock symbol
+            interval: Data interval
+            start_date: Start of the requested range
+            end_date: End of the requested range
+
+        Returns:
+            List[Tuple[date, date]]: Inclusive (start, end) date ranges
+        """
+        ranges: List[Tuple[date, date]] = []
+        day = start_date.date()
+        while day <= end_date.date():
+            if day.weekday() < 5 and not self._is_fresh(
+                self._partition_path(stock_code, interval, day), day
+            ):
+                if ranges and ranges[-1][1] == day - timedelta(days=1):
+                    ranges[-1] = (ranges[-1][0], day)
+                else:
+                    ranges.append((day, day))
+            elif ranges and day.weekday() >= 5 and ranges[-1][1] == day - timedelta(days=1):
+                # Weekends never hold bars, so they do not split a gap
+                ranges[-1] = (ranges[-1][0], day)
+            day += timedelta(days=1)
+        return ranges
+
+    def _store(self, stock_code: str, interval: str, df: pd.DataFrame, first: date, last: date) -> None:
+        """
+        Write one partition per trading day of an inclusive date range
+        """
+        by_day: Dict[date, pd.DataFrame] = {}
+        if not df.empty:
+            by_day = {day: group for day, group in df.groupby(df['datetime'].dt.date)}
+
+        day = first
+        while day <= last:
+            if day.weekday() < 5:
+                path = self._partition_path(stock_code, interval, day)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                part = by_day.get(day, df.iloc[0:0])
+                part.to_parquet(path, index=False)
+            day += timedelta(days=1)
+
+    def load(
+        self,
+        stock_code: str,
+        interval: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DataFrame:
+        """
+        Read cached bars for a date range without touching the API
+        """
+        parts = []
+        day = start_date.date()
+        while day <= end_date.date():
+            path = self._partition_path(stock_code, interval, day)
+            if path.exists():
+                parts.append(pd.read_parquet(path))
+            day += timedelta(days=1)
+
+        parts = [part for part in parts if not part.empty]
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts, ignore_index=True)
+
+    def fetch_historical_frame(
+        self,
+        stock_code: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        interval: str = '1day'
+    ) -> pd.DataFrame:
+        """
+        Fetch historical bars, calling the API only for uncached ranges
+
+        Args:
+            stock_code: Stock symbol
+            start_date: Start date for data retrieval
+            end_date: End date for data retrieval
+            interval: Data interval ('1minute', '5minute', '15minute', '30minute', '1day')
+
+        Returns:
+            pd.DataFrame: Time-ordered candles
+        """
+        if not self.enabled:
+            return self.connector.fetch_historical_frame(stock_code, start_date, end_date, interval)
+
+        start_date, end_date = self.connector._validate_dates(start_date, end_date)
+        gaps = self.missing_ranges(stock_code, interval, start_date, end_date)
+
+        # Frames without a `datetime` column cannot be split into trading
+        # days; they are returned as fetched but not cached
+        uncached: List[pd.DataFrame] = []
+        for first, last in gaps:
+            logger.info(f"Cache miss for {stock_code} ({interval}) {first} to {last}")
+            try:
+                df = self.connector.fetch_historical_frame(
+                    stock_code,
+                    datetime.combine(first, dtime.min),
+                    datetime.combine(last, dtime.min),
+                    interval
+                )
+            except RateLimitedError:
+                raise
+            except Exception as e:
+                logger.error(f"Gap fill failed for {stock_code} {first} to {last}: {e}")
+                continue
+            if not df.empty and 'datetime' not in df.columns:
+                logger.warning(f"Not caching {stock_code} ({interval}) {first} to {last}: no datetime column")
+                uncached.append(df)
+                continue
+            self._store(stock_code, interval, df, first, last)
+
+        if not gaps:
+            logger.info(f"Cache hit for {stock_code} ({interval})")
+
+        df = self.load(stock_code, interval, start_date, end_date)
+        if uncached:
+            return pd.concat(([df] if not df.empty else []) + uncached, ignore_index=True)
+        if df.empty:
+            return df
+        return df.sort_values('datetime').reset_index(drop=True)
+
+    def fetch_historical_data(
+        self,
+        stock_code: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        interval: str = '1day'
+    ) -> Dict[str, Any]:
+        """
+        Drop-in replacement for BreezeConnector.fetch_historical_data
+
+        Raises:
+            RateLimitedError: If the API throttled a gap fill, so the caller can back off
+        """
+        try:
+            df = self.fetch_historical_frame(stock_code, start_date, end_date, interval)
+        except RateLimitedError:
+            raise
+        except Exception as e:
+            logger.error(f"Data fetch error for {stock_code}: {e}")
+            return {}
+
+        if df.empty:
+            return {}
+        if 'datetime' in df.columns:
+            df['datetime'] = df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        return {"Success": df.to_dict('records'), "Status": 200, "Error": None}
+
+    def get_historical_data(
+        self,
+        stock_code: str,
+        interval: str,
+        from_date: str,
+        to_date: str,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Adapter for the call DataFetcher makes, with 'YYYY-MM-DD' date strings
+        """
+        response = self.fetch_historical_data(
+            stock_code,
+            datetime.strptime(from_date, '%Y-%m-%d'),
+            datetime.strptime(to_date, '%Y-%m-%d'),
+            interval
+        )
+        return response.get('Success', [])
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+COLUMNS = ['ts'] + PRICE_COLUMNS + ['volume']
+
+
+class _Series:
+    """Memory maps of one (symbol, interval), remapped when the files grow."""
+
+    __slots__ = ('path', 'dtypes', 'length', 'maps', 'last_ts')
+
+    def __init__(self, path: Path, dtypes: Dict[str, np.dtype]):
+        self.path = path
+        self.dtypes = dtypes
+        self.length = -1
+        self.maps: Dict[str, np.ndarray] = {}
+        self.last_ts: Optional[int] = None
+
+    def column_path(self, column: str) -> Path:
+        return self.path / f"{column}.bin"
+
+    def stored_length(self) -> int:
+        """Rows present in every column; a torn append is ignored."""
+        lengths = []
+        for column, dtype in self.dtypes.items():
+            try:
+                lengths.append(os.path.getsize(self.column_path(column)) // dtype.itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(lengths)
+
+    def repair(self) -> int:
+        """Cut columns back to the committed length and return it."""
+        length = self.stored_length()
+        for column, dtype in self.dtypes.items():
+            path = self.column_path(column)
+            if path.exists() and os.path.getsize(path) > length * dtype.itemsize:
+                logger.warning(f"Truncating torn append in {path}")
+                os.truncate(path, length * dtype.itemsize)
+        return length
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        length = self.stored_length()
+        if length != self.length:
+            self.maps = {
+                column: (
+                    np.memmap(self.column_path(column), dtype=dtype, mode='r', shape=(length,))
+                    if length else np.empty(0, dtype=dtype)
+                )
+                for column, dtype in self.dtypes.items()
+            }
+            self.length = length
+        return self.maps
+
+
+class BarStore:
+    """
+    Append-only local bar store backed by memory-mapped columns.
+
+    Every symbol/interval is a directory of fixed-width column files: int64
+    epoch-nanosecond timestamps, OHLC in `price_dtype` and float64 volume.
+    Opening a series only maps the files, so even years of 1minute bars cost
+    no reads until a range is touched. Range reads binary-search the
+    timestamp column and return NumPy views into the maps (no copy).
+
+    Bars must arrive in time order; rows at or before the last stored
+    timestamp are skipped, so overlapping fetches can be appended as-is.
+    Each series expects a single writing process; readers may be many.
+    """
+
+    def __init__(self, root: str = 'data/bars', price_dtype: str = 'float64'):
+        """
+        Initialize the store
+
+        Args:
+            root (str): Directory holding one sub-directory per symbol/interval
+            price_dtype (str): 'float64' or 'float32' for new series. Existing
+                series keep the dtype they were created with.
+        """
+        if np.dtype(price_dtype) not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError("price_dtype must be 'float32' or 'float64'")
+
+        self.root = Path(root)
+        self.price_dtype = np.dtype(price_dtype)
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'BarStore':
+        """
+        Build a store from the `bar_store` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(
+            root=config.get('bar_store.path', 'data/bars'),
+            price_dtype=config.get('bar_store.price_dtype', 'float64'),
+        )
+
+    def _open(self, symbol: str, interval: str, create: bool = False) -> Optional[_Series]:
+        key = (symbol, interval)
+        series = self._series.get(key)
+        if series is not None:
+            return series
+
+        path = self.root / f"symbol={symbol}" / f"interval={interval}"
+        meta_path = path / 'meta.json'
+        if meta_path.exists():
+            price_dtype = np.dtype(json.loads(meta_path.read_text())['price_dtype'])
+        elif create:
+            path.mkdir(parents=True, exist_ok=True)
+            price_dtype = self.price_dtype
+            meta_path.write_text(json.dumps({'price_dtype': price_dtype.name}))
+        else:
+            return None
+
+        dtypes = {'ts': np.dtype(np.int64)}
+        dtypes.update({column: price_dtype for column in PRICE_COLUMNS})
+        dtypes['volume'] = np.dtype(np.float64)
+
+        series = _Series(path, dtypes)
+        self._series[key] = series
+        return series
+
+    def append(
+        self,
+        symbol: str,
+        interval: str,
+        ts: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ) -> int:
+        """
+        Append bars in time order
+
+        Args:
+            symbol (str): Stock code
+            interval (str): Bar interval
+            ts (np.ndarray): Bar start in epoch nanoseconds, ascending
+            open, high, low, close, volume (np.ndarray): Bar values
+
+        Returns:
+            int: Rows written
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        if len(ts) > 1 and (np.diff(ts) <= 0).any():
+            raise ValueError("Bars must be appended in strictly increasing time order")
+
+        with self._lock:
+            series = self._open(symbol, interval, create=True)
+            if series.last_ts is None and series.repair():
+                series.last_ts = int(series.columns()['ts'][-1])
+            start = 0
+            if series.last_ts is not None:
+                start = int(np.searchsorted(ts, series.last_ts, side='right'))
+            if start >= len(ts):
+                return 0
+
+            values = {'ts': ts, 'open': open, 'high': high, 'low': low, 'close': close, 'volume': volume}
+            # Timestamps go last so a partially written append is never visible
+            for column in COLUMNS[1:] + ['ts']:
+                data = np.asarray(values[column], dtype=series.dtypes[column])[start:]
+                with series.column_path(column).open('ab') as f:
+                    f.write(data.tobytes())
+            series.last_ts = int(ts[-1])
+
+        return len(ts) - start
+
+    def append_frame(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Append historical candles (the DataFetcher / BarCache frame layout)
+
+        Returns:
+            int: Rows written
+        """
+        if df is None or df.empty:
+            return 0
+        df = df.sort_values('datetime', kind='stable').drop_duplicates('datetime', keep='last')
+        ts = pd.to_datetime(df['datetime']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+        return self.append(
+            symbol, interval, ts,
+            *(df[column].to_numpy(dtype=np.float64) for column in PRICE_COLUMNS + ['volume'])
+        )
+
+    def append_bar(self, symbol: str, interval: str, bar: Dict[str, Any]) -> int:
+        """
+        Append one closed bar; usable directly as a BarAggregator `on_bar` handler
+
+        Returns:
+            int: Rows written (0 when the bar is not newer than the last one)
+        """
+        ts = np.array([pd.Timestamp(bar['datetime']).value], dtype=np.int64)
+        return self.append(
+            symbol, interval, ts,
+            *(np.array([bar[column]], dtype=np.float64) for column in PRICE_COLUMNS + ['volume'])
+        )
+
+    def count(self, symbol: str, interval: str) -> int:
+        """Rows stored for a symbol/interval"""
+        series = self._open(symbol, interval)
+        return 0 if series is None else len(series.columns()['ts'])
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Read bars with start <= ts <= end as zero-copy views
+
+        Args:
+            symbol (str): Stock code
+            interval (str): Bar interval
+            start, end: Bounds as anything pd.Timestamp accepts, or None for open ends
+
+        Returns:
+            Dict[str, np.ndarray]: Column views keyed by ts/open/high/low/close/volume
+        """
+        series = self._open(symbol, interval)
+        if series is None:
+            return {column: np.empty(0, dtype=np.int64 if column == 'ts' else np.float64) for column in COLUMNS}
+
+        columns = series.columns()
+        ts = columns['ts']
+        lo = 0 if start is None else int(np.searchsorted(ts, pd.Timestamp(start).value, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, pd.Timestamp(end).value, side='right'))
+        return {column: values[lo:hi] for column, values in columns.items()}
+
+    def read_frame(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None
+    ) -> pd.DataFrame:
+        """
+        Read bars as a DataFrame with the historical candle columns (copies the range)
+        """
+        columns = self.read(symbol, interval, start, end)
+        df = pd.DataFrame({column: np.array(columns[column]) for column in PRICE_COLUMNS + ['volume']})
+        df.insert(0, 'datetime', pd.to_datetime(np.array(columns['ts']).view('datetime64[ns]')))
+        return df
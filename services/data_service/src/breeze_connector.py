@@ -1,15 +1,20 @@
 import os
 import json
 import logging
+import time
 import requests
+import pandas as pd
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from breeze_connect import BreezeConnect
 from datetime import datetime, timedelta
+from .http_session import HTTPSessionPool
+from .quote_cache import QuoteCache
+from .rate_limiter import RateLimitedError, RateLimiter
 from pathlib import Path
 from breeze_connect import BreezeConnect
-import project_config config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,12 +23,73 @@ class BreezeConnector:
     """A connector class for the Breeze API with enhanced functionality and error handling."""
     
     VALID_INTERVALS = ['1minute', '5minute', '15minute', '30minute', '1day']
+
+    # Calendar days per historical request, sized so that one window of full
+    # 375-minute NSE sessions stays under the API's 1000-candle response cap.
+    WINDOW_DAYS = {
+        '1minute': 2,
+        '5minute': 13,
+        '15minute': 50,
+        '30minute': 100,
+        '1day': 1400,
+    }
+    MAX_WINDOW_WORKERS = 4
+    # Retries of one throttled window, backing off WINDOW_BACKOFF * 2**attempt seconds
+    WINDOW_RETRIES = 3
+    WINDOW_BACKOFF = 1.0
+    # Shared limiter every window request waits on, if set
+    rate_limiter: Optional[RateLimiter] = None
+
+    # Default seconds a quote is reused before going back to the API
+    QUOTE_TTL = 0.25
+    MAX_QUOTE_WORKERS = 16
+    QUOTE_FIELDS = [
+        'ltp', 'open', 'high', 'low', 'previous_close',
+        'best_bid_price', 'best_bid_quantity', 'best_offer_price',
+        'best_offer_quantity', 'total_quantity_traded',
+    ]
     
-    def __init__(self):
-        """Initialize Breeze API Connection"""
+    def __init__(
+        self,
+        http: Optional[HTTPSessionPool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        quote_ttl: float = QUOTE_TTL,
+        quote_symbol_ttls: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize Breeze API Connection
+        
+        Args:
+            http: Pooled session for REST calls, e.g. HTTPSessionPool.from_config()
+            rate_limiter: Limiter shared with other callers; every historical
+                window request takes a token
+            quote_ttl: Seconds a quote is reused before going back to the API
+            quote_symbol_ttls: Per-symbol overrides of `quote_ttl`
+        """
+        self.http = http or HTTPSessionPool()
+        self.rate_limiter = rate_limiter
+        self.quote_cache = QuoteCache(ttl=quote_ttl, symbol_ttls=quote_symbol_ttls)
+        self.logger = self._setup_logger()
+        self.connected = False
         self._load_credentials()
         self._initialize_connection()
-        self.connected = False
+
+    @classmethod
+    def from_config(cls, config, rate_limiter: Optional[RateLimiter] = None) -> 'BreezeConnector':
+        """
+        Build a connector from the `data_service` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+            rate_limiter: Limiter to share; one is built from
+                `data_service.api.rate_limit` when None
+        """
+        return cls(
+            http=HTTPSessionPool.from_config(config),
+            rate_limiter=rate_limiter or RateLimiter.from_config(config),
+            quote_ttl=config.get('data_service.quotes.ttl', cls.QUOTE_TTL),
+            quote_symbol_ttls=config.get('data_service.quotes.symbol_ttls'),
+        )
 
     def _load_credentials(self) -> None:
         """Load credentials from environment variables"""
@@ -48,23 +114,53 @@ class BreezeConnector:
             raise
     
 
+    def _request_headers(self):
+        return {
+            "Content-Type": "application/json",
+            "X-API-KEY": self.api_key,
+            "X-SECRET-KEY": self.secret_key
+        }
+
     def fetch_data(self, endpoint, params=None):
         """
         Fetch data from the Breeze API.
 
+        Requests go through the shared keep-alive session in `self.http`,
+        using the timeout configured for the endpoint.
+
+        :param endpoint: API endpoint to fetch data from.
+        :param params: Query parameters for the API call.
+        :return: JSON response from the API.
+        """
+        url = f"{self.base_url}/{endpoint}"
+
+        try:
+            response = self.http.get(url, endpoint=str(endpoint), headers=self._request_headers(), params=params)
+            response.raise_for_status()
+            logging.debug(
+                f"{endpoint}: connect {response.timing['connect'] * 1000:.1f}ms, "
+                f"server {response.timing['server'] * 1000:.1f}ms"
+            )
+            return response.json()
+        except requests.exceptions.Timeout:
+            logging.error(f"Timeout error while fetching data from {url}.")
+            raise
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error fetching data from {url}: {e}")
+            raise
+
+    async def afetch_data(self, endpoint, params=None):
+        """
+        Async variant of fetch_data sharing the same connection pool.
+
         :param endpoint: API endpoint to fetch data from.
         :param params: Query parameters for the API call.
         :return: JSON response from the API.
         """
         url = f"{self.base_url}/{endpoint}"
-        headers = {
-            "Content-Type": "application/json",
-            "X-API-KEY": self.api_key,
-            "X-SECRET-KEY": self.secret_key
-        }
 
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = await self.http.aget(url, endpoint=str(endpoint), headers=self._request_headers(), params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.Timeout:
@@ -134,28 +230,6 @@ class BreezeConnector:
             self.logger.error(f"Configuration loading failed: {e}")
             raise
 
-    def _initialize_connection(self) -> None:
-        """
-        Initialize Breeze API connection
-        
-        Raises:
-            ConnectionError: If API connection fails
-        """
-        try:
-            self.api = BreezeConnect(
-                api_key=self.config['breeze_api_key']
-            )
-            self.api.generate_session(
-                api_key=self.config['breeze_api_key'],
-                session_token=self.config['session_token']
-            )
-            self.connected = True
-            self.logger.info("Breeze API connection established successfully")
-            
-        except Exception as e:
-            self.logger.error(f"API Connection Failed: {e}")
-            raise ConnectionError(f"Failed to connect to Breeze API: {e}")
-
     def _validate_dates(
         self,
         start_date: Optional[datetime],
@@ -202,6 +276,181 @@ class BreezeConnector:
                 f"Invalid interval. Must be one of: {', '.join(self.VALID_INTERVALS)}"
             )
 
+    def _plan_windows(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        interval: str
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Split a date range into API-sized request windows
+        
+        Args:
+            start_date: Start date for data retrieval
+            end_date: End date for data retrieval
+            interval: Time interval for data
+            
+        Returns:
+            List[Tuple[datetime, datetime]]: Inclusive (start, end) windows in order
+        """
+        step = timedelta(days=self.WINDOW_DAYS[interval])
+        one_day = timedelta(days=1)
+        windows = []
+        window_start = start_date
+        while window_start.date() <= end_date.date():
+            window_end = min(window_start + step - one_day, end_date)
+            windows.append((window_start, window_end))
+            window_start = window_end + one_day
+        return windows
+
+    def _fetch_window(
+        self,
+        stock_code: str,
+        interval: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the candles of a single request window
+        
+        Each attempt waits on the shared rate limiter, and a throttled window
+        is retried on its own with exponential backoff, so one 429 does not
+        throw away the windows that already succeeded.
+        
+        Raises:
+            RateLimitedError: If the window is still throttled after WINDOW_RETRIES retries
+            ValueError: If the API reports an error for the window
+        """
+        for attempt in range(self.WINDOW_RETRIES + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return self._request_window(stock_code, interval, start_date, end_date)
+            except RateLimitedError:
+                if attempt == self.WINDOW_RETRIES:
+                    raise
+                delay = self.WINDOW_BACKOFF * (2 ** attempt)
+                self.logger.warning(
+                    f"Rate limited on {stock_code} {start_date.date()} to {end_date.date()}, "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def _request_window(
+        self,
+        stock_code: str,
+        interval: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Send one historical request for a window
+
+        Raises:
+            RateLimitedError: If the API throttled the request (HTTP 429)
+            ValueError: If the API reports an error for the window
+        """
+        try:
+            response = self.api.get_historical_data(
+                stock_code=stock_code,
+                interval=interval,
+                from_date=start_date.strftime('%Y-%m-%d'),
+                to_date=end_date.strftime('%Y-%m-%d'),
+                exchange="NSE"  # Can be made configurable if needed
+            )
+        except Exception as e:
+            if getattr(getattr(e, 'response', None), 'status_code', None) == 429:
+                raise RateLimitedError(str(e)) from e
+            raise
+        if isinstance(response, dict):
+            if str(response.get('Status')) == '429':
+                raise RateLimitedError(response.get('Error') or 'Too Many Requests')
+            if response.get('Error') and not response.get('Success'):
+                raise ValueError(response['Error'])
+            return response.get('Success') or []
+        return response or []
+
+    @staticmethod
+    def _stitch_windows(windows: List[List[Dict[str, Any]]]) -> pd.DataFrame:
+        """
+        Combine window results into one de-duplicated, time-ordered frame
+        
+        Args:
+            windows: Candle records of each window
+            
+        Returns:
+            pd.DataFrame: Candles sorted by datetime with duplicates removed
+        """
+        records = [record for window in windows for record in window]
+        if not records:
+            return pd.DataFrame()
+
+        df = pd.DataFrame(records)
+        if 'datetime' not in df.columns:
+            return df
+
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        return (
+            df.drop_duplicates(subset='datetime', keep='last')
+            .sort_values('datetime')
+            .reset_index(drop=True)
+        )
+
+    def fetch_historical_frame(
+        self,
+        stock_code: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        interval: str = '1day',
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Fetch historical stock data as a single frame, in parallel windows
+        
+        Long ranges are split into windows sized by WINDOW_DAYS, fetched
+        concurrently and stitched back together.
+        
+        Args:
+            stock_code: Stock symbol
+            start_date: Start date for data retrieval
+            end_date: End date for data retrieval
+            interval: Data interval ('1minute', '5minute', '15minute', '30minute', '1day')
+            max_workers: Concurrent window requests. Defaults to MAX_WINDOW_WORKERS.
+        
+        Returns:
+            pd.DataFrame: Time-ordered candles
+            
+        Raises:
+            ConnectionError: If not connected to API
+            ValueError: If parameters are invalid or a window fails
+        """
+        if not self.connected:
+            raise ConnectionError("Not connected to Breeze API")
+            
+        if not stock_code:
+            raise ValueError("Stock code cannot be empty")
+
+        self._validate_interval(interval)
+        start_date, end_date = self._validate_dates(start_date, end_date)
+        windows = self._plan_windows(start_date, end_date, interval)
+
+        self.logger.info(
+            f"Fetching data for {stock_code} from {start_date.date()} "
+            f"to {end_date.date()} ({interval}, {len(windows)} windows)"
+        )
+
+        if len(windows) == 1:
+            results = [self._fetch_window(stock_code, interval, *windows[0])]
+        else:
+            workers = min(max_workers or self.MAX_WINDOW_WORKERS, len(windows))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda window: self._fetch_window(stock_code, interval, *window),
+                    windows
+                ))
+
+        return self._stitch_windows(results)
+
     def fetch_historical_data(
         self, 
         stock_code: str, 
@@ -224,6 +473,7 @@ class BreezeConnector:
         Raises:
             ConnectionError: If not connected to API
             ValueError: If parameters are invalid
+            RateLimitedError: If the API kept throttling, so the caller can back off
         """
         if not self.connected:
             raise ConnectionError("Not connected to Breeze API")
@@ -232,38 +482,55 @@ class BreezeConnector:
             raise ValueError("Stock code cannot be empty")
             
         try:
-            # Validate parameters
-            self._validate_interval(interval)
-            start_date, end_date = self._validate_dates(start_date, end_date)
+            df = self.fetch_historical_frame(stock_code, start_date, end_date, interval)
             
-            # Fetch data
-            self.logger.info(
-                f"Fetching data for {stock_code} from {start_date.date()} "
-                f"to {end_date.date()} ({interval})"
-            )
-            
-            historical_data = self.api.get_historical_data(
-                stock_code=stock_code,
-                interval=interval,
-                from_date=start_date.strftime('%Y-%m-%d'),
-                to_date=end_date.strftime('%Y-%m-%d'),
-                exchange="NSE"  # Can be made configurable if needed
-            )
-            
-            if not historical_data:
+            if df.empty:
                 self.logger.warning(f"No data received for {stock_code}")
                 return {}
-                
-            return historical_data
+
+            if 'datetime' in df.columns:
+                df['datetime'] = df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            return {"Success": df.to_dict('records'), "Status": 200, "Error": None}
             
+        except RateLimitedError:
+            raise
         except Exception as e:
             self.logger.error(f"Data fetch error for {stock_code}: {e}")
             return {}
 
+    def _request_quote(self, stock_code: str) -> Dict[str, Any]:
+        """
+        Send a quote request to the API, bypassing the cache
+        
+        Raises:
+            ValueError: If the API answers with an error instead of a quote
+        """
+        quote = self.api.get_quotes(
+            stock_code=stock_code,
+            exchange="NSE"  # Can be made configurable if needed
+        )
+        if isinstance(quote, dict) and quote.get('Error') and not quote.get('Success'):
+            raise ValueError(quote['Error'])
+        return quote or {}
+
+    @staticmethod
+    def _quote_record(quote: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the quote fields from a raw API response"""
+        if 'Success' in quote:
+            if not quote['Success']:
+                raise ValueError(quote.get('Error') or "Empty quote response")
+            return quote['Success'][0]
+        if not quote:
+            raise ValueError("Empty quote response")
+        return quote
+
     def get_quote(self, stock_code: str) -> Dict[str, Any]:
         """
         Get current market quote for a stock
         
+        Quotes are served from `quote_cache` for the configured TTL, and
+        concurrent calls for the same symbol share one API request.
+        
         Args:
             stock_code: Stock symbol
             
@@ -274,15 +541,73 @@ class BreezeConnector:
             raise ConnectionError("Not connected to Breeze API")
             
         try:
-            quote = self.api.get_quotes(
-                stock_code=stock_code,
-                exchange="NSE"  # Can be made configurable if needed
+            return self.quote_cache.get_or_fetch(
+                stock_code,
+                lambda: self._request_quote(stock_code)
             )
-            return quote or {}
         except Exception as e:
             self.logger.error(f"Quote fetch error for {stock_code}: {e}")
             return {}
 
+    def get_quotes(
+        self,
+        stock_codes: List[str],
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Get a quote snapshot for a whole watchlist
+        
+        Symbols are fetched concurrently through the quote cache. A failed
+        symbol keeps its row, with NaN fields and the reason in `error`.
+        
+        Args:
+            stock_codes: Stock symbols
+            max_workers: Concurrent quote requests. Defaults to MAX_QUOTE_WORKERS.
+            
+        Returns:
+            pd.DataFrame: One row per symbol with QUOTE_FIELDS, `ltt`,
+            `requested_at`, `received_at` and `error` columns
+        """
+        if not self.connected:
+            raise ConnectionError("Not connected to Breeze API")
+
+        stock_codes = list(dict.fromkeys(stock_codes))
+        if not stock_codes:
+            return pd.DataFrame(columns=self.QUOTE_FIELDS + ['ltt', 'requested_at', 'received_at', 'error'])
+
+        def fetch_one(stock_code: str):
+            requested_at = datetime.now()
+            try:
+                quote = self.quote_cache.get_or_fetch(
+                    stock_code,
+                    lambda: self._request_quote(stock_code)
+                )
+                return requested_at, datetime.now(), self._quote_record(quote), None
+            except Exception as e:
+                return requested_at, datetime.now(), {}, str(e)
+
+        workers = min(max_workers or self.MAX_QUOTE_WORKERS, len(stock_codes))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(fetch_one, stock_codes))
+
+        columns = {
+            field: pd.to_numeric(
+                pd.Series([record.get(field) for _, _, record, _ in results], dtype=object),
+                errors='coerce'
+            ).to_numpy(dtype='float64')
+            for field in self.QUOTE_FIELDS
+        }
+        columns['ltt'] = [record.get('ltt') for _, _, record, _ in results]
+        columns['requested_at'] = pd.to_datetime([requested for requested, _, _, _ in results])
+        columns['received_at'] = pd.to_datetime([received for _, received, _, _ in results])
+        columns['error'] = [error for _, _, _, error in results]
+
+        snapshot = pd.DataFrame(columns, index=pd.Index(stock_codes, name='stock_code'))
+        failed = snapshot['error'].notna().sum()
+        if failed:
+            self.logger.warning(f"Quote snapshot: {failed}/{len(stock_codes)} symbols failed")
+        return snapshot
+
     def disconnect(self) -> None:
         """
         Safely disconnect from the Breeze API
@@ -1,19 +1,65 @@
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
+import time
 
 
 # Local imports
-from src.breeze_connector import BreezeConnector
+from .bar_store import BarStore
+from .breeze_connector import BreezeConnector
+from .rate_limiter import RateLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 class DataFetcher:
-    def __init__(self, breeze_connector: BreezeConnector):
+    # Bar width per interval, used to tell closed bars from the still-open one
+    INTERVAL_SECONDS = {
+        "1second": 1,
+        "1minute": 60,
+        "5minute": 300,
+        "15minute": 900,
+        "30minute": 1800,
+        "1day": 86400,
+    }
+
+    def __init__(
+        self,
+        breeze_connector: BreezeConnector,
+        max_workers: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_attempts: int = 3,
+        backoff_base: float = 1.0,
+        bar_store: Optional[BarStore] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Initialize the fetcher
+
+        Args:
+            breeze_connector (BreezeConnector): Connector used for API calls
+            max_workers (int): Symbols fetched concurrently (1 keeps the serial walk)
+            rate_limiter (Optional[RateLimiter]): Limiter shared by all workers; not
+                applied here when the connector already limits its own requests
+            retry_attempts (int): Retries after a rate-limited (429) response
+            backoff_base (float): Initial backoff in seconds, doubled per retry
+            bar_store (Optional[BarStore]): Local store closed fetched bars are appended to
+            clock (Callable[[], datetime]): Local exchange time, used to leave out the open bar
+        """
         self.connector = breeze_connector
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.retry_attempts = retry_attempts
+        self.backoff_base = backoff_base
+        self.bar_store = bar_store
+        self.clock = clock
+        self.last_run_stats: Dict[str, float] = {}
+        self._stats_lock = threading.Lock()
+        self._reset_counters()
 
     @staticmethod
     def format_date(date: datetime) -> str:
@@ -22,12 +68,119 @@ class DataFetcher:
         """
         return date.strftime("%Y-%m-%d")
 
+    def _reset_counters(self) -> None:
+        self._throttled = 0
+        self._backoffs = 0
+        self._backoff_seconds = 0.0
+
+    @staticmethod
+    def _is_rate_limited(result: Any) -> bool:
+        """
+        Check whether an API response or exception carries HTTP status 429
+        """
+        if isinstance(result, dict):
+            return str(result.get("Status")) == "429"
+        if getattr(result, "status_code", None) == 429:
+            return True
+        response = getattr(result, "response", None)
+        return getattr(response, "status_code", None) == 429
+
+    def _backoff(self, attempt: int) -> None:
+        delay = self.backoff_base * (2 ** attempt)
+        with self._stats_lock:
+            self._backoffs += 1
+            self._backoff_seconds += delay
+        time.sleep(delay)
+
+    def _persist(self, stock: str, interval: str, df: pd.DataFrame) -> None:
+        """
+        Append fetched bars to the local bar store, if one is attached
+
+        The store is append-only, so a bar still forming (the current
+        session's last bar) is left out; a later fetch appends it once its
+        interval has elapsed.
+        """
+        if self.bar_store is None or "datetime" not in df.columns:
+            return
+        try:
+            width = pd.Timedelta(seconds=self.INTERVAL_SECONDS.get(interval, 0))
+            closed = pd.to_datetime(df["datetime"]) + width <= pd.Timestamp(self.clock())
+            written = self.bar_store.append_frame(stock, interval, df[closed.to_numpy()])
+            logger.debug(f"Stored {written} new {interval} bars for {stock}")
+        except Exception as e:
+            logger.error(f"Error storing bars for {stock}: {str(e)}")
+
+    def fetch_stock_data(
+        self,
+        stock: str,
+        interval: str,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Fetch historical data for a single stock, backing off on 429 responses.
+
+        Args:
+            stock (str): Stock code.
+            interval (str): Time interval for historical data.
+            start_date (datetime): Start of the window.
+            end_date (datetime): End of the window.
+
+        Returns:
+            Optional[pd.DataFrame]: Historical data, or None if nothing was received.
+        """
+        # A connector with its own limiter takes a token per window request
+        limit_here = getattr(self.connector, "rate_limiter", None) is None
+        for attempt in range(self.retry_attempts + 1):
+            if self.rate_limiter is not None and limit_here:
+                self.rate_limiter.acquire()
+
+            try:
+                logger.info(f"Fetching data for {stock}")
+                raw_data = self.connector.get_historical_data(
+                    stock_code=stock,
+                    interval=interval,
+                    from_date=self.format_date(start_date),
+                    to_date=self.format_date(end_date),
+                )
+            except Exception as e:
+                if self._is_rate_limited(e) and attempt < self.retry_attempts:
+                    with self._stats_lock:
+                        self._throttled += 1
+                    logger.warning(f"Rate limited while fetching {stock}, backing off")
+                    self._backoff(attempt)
+                    continue
+                logger.error(f"Error fetching data for {stock}: {str(e)}")
+                return None
+
+            if self._is_rate_limited(raw_data):
+                with self._stats_lock:
+                    self._throttled += 1
+                if attempt < self.retry_attempts:
+                    logger.warning(f"Rate limited while fetching {stock}, backing off")
+                    self._backoff(attempt)
+                    continue
+                logger.error(f"Giving up on {stock} after {attempt + 1} rate-limited attempts")
+                return None
+
+            if raw_data:
+                logger.info(f"Data for {stock} fetched successfully: {len(raw_data)} rows")
+                df = pd.DataFrame(raw_data)
+                self._persist(stock, interval, df)
+                return df
+
+            logger.warning(f"No data received for {stock}")
+            return None
+
+        return None
+
     def fetch_multiple_stocks(
         self,
         stock_codes: List[str],
         interval: str = "1minute",
         days: int = 30,
         include_today: bool = True,
+        max_workers: Optional[int] = None,
     ) -> Dict[str, Optional[pd.DataFrame]]:
         """
         Fetch historical data for multiple stocks.
@@ -37,33 +190,46 @@ class DataFetcher:
             interval (str): Time interval for historical data (e.g., '1minute', '1day').
             days (int): Number of days of data to fetch.
             include_today (bool): Whether to include today's data.
+            max_workers (Optional[int]): Overrides the fetcher's concurrency for this call.
 
         Returns:
             Dict[str, Optional[pd.DataFrame]]: Dictionary with stock codes as keys and DataFrames as values.
         """
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
+        workers = max_workers or self.max_workers
 
-        stock_data = {}
-        for stock in stock_codes:
-            try:
-                logger.info(f"Fetching data for {stock}")
-                raw_data = self.connector.get_historical_data(
-                    stock_code=stock,
-                    interval=interval,
-                    from_date=self.format_date(start_date),
-                    to_date=self.format_date(end_date),
-                )
+        self._reset_counters()
+        started = time.perf_counter()
 
-                if raw_data:
-                    stock_data[stock] = pd.DataFrame(raw_data)
-                    logger.info(f"Data for {stock} fetched successfully: {len(raw_data)} rows")
-                else:
-                    logger.warning(f"No data received for {stock}")
-                    stock_data[stock] = None
-            except Exception as e:
-                logger.error(f"Error fetching data for {stock}: {str(e)}")
-                stock_data[stock] = None
+        if workers <= 1:
+            stock_data = {
+                stock: self.fetch_stock_data(stock, interval, start_date, end_date)
+                for stock in stock_codes
+            }
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    stock: executor.submit(self.fetch_stock_data, stock, interval, start_date, end_date)
+                    for stock in stock_codes
+                }
+                stock_data = {stock: future.result() for stock, future in futures.items()}
+
+        elapsed = time.perf_counter() - started
+        self.last_run_stats = {
+            "symbols": len(stock_codes),
+            "succeeded": sum(df is not None for df in stock_data.values()),
+            "elapsed_seconds": elapsed,
+            "symbols_per_second": len(stock_codes) / elapsed if elapsed > 0 else 0.0,
+            "throttled": self._throttled,
+            "backoffs": self._backoffs,
+            "backoff_seconds": self._backoff_seconds,
+        }
+        logger.info(
+            f"Fetched {self.last_run_stats['succeeded']}/{len(stock_codes)} symbols in {elapsed:.2f}s "
+            f"({self.last_run_stats['symbols_per_second']:.2f} symbols/sec, workers={workers}, "
+            f"429s={self._throttled}, backoffs={self._backoffs})"
+        )
 
         return stock_data
 
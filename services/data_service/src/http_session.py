@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import threading
+import time
+from functools import partial
+from typing import Any, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds spent opening connections by the request running on this thread
+_timing = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _timing.connect = getattr(_timing, 'connect', 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _timing.connect = getattr(_timing, 'connect', 0.0) + time.perf_counter() - started
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools measure TCP/TLS connect time."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class HTTPSessionPool:
+    """
+    Shared keep-alive HTTP session for REST calls.
+
+    Connections are pooled and reused across calls and threads. Each response
+    carries a `timing` dict splitting its latency into connect time (zero on a
+    reused connection) and server time.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: Union[float, Dict[str, float]] = 30,
+        max_retries: int = 0
+    ):
+        """
+        Initialize the session
+
+        Args:
+            pool_size (int): Keep-alive connections per host; callers beyond
+                this wait for a free connection
+            timeout (Union[float, Dict[str, float]]): Timeout in seconds, or a
+                mapping of endpoint to timeout with an optional 'default' key
+            max_retries (int): Connection-level retries done by urllib3
+        """
+        self.pool_size = pool_size
+        if isinstance(timeout, dict):
+            self.timeouts = {key: float(value) for key, value in timeout.items()}
+        else:
+            self.timeouts = {'default': float(timeout)}
+        self.timeouts.setdefault('default', 30.0)
+
+        self.session = requests.Session()
+        adapter = _TimedHTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=max_retries,
+            pool_block=True
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'HTTPSessionPool':
+        """
+        Build a session from the `data_service.api` section of a ConfigManager
+        """
+        return cls(
+            pool_size=config.get('data_service.api.pool_size', 10),
+            timeout=config.get('data_service.api.timeout', 30),
+        )
+
+    def timeout_for(self, endpoint: Optional[str]) -> float:
+        """
+        Timeout configured for an endpoint, falling back to the default
+        """
+        return self.timeouts.get(endpoint, self.timeouts['default'])
+
+    def _record(self, endpoint: str, timing: Dict[str, float]) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                endpoint,
+                {'requests': 0, 'new_connections': 0, 'connect': 0.0, 'server': 0.0, 'total': 0.0}
+            )
+            stats['requests'] += 1
+            stats['new_connections'] += timing['connect'] > 0
+            stats['connect'] += timing['connect']
+            stats['server'] += timing['server']
+            stats['total'] += timing['total']
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send a request over the pooled session
+
+        Args:
+            method (str): HTTP method
+            url (str): Full request URL
+            endpoint (Optional[str]): Endpoint name used for timeouts and stats
+            **kwargs: Passed through to `requests.Session.request`
+
+        Returns:
+            requests.Response: Response with an added `timing` dict (seconds)
+        """
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        _timing.connect = 0.0
+        started = time.perf_counter()
+        response = self.session.request(method, url, **kwargs)
+        total = time.perf_counter() - started
+
+        connect = _timing.connect
+        response.timing = {
+            'connect': connect,
+            'server': max(response.elapsed.total_seconds() - connect, 0.0),
+            'total': total,
+        }
+        self._record(endpoint or 'default', response.timing)
+        return response
+
+    def get(self, url: str, endpoint: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return self.request('GET', url, endpoint=endpoint, **kwargs)
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Async variant of `request`, run on the default executor over the same pool
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, partial(self.request, method, url, endpoint=endpoint, **kwargs)
+        )
+
+    async def aget(self, url: str, endpoint: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return await self.arequest('GET', url, endpoint=endpoint, **kwargs)
+
+    def latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-endpoint request counts and mean connect/server/total latency in ms
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': stats['requests'],
+                    'new_connections': stats['new_connections'],
+                    'connect_ms': 1000 * stats['connect'] / stats['requests'],
+                    'server_ms': 1000 * stats['server'] / stats['requests'],
+                    'total_ms': 1000 * stats['total'] / stats['requests'],
+                }
+                for endpoint, stats in self._stats.items()
+            }
+
+    def close(self) -> None:
+        self.session.close()
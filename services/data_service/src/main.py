@@ -1,56 +1,105 @@
 import asyncio
 import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .bar_cache import BarCache
 from .breeze_connector import BreezeConnector
 from .data_fetcher import DataFetcher
+from .pipeline import StagedPipeline
 from .preprocessor import DataPreprocessor
 from .storage import DataStorage
 
 class DataService:
-    def __init__(self, config_path: str, mongodb_uri: str):
+    def __init__(self, config_path: str, mongodb_uri: str, config=None):
         """
         Initialize Data Service
-        
+
+        The fetcher reads through a BarCache, which adapts the connector to
+        the `get_historical_data` call DataFetcher makes, as the scripts do.
+        Connector and fetcher share one rate limiter built from config.
+
         Args:
             config_path (str): Path to configuration file
             mongodb_uri (str): MongoDB connection string
+            config: ConfigManager (or anything with a dot-key `get`); section
+                defaults apply when None
         """
-        self.breeze_connector = BreezeConnector(config_path)
-        self.data_fetcher = DataFetcher(self.breeze_connector)
-        self.storage = DataStorage(mongodb_uri)
-        
+        config = config if config is not None else {}
+        self.breeze_connector = BreezeConnector.from_config(config)
+        self.bar_cache = BarCache.from_config(self.breeze_connector, config)
+        self.data_fetcher = DataFetcher(self.bar_cache, rate_limiter=self.breeze_connector.rate_limiter)
+        self.storage = DataStorage.from_config(mongodb_uri, config)
+
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
-    async def run_data_pipeline(self, stock_codes: list):
+    @staticmethod
+    def _preprocess(symbol: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        return DataPreprocessor.preprocess_stock_data({symbol: df})[symbol]
+
+    async def run_data_pipeline(
+        self,
+        stock_codes: list,
+        interval: str = '1minute',
+        days: int = 30,
+        fetch_workers: int = 4,
+        preprocess_workers: int = 2,
+        store_workers: int = 2,
+        queue_size: int = 8
+    ) -> Dict[str, Any]:
         """
         Complete data processing pipeline
-        
+
+        Symbols flow through fetch, preprocess and store independently, so
+        the stages overlap and only `queue_size` frames wait between stages.
+
         Args:
             stock_codes (list): List of stock symbols
+            interval (str): Bar interval to fetch
+            days (int): Days of history to fetch
+            fetch_workers (int): Concurrent fetches
+            preprocess_workers (int): Concurrent preprocessing calls
+            store_workers (int): Concurrent MongoDB writes
+            queue_size (int): Frames buffered between two stages
+
+        Returns:
+            Dict[str, Any]: Pipeline statistics, see StagedPipeline.run
         """
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+
+        pipeline = StagedPipeline(
+            fetch=lambda symbol: self.data_fetcher.fetch_stock_data(symbol, interval, start_date, end_date),
+            preprocess=self._preprocess,
+            store=lambda symbol, df: self.storage.store_processed_data({symbol: df}, interval),
+            fetch_workers=fetch_workers,
+            preprocess_workers=preprocess_workers,
+            store_workers=store_workers,
+            queue_size=queue_size,
+        )
+
         try:
-            # Fetch raw data
-            raw_data = self.data_fetcher.fetch_multiple_stocks(stock_codes)
-            
-            # Preprocess data
-            processed_data = DataPreprocessor.preprocess_stock_data(raw_data)
-            
-            # Store processed data
-            await self.storage.store_processed_data(processed_data)
-            
+            stats = await pipeline.run(stock_codes)
             self.logger.info("Data pipeline completed successfully")
+            return stats
         except Exception as e:
             self.logger.error(f"Data pipeline failed: {e}")
+            return {}
 
 def main():
     config_path = 'common/config/secrets.json'
     mongodb_uri = 'mongodb://localhost:27017'
     stock_codes = ['RELIANCE', 'NIFTY', 'INFY', 'HDFCBANK']
-    
-    service = DataService(config_path, mongodb_uri)
-    
+
+    from config.project_config import ConfigManager
+
+    service = DataService(config_path, mongodb_uri, ConfigManager())
+
     # Run async event loop
     asyncio.run(service.run_data_pipeline(stock_codes))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
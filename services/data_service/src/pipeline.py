@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Stage handlers, all keyed by symbol
+FetchFn = Callable[[str], Optional[pd.DataFrame]]
+PreprocessFn = Callable[[str, pd.DataFrame], Optional[pd.DataFrame]]
+StoreFn = Callable[[str, pd.DataFrame], Awaitable[Any]]
+
+_DONE = object()
+
+
+class StageMetrics:
+    """Latency, queue depth and backpressure counters of one pipeline stage."""
+
+    __slots__ = ('count', 'errors', 'total', 'max', 'blocked', 'depth_total', 'depth_max', 'depth_samples')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.blocked = 0.0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.depth_samples = 0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def sample_depth(self, depth: int) -> None:
+        self.depth_samples += 1
+        self.depth_total += depth
+        if depth > self.depth_max:
+            self.depth_max = depth
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Items, errors, mean/max latency in ms, input queue
+                depth (mean/max) and seconds blocked on the next stage's queue
+        """
+        return {
+            'items': self.count,
+            'errors': self.errors,
+            'mean_ms': 1e3 * self.total / self.count if self.count else 0.0,
+            'max_ms': 1e3 * self.max,
+            'queue_depth_mean': self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+            'queue_depth_max': self.depth_max,
+            'blocked_seconds': self.blocked,
+        }
+
+
+class StagedPipeline:
+    """
+    Fetch -> preprocess -> store pipeline where every symbol moves on its own.
+
+    Each stage has its own pool of asyncio workers connected by bounded
+    queues. Blocking fetch and preprocess calls run in a thread pool, so
+    while one symbol is stored the next is preprocessed and a third is
+    fetched. A full queue makes the upstream stage wait (backpressure), so
+    at most `queue_size` frames sit between two stages at any time.
+    """
+
+    STAGES = ('fetch', 'preprocess', 'store')
+
+    def __init__(
+        self,
+        fetch: FetchFn,
+        preprocess: PreprocessFn,
+        store: StoreFn,
+        fetch_workers: int = 4,
+        preprocess_workers: int = 2,
+        store_workers: int = 2,
+        queue_size: int = 8
+    ):
+        """
+        Initialize the pipeline
+
+        Args:
+            fetch (FetchFn): Blocking call returning raw bars for a symbol, or None
+            preprocess (PreprocessFn): Blocking call returning processed bars, or None
+            store (StoreFn): Coroutine persisting processed bars
+            fetch_workers (int): Concurrent fetches
+            preprocess_workers (int): Concurrent preprocessing calls
+            store_workers (int): Concurrent store calls
+            queue_size (int): Capacity of each queue between two stages
+        """
+        self.fetch = fetch
+        self.preprocess = preprocess
+        self.store = store
+        self.workers = {
+            'fetch': fetch_workers,
+            'preprocess': preprocess_workers,
+            'store': store_workers,
+        }
+        self.queue_size = queue_size
+        self.last_run_stats: Dict[str, Any] = {}
+
+    async def _worker(
+        self,
+        stage: str,
+        handler: Callable[[str, Any], Awaitable[Any]],
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        metrics: Dict[str, StageMetrics],
+        results: Dict[str, List[str]]
+    ) -> None:
+        stage_metrics = metrics[stage]
+        next_metrics = metrics[self.STAGES[self.STAGES.index(stage) + 1]] if outbox is not None else None
+
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            symbol, payload = item
+
+            started = time.perf_counter()
+            try:
+                result = await handler(symbol, payload)
+            except Exception as e:
+                stage_metrics.errors += 1
+                results['failed'].append(symbol)
+                logger.error(f"Pipeline {stage} failed for {symbol}: {str(e)}")
+                continue
+            stage_metrics.record(time.perf_counter() - started)
+
+            if outbox is None:
+                results['completed'].append(symbol)
+            elif result is None or (isinstance(result, pd.DataFrame) and result.empty):
+                results['failed'].append(symbol)
+                logger.warning(f"Pipeline {stage} produced no data for {symbol}")
+            else:
+                next_metrics.sample_depth(outbox.qsize())
+                blocked = time.perf_counter()
+                await outbox.put((symbol, result))
+                stage_metrics.blocked += time.perf_counter() - blocked
+
+    async def run(self, symbols: List[str]) -> Dict[str, Any]:
+        """
+        Push every symbol through all three stages
+
+        Args:
+            symbols (List[str]): Stock codes
+
+        Returns:
+            Dict[str, Any]: Completed and failed symbols, elapsed time and
+                per-stage metrics; also kept in `last_run_stats`
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        metrics = {stage: StageMetrics() for stage in self.STAGES}
+        results: Dict[str, List[str]] = {'completed': [], 'failed': []}
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers['fetch'] + self.workers['preprocess'],
+            thread_name_prefix='pipeline'
+        )
+
+        async def fetch(symbol: str, _: Any) -> Optional[pd.DataFrame]:
+            return await loop.run_in_executor(executor, self.fetch, symbol)
+
+        async def preprocess(symbol: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+            return await loop.run_in_executor(executor, self.preprocess, symbol, df)
+
+        async def store(symbol: str, df: pd.DataFrame) -> Any:
+            return await self.store(symbol, df)
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for symbol in symbols:
+            pending.put_nowait((symbol, None))
+        queues = [pending, asyncio.Queue(maxsize=self.queue_size), asyncio.Queue(maxsize=self.queue_size), None]
+        handlers = {'fetch': fetch, 'preprocess': preprocess, 'store': store}
+
+        for _ in range(self.workers['fetch']):
+            pending.put_nowait(_DONE)
+
+        tasks = {
+            stage: [
+                asyncio.create_task(
+                    self._worker(stage, handlers[stage], queues[i], queues[i + 1], metrics, results)
+                )
+                for _ in range(self.workers[stage])
+            ]
+            for i, stage in enumerate(self.STAGES)
+        }
+
+        try:
+            # A stage is finished once all its workers are; then the next
+            # stage's workers get one sentinel each after the queued items
+            for i, stage in enumerate(self.STAGES):
+                await asyncio.gather(*tasks[stage])
+                if queues[i + 1] is not None:
+                    for _ in range(self.workers[self.STAGES[i + 1]]):
+                        await queues[i + 1].put(_DONE)
+        finally:
+            for task in (task for stage_tasks in tasks.values() for task in stage_tasks):
+                task.cancel()
+            executor.shutdown(wait=False)
+
+        elapsed = time.perf_counter() - started
+        self.last_run_stats = {
+            'symbols': len(symbols),
+            'completed': results['completed'],
+            'failed': results['failed'],
+            'elapsed_seconds': elapsed,
+            'stages': {stage: metrics[stage].summary() for stage in self.STAGES},
+        }
+        summary = ', '.join(
+            f"{stage} {stats['mean_ms']:.0f}ms avg/q{stats['queue_depth_max']}"
+            for stage, stats in self.last_run_stats['stages'].items()
+        )
+        logger.info(
+            f"Pipeline finished {len(results['completed'])}/{len(symbols)} symbols "
+            f"in {elapsed:.2f}s ({summary})"
+        )
+        return self.last_run_stats
@@ -1,6 +1,41 @@
 import pandas as pd
 import numpy as np
-from typing import Dict
+from typing import Any, Dict, List, Optional
+
+PANEL_INDICATORS = ['return', 'ma_50', 'ma_200', 'rsi', 'volatility']
+
+
+class IndicatorPanel:
+    """
+    Indicators for many symbols stored as aligned (time x symbol) arrays.
+    """
+
+    def __init__(self, index: pd.Index, symbols: List[str], columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            index (pd.Index): Union of all symbols' timestamps
+            symbols (List[str]): Symbol of each array column
+            columns (Dict[str, np.ndarray]): 'close' and indicator arrays
+        """
+        self.index = index
+        self.symbols = symbols
+        self.columns = columns
+        self._positions = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def get(self, symbol: str) -> pd.DataFrame:
+        """
+        One symbol's close and indicators, dropping incomplete rows like the batch path
+        """
+        i = self._positions[symbol]
+        df = pd.DataFrame(
+            {name: values[:, i] for name, values in self.columns.items()},
+            index=self.index
+        )
+        return df.dropna()
+
+    def to_dict(self) -> Dict[str, pd.DataFrame]:
+        return {symbol: self.get(symbol) for symbol in self.symbols}
+
 
 class DataPreprocessor:
     @staticmethod
@@ -62,4 +97,300 @@ class DataPreprocessor:
         
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
-        return rsi
\ No newline at end of file
+        return rsi
+
+    @staticmethod
+    def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        Rolling mean along axis 0; any window containing NaN is NaN
+        
+        Args:
+            values (np.ndarray): 1-D or 2-D (time x symbol) array
+            window (int): Window length
+        
+        Returns:
+            np.ndarray: Means aligned to the window's last row
+        """
+        out = np.full(values.shape, np.nan)
+        if values.shape[0] < window:
+            return out
+
+        finite = np.isfinite(values)
+        all_finite = finite.all()
+        zeros = np.zeros((1,) + values.shape[1:])
+        sums = np.concatenate([zeros, np.cumsum(values if all_finite else np.where(finite, values, 0.0), axis=0)])
+        window_means = (sums[window:] - sums[:-window]) / window
+
+        if all_finite:
+            out[window - 1:] = window_means
+        else:
+            counts = np.concatenate([zeros, np.cumsum(finite, axis=0, dtype=np.float64)])
+            window_counts = counts[window:] - counts[:-window]
+            out[window - 1:] = np.where(window_counts == window, window_means, np.nan)
+        return out
+
+    @staticmethod
+    def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        Rolling sample standard deviation along axis 0, NaN-propagating
+        
+        Uses windowed sums of x and x**2, which is accurate for return-sized
+        values and avoids materializing every window.
+        """
+        mean = DataPreprocessor._rolling_mean(values, window)
+        mean_sq = DataPreprocessor._rolling_mean(values * values, window)
+        variance = (mean_sq - mean * mean) * (window / (window - 1))
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    @staticmethod
+    def _panel_indicators(close: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Compute every indicator of _process_single_stock on a close array
+        
+        Args:
+            close (np.ndarray): 1-D or 2-D (time x symbol) close prices
+        
+        Returns:
+            Dict[str, np.ndarray]: 'close' plus PANEL_INDICATORS, same shape as `close`
+        """
+        close = np.asarray(close, dtype=np.float64)
+        nan_row = np.full((1,) + close.shape[1:], np.nan)
+
+        returns = np.concatenate([nan_row, close[1:] / close[:-1] - 1])
+        delta = np.concatenate([nan_row, np.diff(close, axis=0)])
+
+        # Like the batch path, the NaN first delta counts as no gain and no loss
+        gain = DataPreprocessor._rolling_mean(np.where(delta > 0, delta, 0.0), 14)
+        loss = DataPreprocessor._rolling_mean(np.where(delta < 0, -delta, 0.0), 14)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - 100 / (1 + gain / loss)
+
+        return {
+            'close': close,
+            'return': returns,
+            'ma_50': DataPreprocessor._rolling_mean(close, 50),
+            'ma_200': DataPreprocessor._rolling_mean(close, 200),
+            'rsi': rsi,
+            'volatility': DataPreprocessor._rolling_std(returns, 20),
+        }
+
+    @staticmethod
+    def preprocess_panel(stock_data: Dict[str, pd.DataFrame]) -> IndicatorPanel:
+        """
+        Vectorized preprocessing of all symbols at once
+        
+        Closes are aligned on the union of timestamps (the 'datetime' column,
+        or the index if there is none) into one (time x symbol) matrix, and
+        each indicator is a single NumPy pass over it. Symbols whose bars
+        have holes in the union (not just a later start or earlier end) are
+        recomputed over their own rows and scattered back, so their values
+        match preprocess_stock_data instead of blanking every window that
+        spans a missing timestamp.
+        
+        Args:
+            stock_data (Dict[str, pd.DataFrame]): Raw stock data
+        
+        Returns:
+            IndicatorPanel: Aligned arrays, retrievable per symbol
+        """
+        frames = {
+            symbol: df for symbol, df in stock_data.items()
+            if df is not None and not df.empty
+        }
+        if not frames:
+            return IndicatorPanel(pd.Index([]), [], {})
+
+        symbols = list(frames)
+        indexes = [
+            pd.Index(df['datetime']) if 'datetime' in df.columns else df.index
+            for df in frames.values()
+        ]
+
+        if all(index.equals(indexes[0]) for index in indexes[1:]) and indexes[0].is_monotonic_increasing:
+            # Common case: every symbol has the same bars, no alignment needed
+            index = indexes[0]
+            matrix = np.column_stack([df['close'].to_numpy(dtype=np.float64) for df in frames.values()])
+        else:
+            aligned = pd.concat(
+                {
+                    symbol: pd.Series(df['close'].to_numpy(dtype=np.float64), index=frame_index)
+                    for (symbol, df), frame_index in zip(frames.items(), indexes)
+                },
+                axis=1
+            ).sort_index()
+            index = aligned.index
+            matrix = aligned.to_numpy(dtype=np.float64)
+
+        columns = DataPreprocessor._panel_indicators(matrix)
+
+        valid = np.isfinite(matrix)
+        rows = np.arange(len(matrix))[:, None]
+        first = np.where(valid, rows, len(matrix)).min(axis=0)
+        last = np.where(valid, rows, -1).max(axis=0)
+        # Columns with NaN between their first and last bar: compress, compute, scatter back
+        for j in np.flatnonzero(valid.sum(axis=0) < last - first + 1):
+            mask = valid[:, j]
+            for name, values in DataPreprocessor._panel_indicators(matrix[mask, j]).items():
+                column = np.full(len(matrix), np.nan)
+                column[mask] = values
+                columns[name][:, j] = column
+
+        return IndicatorPanel(index, symbols, columns)
+
+class _IndicatorState:
+    """Rolling state behind one symbol's incremental indicators."""
+
+    __slots__ = (
+        'count', 'prev_close', 'closes', 'sum_short', 'sum_long',
+        'gains', 'losses', 'sum_gain', 'sum_loss',
+        'returns', 'ret_count', 'ret_mean', 'ret_m2',
+    )
+
+    def __init__(self, long_window: int, rsi_periods: int, vol_window: int):
+        self.count = 0
+        self.prev_close = float('nan')
+        self.closes = [0.0] * long_window
+        self.sum_short = 0.0
+        self.sum_long = 0.0
+        self.gains = [0.0] * rsi_periods
+        self.losses = [0.0] * rsi_periods
+        self.sum_gain = 0.0
+        self.sum_loss = 0.0
+        self.returns = [0.0] * vol_window
+        self.ret_count = 0
+        self.ret_mean = 0.0
+        self.ret_m2 = 0.0
+
+
+class IncrementalPreprocessor:
+    """
+    Stateful, per-bar version of DataPreprocessor._process_single_stock.
+
+    Each symbol keeps running sums for the moving averages and RSI and a
+    sliding Welford variance for volatility, so a new bar updates every
+    indicator in constant time. Values match the batch path, including
+    its simple-average RSI, within floating point tolerance.
+    """
+
+    SHORT_WINDOW = 50
+    LONG_WINDOW = 200
+    RSI_PERIODS = 14
+    VOL_WINDOW = 20
+    # Bars between exact recomputations of the running sums, bounding drift
+    RESYNC_EVERY = 1000
+
+    def __init__(self):
+        self.states: Dict[str, _IndicatorState] = {}
+
+    def reset(self, symbol: str) -> None:
+        self.states.pop(symbol, None)
+
+    def _resync(self, state: _IndicatorState) -> None:
+        n = state.count
+        closes = state.closes
+        short_slots = [(n - 1 - k) % self.LONG_WINDOW for k in range(min(n, self.SHORT_WINDOW))]
+        state.sum_short = sum(closes[slot] for slot in short_slots)
+        state.sum_long = sum(closes[:min(n, self.LONG_WINDOW)])
+        state.sum_gain = sum(state.gains)
+        state.sum_loss = sum(state.losses)
+
+        window = state.returns[:min(state.ret_count, self.VOL_WINDOW)]
+        if window:
+            state.ret_mean = sum(window) / len(window)
+            state.ret_m2 = sum((value - state.ret_mean) ** 2 for value in window)
+
+    def update(self, symbol: str, bar: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Add one bar and return it with its indicators
+
+        Args:
+            symbol (str): Stock symbol
+            bar (Dict[str, Any]): Bar with at least a 'close' field
+
+        Returns:
+            Optional[Dict[str, Any]]: The bar plus 'return', 'ma_50', 'ma_200',
+            'rsi' and 'volatility', or None while any indicator is still
+            warming up (the rows the batch path drops)
+        """
+        state = self.states.get(symbol)
+        if state is None:
+            state = _IndicatorState(self.LONG_WINDOW, self.RSI_PERIODS, self.VOL_WINDOW)
+            self.states[symbol] = state
+
+        close = float(bar['close'])
+        n = state.count
+
+        # Moving averages: one ring of the last LONG_WINDOW closes feeds both sums
+        slot = n % self.LONG_WINDOW
+        if n >= self.LONG_WINDOW:
+            state.sum_long -= state.closes[slot]
+        if n >= self.SHORT_WINDOW:
+            state.sum_short -= state.closes[(n - self.SHORT_WINDOW) % self.LONG_WINDOW]
+        state.closes[slot] = close
+        state.sum_long += close
+        state.sum_short += close
+
+        # RSI: the batch path counts the first bar as a zero gain and loss
+        delta = close - state.prev_close if n else 0.0
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        rsi_slot = n % self.RSI_PERIODS
+        state.sum_gain += gain - state.gains[rsi_slot]
+        state.sum_loss += loss - state.losses[rsi_slot]
+        state.gains[rsi_slot] = gain
+        state.losses[rsi_slot] = loss
+
+        # Returns and their sliding-window Welford variance
+        ret = close / state.prev_close - 1 if n else float('nan')
+        if n:
+            k = state.ret_count
+            ret_slot = k % self.VOL_WINDOW
+            if k < self.VOL_WINDOW:
+                state.ret_count = k + 1
+                previous_mean = state.ret_mean
+                state.ret_mean += (ret - previous_mean) / state.ret_count
+                state.ret_m2 += (ret - previous_mean) * (ret - state.ret_mean)
+            else:
+                old = state.returns[ret_slot]
+                previous_mean = state.ret_mean
+                state.ret_mean += (ret - old) / self.VOL_WINDOW
+                state.ret_m2 += (ret - old) * (ret - state.ret_mean + old - previous_mean)
+                state.ret_count = k + 1
+            state.returns[ret_slot] = ret
+
+        state.prev_close = close
+        state.count = n + 1
+        if state.count % self.RESYNC_EVERY == 0:
+            self._resync(state)
+
+        if state.count < self.LONG_WINDOW or state.ret_count < self.VOL_WINDOW:
+            return None
+        if state.sum_gain == 0 and state.sum_loss == 0:
+            return None
+
+        mean_gain = state.sum_gain / self.RSI_PERIODS
+        mean_loss = state.sum_loss / self.RSI_PERIODS
+        rsi = 100.0 if mean_loss == 0 else 100 - 100 / (1 + mean_gain / mean_loss)
+
+        row = dict(bar)
+        row['return'] = ret
+        row['ma_50'] = state.sum_short / self.SHORT_WINDOW
+        row['ma_200'] = state.sum_long / self.LONG_WINDOW
+        row['rsi'] = rsi
+        row['volatility'] = max(state.ret_m2, 0.0) ** 0.5 / (self.VOL_WINDOW - 1) ** 0.5
+        return row
+
+    def seed(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Warm a symbol's state from history, replacing any existing state
+
+        Args:
+            symbol (str): Stock symbol
+            df (pd.DataFrame): Raw bars, oldest first
+
+        Returns:
+            pd.DataFrame: Rows with complete indicators, like the batch path
+        """
+        self.reset(symbol)
+        rows = [self.update(symbol, bar) for bar in df.to_dict('records')]
+        return pd.DataFrame([row for row in rows if row is not None])
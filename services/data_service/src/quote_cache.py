@@ -0,0 +1,129 @@
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class _Flight:
+    """A request in progress that concurrent callers can wait on."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class QuoteCache:
+    """
+    In-process quote cache with per-symbol TTL and single-flight coalescing.
+
+    Concurrent callers asking for a symbol that is already being fetched wait
+    for that request instead of issuing their own. Every caller gets its own
+    copy of the quote, so mutating it does not change what others see.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 0.25,
+        symbol_ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            ttl (float): Seconds a quote stays valid
+            symbol_ttls (Optional[Dict[str, float]]): Per-symbol overrides of `ttl`
+            clock (Callable[[], float]): Monotonic clock, injectable for tests
+        """
+        self.ttl = ttl
+        self.symbol_ttls = dict(symbol_ttls or {})
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def set_ttl(self, symbol: str, ttl: float) -> None:
+        """
+        Override the TTL for one symbol
+        """
+        self.symbol_ttls[symbol] = ttl
+
+    def get_or_fetch(self, symbol: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Return a cached quote or fetch it, sharing one request per symbol
+
+        Empty results are handed to the waiting callers but never cached.
+
+        Args:
+            symbol (str): Stock code
+            fetch (Callable[[], Any]): Performs the actual API request
+
+        Returns:
+            Any: A copy of the quote
+
+        Raises:
+            Exception: Whatever `fetch` raised, for the caller and all waiters
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and self._clock() - entry[0] < self.symbol_ttls.get(symbol, self.ttl):
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            flight = self._inflight.get(symbol)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[symbol] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = fetch()
+            if flight.result:
+                with self._lock:
+                    self._entries[symbol] = (self._clock(), flight.result)
+            return copy.deepcopy(flight.result)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(symbol, None)
+            flight.event.set()
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        Drop one symbol, or every symbol when None
+        """
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit/miss/coalesced counters and the share of calls that skipped the API
+        """
+        with self._lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'saved_ratio': (self.hits + self.coalesced) / total if total else 0.0,
+            }
@@ -0,0 +1,126 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at a fixed rate."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the bucket full
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (Optional[float]): Maximum burst size. Defaults to `rate`.
+            clock (Callable[[], float]): Monotonic clock, injectable for tests
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """
+        Seconds until `tokens` can be taken (0.0 if available now)
+        """
+        self._refill()
+        if self._tokens >= tokens:
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def consume(self, tokens: float = 1.0) -> None:
+        """
+        Take tokens without checking; call `wait_time` first
+        """
+        self._tokens -= tokens
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter enforcing several token buckets at once.
+
+    The defaults follow the Breeze API quotas: short bursts are capped per
+    second and sustained traffic at 100 calls per minute.
+    """
+
+    BREEZE_PER_SECOND = 5
+    BREEZE_PER_MINUTE = 100
+
+    def __init__(
+        self,
+        per_second: Optional[float] = BREEZE_PER_SECOND,
+        per_minute: Optional[float] = BREEZE_PER_MINUTE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize the limiter
+
+        Args:
+            per_second (Optional[float]): Calls allowed per second, None to disable
+            per_minute (Optional[float]): Calls allowed per minute, None to disable
+            clock (Callable[[], float]): Monotonic clock, injectable for tests
+            sleep (Callable[[float], None]): Sleep function, injectable for tests
+        """
+        self.buckets: List[TokenBucket] = []
+        if per_second:
+            self.buckets.append(TokenBucket(per_second, clock=clock))
+        if per_minute:
+            self.buckets.append(TokenBucket(per_minute / 60.0, capacity=per_minute, clock=clock))
+
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    @classmethod
+    def from_config(cls, config) -> 'RateLimiter':
+        """
+        Build a limiter from the `data_service.api.rate_limit` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(
+            per_second=config.get('data_service.api.rate_limit.per_second', cls.BREEZE_PER_SECOND),
+            per_minute=config.get('data_service.api.rate_limit.per_minute', cls.BREEZE_PER_MINUTE),
+        )
+
+    def acquire(self) -> float:
+        """
+        Block until every bucket has a token, then take one from each
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = max((bucket.wait_time() for bucket in self.buckets), default=0.0)
+                if delay <= 0:
+                    for bucket in self.buckets:
+                        bucket.consume()
+                    self.total_wait += waited
+                    return waited
+            self._sleep(delay)
+            waited += delay
+
+
+class RateLimitedError(Exception):
+    """The API answered HTTP 429; callers may back off and retry."""
+
+    status_code = 429
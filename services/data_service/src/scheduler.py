@@ -0,0 +1,334 @@
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_fetcher import DataFetcher
+from .preprocessor import IncrementalPreprocessor
+from .storage import DataStorage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MarketCalendar:
+    """
+    NSE cash-market sessions: weekdays 09:15-15:30 minus configured holidays.
+    """
+
+    OPEN = dtime(9, 15)
+    CLOSE = dtime(15, 30)
+
+    def __init__(
+        self,
+        holidays: Iterable[Any] = (),
+        open_time: dtime = OPEN,
+        close_time: dtime = CLOSE
+    ):
+        """
+        Initialize the calendar
+
+        Args:
+            holidays (Iterable[Any]): Exchange holidays as dates or ISO strings
+            open_time (dtime): Session open
+            close_time (dtime): Session close
+        """
+        self.holidays = {pd.Timestamp(day).date() for day in holidays}
+        self.open_time = open_time
+        self.close_time = close_time
+
+    @classmethod
+    def from_config(cls, config) -> 'MarketCalendar':
+        """
+        Build a calendar from the `market` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(
+            holidays=config.get('market.holidays', []) or [],
+            open_time=dtime.fromisoformat(config.get('market.open', '09:15')),
+            close_time=dtime.fromisoformat(config.get('market.close', '15:30')),
+        )
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day: date) -> tuple:
+        """Open and close datetimes of a trading day"""
+        return datetime.combine(day, self.open_time), datetime.combine(day, self.close_time)
+
+    def next_boundary(self, now: datetime, interval_seconds: int) -> datetime:
+        """
+        First bar close strictly after `now`
+
+        Bars are aligned to the session open; the session close is always a
+        boundary, and an interval of a day or more closes once at the close.
+
+        Args:
+            now (datetime): Current local exchange time
+            interval_seconds (int): Bar width
+
+        Returns:
+            datetime: When the next bar closes
+        """
+        day = now.date()
+        while True:
+            if self.is_trading_day(day):
+                session_open, session_close = self.session(day)
+                if now < session_close:
+                    if interval_seconds >= 86400:
+                        return session_close
+                    elapsed = max((now - session_open).total_seconds(), 0.0)
+                    bars = int(elapsed // interval_seconds) + 1
+                    return min(session_open + timedelta(seconds=bars * interval_seconds), session_close)
+            day += timedelta(days=1)
+            now = datetime.combine(day, dtime.min)
+
+
+class RefreshScheduler:
+    """
+    Long-running refresh of recent bars during market hours.
+
+    The scheduler sleeps until the next bar close (plus a random jitter, so
+    several instances do not hit the API at the same instant), fetches each
+    symbol's bars newer than its watermark, runs them through the
+    IncrementalPreprocessor and upserts the rows into DataStorage.
+
+    Catch-up is driven by the watermarks: on start every symbol is seeded
+    from enough trading sessions to fill the longest indicator window, and a cycle that fails or is missed
+    (downtime, sleep) leaves the watermark in place, so the next cycle
+    fetches everything since. Weekends and configured holidays are skipped
+    by the calendar.
+    """
+
+    INTERVAL_SECONDS = {
+        '1minute': 60,
+        '5minute': 300,
+        '15minute': 900,
+        '30minute': 1800,
+        '1day': 86400,
+    }
+
+    def __init__(
+        self,
+        fetcher: DataFetcher,
+        storage: DataStorage,
+        symbols: List[str],
+        interval: str = '1minute',
+        calendar: Optional[MarketCalendar] = None,
+        preprocessor: Optional[IncrementalPreprocessor] = None,
+        jitter_seconds: float = 2.0,
+        warmup_days: int = 5,
+        clock: Callable[[], datetime] = datetime.now,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+        history: int = 500
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            fetcher (DataFetcher): Source of historical bars
+            storage (DataStorage): Destination of processed bars
+            symbols (List[str]): Stock codes to keep fresh
+            interval (str): Bar interval, key of INTERVAL_SECONDS
+            calendar (Optional[MarketCalendar]): Trading sessions and holidays
+            preprocessor (Optional[IncrementalPreprocessor]): Indicator state per symbol
+            jitter_seconds (float): Upper bound of the random delay after a boundary
+            warmup_days (int): Calendar days fetched at least to seed the indicators
+                on start; slow intervals go back further, see `warmup_start`
+            clock (Callable[[], datetime]): Local exchange time
+            sleep (Callable[[float], Any]): Coroutine function used to wait
+            history (int): Cycles kept for latency statistics
+        """
+        if interval not in self.INTERVAL_SECONDS:
+            raise ValueError(
+                f"Invalid interval. Must be one of: {', '.join(self.INTERVAL_SECONDS)}"
+            )
+
+        self.fetcher = fetcher
+        self.storage = storage
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.width = self.INTERVAL_SECONDS[interval]
+        self.calendar = calendar or MarketCalendar()
+        self.preprocessor = preprocessor or IncrementalPreprocessor()
+        self.jitter_seconds = jitter_seconds
+        self.warmup_days = warmup_days
+        self.clock = clock
+        self.sleep = sleep
+        self.watermarks: Dict[str, pd.Timestamp] = {}
+        self.cycles: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._stopped = False
+
+    def warmup_start(self, boundary: datetime) -> datetime:
+        """
+        Start of the history that seeds a symbol's indicators
+
+        Walks back over trading sessions until they hold the preprocessor's
+        LONG_WINDOW bars of this interval, plus one spare session for short
+        or disrupted days, and never starts after the day `warmup_days`
+        before `boundary`.
+
+        Args:
+            boundary (datetime): Bar close of the seeding cycle
+
+        Returns:
+            datetime: Session open of the earliest day to fetch
+        """
+        session_open, session_close = self.calendar.session(boundary.date())
+        if self.width >= 86400:
+            per_session = 1
+        else:
+            per_session = math.ceil((session_close - session_open).total_seconds() / self.width)
+        sessions = math.ceil(self.preprocessor.LONG_WINDOW / per_session) + 1
+
+        day = boundary.date()
+        while sessions:
+            day -= timedelta(days=1)
+            if self.calendar.is_trading_day(day):
+                sessions -= 1
+        floor = (boundary - timedelta(days=self.warmup_days)).date()
+        return self.calendar.session(min(day, floor))[0]
+
+    def _closed_bars(self, df: Optional[pd.DataFrame], symbol: str, boundary: datetime) -> pd.DataFrame:
+        """
+        Bars newer than the watermark that closed at or before `boundary`
+
+        A bar ends at its start plus the interval width or at its session's
+        close, whichever is earlier, so the day's last partial bar (15:15
+        for 30minute, the whole session for 1day) closes at 15:30.
+        """
+        if df is None or df.empty:
+            return pd.DataFrame()
+        starts = pd.to_datetime(df['datetime'])
+        close = self.calendar.close_time
+        session_close = starts.dt.normalize() + pd.Timedelta(hours=close.hour, minutes=close.minute)
+        ends = np.minimum(starts + pd.Timedelta(seconds=self.width), session_close)
+        keep = ends <= pd.Timestamp(boundary)
+        watermark = self.watermarks.get(symbol)
+        if watermark is not None:
+            keep &= starts > watermark
+        return df[keep.to_numpy()].sort_values('datetime', kind='stable')
+
+    async def _refresh_symbol(self, symbol: str, boundary: datetime) -> int:
+        """
+        Fetch, preprocess and store the bars `symbol` closed since its watermark
+
+        The historical endpoint takes whole days, so a steady-state request
+        spans the watermark's day up to `boundary`: one rate-limited request
+        per symbol per cycle that returns the session so far, of which only
+        bars past the watermark are processed and stored.
+        """
+        loop = asyncio.get_running_loop()
+        watermark = self.watermarks.get(symbol)
+        start = (
+            watermark.to_pydatetime() if watermark is not None
+            else self.warmup_start(boundary)
+        )
+        raw = await loop.run_in_executor(
+            None, self.fetcher.fetch_stock_data, symbol, self.interval, start, boundary
+        )
+        bars = self._closed_bars(raw, symbol, boundary)
+        if bars.empty:
+            return 0
+
+        if watermark is None:
+            processed = self.preprocessor.seed(symbol, bars)
+        else:
+            rows = [self.preprocessor.update(symbol, bar) for bar in bars.to_dict('records')]
+            processed = pd.DataFrame([row for row in rows if row is not None])
+
+        if not processed.empty:
+            await self.storage.store_processed_data({symbol: processed}, self.interval)
+        self.watermarks[symbol] = pd.Timestamp(bars['datetime'].iloc[-1])
+        return len(bars)
+
+    async def run_cycle(self, boundary: datetime) -> Dict[str, Any]:
+        """
+        Refresh every symbol for the bars closed by `boundary`
+
+        Args:
+            boundary (datetime): Bar close that triggered the cycle
+
+        Returns:
+            Dict[str, Any]: Cycle record with bars written, failed symbols and
+                wake/ready latencies in seconds, also appended to `cycles`
+        """
+        woke_at = self.clock()
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._refresh_symbol(symbol, boundary) for symbol in self.symbols),
+            return_exceptions=True
+        )
+
+        failed = []
+        bars = 0
+        for symbol, result in zip(self.symbols, results):
+            if isinstance(result, Exception):
+                failed.append(symbol)
+                logger.error(f"Refresh failed for {symbol}: {str(result)}")
+            else:
+                bars += result
+
+        cycle = {
+            'boundary': boundary,
+            'bars': bars,
+            'failed': failed,
+            'wake_lag_seconds': (woke_at - boundary).total_seconds(),
+            'refresh_seconds': time.perf_counter() - started,
+        }
+        # Wake-to-data-ready: from the bar close until its rows are stored
+        cycle['latency_seconds'] = cycle['wake_lag_seconds'] + cycle['refresh_seconds']
+        self.cycles.append(cycle)
+        logger.info(
+            f"Cycle {boundary:%Y-%m-%d %H:%M}: {bars} bars, {len(failed)} failed, "
+            f"ready {cycle['latency_seconds']:.2f}s after close"
+        )
+        return cycle
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        Wake-to-data-ready latency over recent cycles, in seconds
+        """
+        if not self.cycles:
+            return {'cycles': 0, 'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+        latencies = np.array([cycle['latency_seconds'] for cycle in self.cycles])
+        return {
+            'cycles': len(latencies),
+            'mean': float(latencies.mean()),
+            'p95': float(np.percentile(latencies, 95)),
+            'max': float(latencies.max()),
+        }
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def run(self, max_cycles: Optional[int] = None) -> None:
+        """
+        Run until `stop` is called (or `max_cycles` cycles have run)
+
+        The first cycle runs immediately to seed state and catch up on the
+        bars missed while the scheduler was down.
+        """
+        self._stopped = False
+        now = self.clock()
+        await self.run_cycle(now)
+        cycles = 1
+
+        while not self._stopped and (max_cycles is None or cycles < max_cycles):
+            boundary = self.calendar.next_boundary(self.clock(), self.width)
+            delay = (boundary - self.clock()).total_seconds() + random.uniform(0, self.jitter_seconds)
+            logger.debug(f"Sleeping {delay:.1f}s until {boundary:%Y-%m-%d %H:%M}")
+            await self.sleep(max(delay, 0.0))
+            if self._stopped:
+                break
+            await self.run_cycle(boundary)
+            cycles += 1
@@ -1,28 +1,396 @@
 import os
+import asyncio
+import logging
+import time
 import motor.motor_asyncio
 import pandas as pd
-from typing import Dict
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import CollectionInvalid, OperationFailure
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Time-series bucket granularity per bar interval
+GRANULARITY = {
+    '1second': 'seconds',
+    '1minute': 'minutes',
+    '5minute': 'minutes',
+    '15minute': 'minutes',
+    '30minute': 'minutes',
+    '1day': 'hours',
+}
+
+# Interval of the `processed_{symbol}` documents written before they carried
+# symbol/interval/timestamp fields (the old fetch_multiple_stocks default)
+LEGACY_INTERVAL = '1minute'
+
+# Server error code for creating a collection that already exists
+NAMESPACE_EXISTS = 48
 
 class DataStorage:
-    def __init__(self, mongodb_uri: str, database_name: str = 'trading_data'):
+    def __init__(
+        self,
+        mongodb_uri: str,
+        database_name: str = 'trading_data',
+        batch_size: int = 1000,
+        time_series: bool = False,
+        time_series_collection: str = 'bars'
+    ):
         """
         Initialize MongoDB connection
-        
+
         Args:
             mongodb_uri (str): MongoDB connection string
             database_name (str): Database name
+            batch_size (int): Operations per unordered bulk write
+            time_series (bool): Write every symbol into one time-series collection
+                instead of a `processed_{symbol}` collection per symbol
+            time_series_collection (str): Name of the time-series collection
         """
         self.client = motor.motor_asyncio.AsyncIOMotorClient(mongodb_uri)
         self.db = self.client[database_name]
+        self.batch_size = batch_size
+        self.time_series = time_series
+        self.time_series_collection = time_series_collection
+        self._prepared = set()
+        self._prepare_lock: Optional[asyncio.Lock] = None
+        self.last_write_stats: Dict[str, Any] = {}
+        self.last_read_stats: Dict[str, Any] = {}
+
+    @classmethod
+    def from_config(cls, mongodb_uri: str, config) -> 'DataStorage':
+        """
+        Build storage from the `storage` section of a ConfigManager
+
+        Args:
+            mongodb_uri (str): MongoDB connection string
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(
+            mongodb_uri,
+            database_name=config.get('storage.database', 'trading_data'),
+            batch_size=config.get('storage.batch_size', 1000),
+            time_series=config.get('storage.time_series', False),
+            time_series_collection=config.get('storage.time_series_collection', 'bars'),
+        )
+
+    @staticmethod
+    def _timestamps(df: pd.DataFrame) -> List[Any]:
+        """
+        Bar timestamps as Python datetimes, from the `datetime` column or the index
+        """
+        source = df['datetime'] if 'datetime' in df.columns else df.index.to_series()
+        return list(pd.to_datetime(source).dt.to_pydatetime())
+
+    @staticmethod
+    def build_documents(df: pd.DataFrame, symbol: str, interval: str, time_series: bool = False) -> List[Dict[str, Any]]:
+        """
+        Build MongoDB documents column-wise instead of through `to_dict('records')`
+
+        Each column is converted to Python scalars once with `tolist()` and
+        the rows are zipped together, which skips pandas' per-row boxing.
+
+        Args:
+            df (pd.DataFrame): Processed bars of one symbol
+            symbol (str): Stock code
+            interval (str): Bar interval
+            time_series (bool): Put symbol/interval under a `meta` field
+
+        Returns:
+            List[Dict[str, Any]]: One document per row, keyed by column name
+        """
+        columns = [str(column) for column in df.columns]
+        values = [df[column].tolist() for column in df.columns]
+        names = columns + ['timestamp']
+        values.append(DataStorage._timestamps(df))
+
+        if time_series:
+            meta = {'symbol': symbol, 'interval': interval}
+            names.append('meta')
+            values.append([meta] * len(df))
+        else:
+            names += ['symbol', 'interval']
+            values += [[symbol] * len(df), [interval] * len(df)]
+
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def _collection_name(self, symbol: str) -> str:
+        return self.time_series_collection if self.time_series else f'processed_{symbol}'
+
+    async def _create_time_series(self, name: str, interval: str):
+        """
+        Create the time-series collection unless another writer already has
+        """
+        try:
+            await self.db.create_collection(
+                name,
+                timeseries={
+                    'timeField': 'timestamp',
+                    'metaField': 'meta',
+                    'granularity': GRANULARITY.get(interval, 'minutes'),
+                }
+            )
+        except CollectionInvalid:
+            pass
+        except OperationFailure as e:
+            if e.code != NAMESPACE_EXISTS:
+                raise
+
+    async def _migrate_legacy(self, collection, symbol: str):
+        """
+        Backfill symbol/interval/timestamp on documents written before the unique key
+
+        Such documents would all index as (null, null, null) and make the
+        unique index build fail with E11000. Their `datetime` column becomes
+        the timestamp, and rows the old insert-only writer duplicated are
+        reduced to the most recently inserted one. Documents without a
+        `datetime` are left untouched, since there is no key to merge them on.
+        """
+        orphans = await collection.count_documents({'timestamp': {'$exists': False}, 'datetime': None})
+        if orphans:
+            logger.warning(f"Leaving {orphans} legacy documents of {symbol} without a datetime unmigrated")
+
+        legacy = {'timestamp': {'$exists': False}, 'datetime': {'$ne': None}}
+        count = await collection.count_documents(legacy)
+        if not count:
+            return
+        await collection.update_many(legacy, [{'$set': {
+            'symbol': symbol,
+            'interval': LEGACY_INTERVAL,
+            'timestamp': {'$toDate': '$datetime'},
+        }}])
+
+        groups = collection.aggregate([
+            {'$match': {'timestamp': {'$type': 'date'}}},
+            {'$sort': {'_id': ASCENDING}},
+            {'$group': {
+                '_id': {'symbol': '$symbol', 'interval': '$interval', 'timestamp': '$timestamp'},
+                'ids': {'$push': '$_id'},
+            }},
+            {'$match': {'ids.1': {'$exists': True}}},
+        ], allowDiskUse=True)
+        stale = []
+        async for group in groups:
+            stale.extend(group['ids'][:-1])
+        if stale:
+            await collection.delete_many({'_id': {'$in': stale}})
+        logger.info(f"Migrated {count} legacy documents of {symbol}, dropped {len(stale)} duplicates")
 
-    async def store_processed_data(self, processed_data: Dict[str, pd.DataFrame]):
+    async def _prepare(self, name: str, symbol: str, interval: str):
+        """
+        Create the collection's unique key (or the time-series collection) once
+
+        Concurrent store workers share one lock, so each collection is
+        migrated and indexed by a single coroutine.
+        """
+        if name in self._prepared:
+            return
+        if self._prepare_lock is None:
+            self._prepare_lock = asyncio.Lock()
+        async with self._prepare_lock:
+            if name in self._prepared:
+                return
+            if self.time_series:
+                if name not in await self.db.list_collection_names():
+                    await self._create_time_series(name, interval)
+                await self.db[name].create_index(
+                    [('meta.symbol', ASCENDING), ('meta.interval', ASCENDING), ('timestamp', ASCENDING)]
+                )
+            else:
+                await self._migrate_legacy(self.db[name], symbol)
+                # Partial, so legacy documents left without a timestamp do not collide on null
+                await self.db[name].create_index(
+                    [('symbol', ASCENDING), ('interval', ASCENDING), ('timestamp', ASCENDING)],
+                    unique=True,
+                    partialFilterExpression={'timestamp': {'$exists': True}}
+                )
+            self._prepared.add(name)
+
+    async def _upsert(self, collection, docs: List[Dict[str, Any]], stats: Dict[str, int]):
+        """
+        Upsert on (symbol, interval, timestamp) through unordered bulk writes
+        """
+        for start in range(0, len(docs), self.batch_size):
+            operations = [
+                UpdateOne(
+                    {'symbol': doc['symbol'], 'interval': doc['interval'], 'timestamp': doc['timestamp']},
+                    {'$set': doc},
+                    upsert=True
+                )
+                for doc in docs[start:start + self.batch_size]
+            ]
+            result = await collection.bulk_write(operations, ordered=False)
+            stats['upserted'] += result.upserted_count
+            stats['modified'] += result.modified_count
+            stats['batches'] += 1
+
+    async def _insert_new(self, collection, docs: List[Dict[str, Any]], symbol: str, interval: str, stats: Dict[str, int]):
+        """
+        Insert only timestamps the time-series collection does not hold yet
+
+        Time-series collections cannot carry a unique index, so idempotency
+        comes from skipping timestamps already stored for the symbol.
+        """
+        existing = set(await collection.distinct('timestamp', {
+            'meta.symbol': symbol,
+            'meta.interval': interval,
+            'timestamp': {'$gte': docs[0]['timestamp'], '$lte': docs[-1]['timestamp']},
+        }))
+        new_docs = [doc for doc in docs if doc['timestamp'] not in existing]
+        for start in range(0, len(new_docs), self.batch_size):
+            await collection.insert_many(new_docs[start:start + self.batch_size], ordered=False)
+            stats['batches'] += 1
+        stats['inserted'] += len(new_docs)
+        stats['skipped'] += len(docs) - len(new_docs)
+
+    async def store_processed_data(self, processed_data: Dict[str, pd.DataFrame], interval: str = '1minute'):
         """
         Store processed stock data in MongoDB
-        
+
+        Re-running with overlapping data updates rows in place instead of
+        duplicating them.
+
         Args:
             processed_data (Dict[str, pd.DataFrame]): Processed stock data
+            interval (str): Bar interval of the data
+
+        Returns:
+            Dict[str, Any]: Write statistics, also kept in `last_write_stats`
         """
+        started = time.perf_counter()
+        stats = {'rows': 0, 'upserted': 0, 'modified': 0, 'inserted': 0, 'skipped': 0, 'batches': 0}
+
         for symbol, df in processed_data.items():
-            collection = self.db[f'processed_{symbol}']
-            records = df.to_dict('records')
-            await collection.insert_many(records)
\ No newline at end of file
+            if df is None or df.empty:
+                continue
+            name = self._collection_name(symbol)
+            await self._prepare(name, symbol, interval)
+            collection = self.db[name]
+
+            docs = self.build_documents(df, symbol, interval, time_series=self.time_series)
+            stats['rows'] += len(docs)
+            if self.time_series:
+                docs.sort(key=lambda doc: doc['timestamp'])
+                await self._insert_new(collection, docs, symbol, interval, stats)
+            else:
+                await self._upsert(collection, docs, stats)
+
+        stats['seconds'] = time.perf_counter() - started
+        self.last_write_stats = stats
+        logger.info(
+            f"Stored {stats['rows']} rows in {stats['seconds']:.2f}s "
+            f"({stats['upserted']} upserted, {stats['modified']} modified, "
+            f"{stats['inserted']} inserted, {stats['skipped']} skipped, {stats['batches']} batches)"
+        )
+        return stats
+
+    def _range_filter(self, symbol: str, interval: str, start: Optional[Any], end: Optional[Any]) -> Dict[str, Any]:
+        prefix = 'meta.' if self.time_series else ''
+        query: Dict[str, Any] = {f'{prefix}symbol': symbol, f'{prefix}interval': interval}
+        window = {}
+        if start is not None:
+            window['$gte'] = pd.Timestamp(start).to_pydatetime()
+        if end is not None:
+            window['$lte'] = pd.Timestamp(end).to_pydatetime()
+        if window:
+            query['timestamp'] = window
+        return query
+
+    @staticmethod
+    def _chunk_frame(symbol: str, columns: Dict[str, List[Any]]) -> pd.DataFrame:
+        df = pd.DataFrame(columns)
+        df.insert(0, 'symbol', symbol)
+        return df
+
+    async def stream_range(
+        self,
+        symbols: Iterable[str],
+        interval: str = '1minute',
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        fields: Optional[List[str]] = None,
+        chunk_size: int = 10000
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Stream stored bars for a time window as DataFrame chunks
+
+        The cursor fetches `chunk_size` documents per round trip and each
+        document is written straight into per-column lists, so at most one
+        chunk is held in memory no matter how long the window is. Each chunk
+        belongs to a single symbol and is sorted by timestamp.
+
+        Args:
+            symbols (Iterable[str]): Stock codes to read, in order
+            interval (str): Bar interval
+            start, end: Inclusive bounds as anything pd.Timestamp accepts, or None
+            fields (Optional[List[str]]): Columns to return besides symbol and
+                timestamp. Defaults to every stored field.
+            chunk_size (int): Maximum rows per chunk
+
+        Yields:
+            pd.DataFrame: Chunks with `symbol`, `timestamp` and the requested fields
+        """
+        started = time.perf_counter()
+        stats = {'rows': 0, 'chunks': 0}
+        skip = {'_id', 'symbol', 'interval', 'meta', 'timestamp'}
+        if fields is None:
+            projection = {'_id': 0, 'symbol': 0, 'interval': 0, 'meta': 0}
+        else:
+            projection = {'_id': 0, 'timestamp': 1, **{field: 1 for field in fields}}
+
+        for symbol in symbols:
+            name = self._collection_name(symbol)
+            await self._prepare(name, symbol, interval)
+            cursor = self.db[name].find(
+                self._range_filter(symbol, interval, start, end), projection
+            ).sort('timestamp', ASCENDING).batch_size(chunk_size)
+
+            names = ['timestamp'] + list(fields) if fields is not None else None
+            columns: Dict[str, List[Any]] = {}
+            rows = 0
+            async for doc in cursor:
+                if names is None:
+                    names = ['timestamp'] + [key for key in doc if key not in skip]
+                if not columns:
+                    columns = {name: [] for name in names}
+                for name in names:
+                    columns[name].append(doc.get(name))
+                rows += 1
+                if rows == chunk_size:
+                    stats['rows'] += rows
+                    stats['chunks'] += 1
+                    yield self._chunk_frame(symbol, columns)
+                    columns, rows = {}, 0
+            if rows:
+                stats['rows'] += rows
+                stats['chunks'] += 1
+                yield self._chunk_frame(symbol, columns)
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = elapsed
+        stats['rows_per_second'] = stats['rows'] / elapsed if elapsed > 0 else 0.0
+        self.last_read_stats = stats
+        logger.info(
+            f"Read {stats['rows']} rows in {stats['chunks']} chunks in {elapsed:.2f}s "
+            f"({stats['rows_per_second']:.0f} rows/sec)"
+        )
+
+    async def read_range(
+        self,
+        symbols: Iterable[str],
+        interval: str = '1minute',
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Read a whole time window per symbol; use stream_range for long windows
+
+        Returns:
+            Dict[str, pd.DataFrame]: Bars per symbol, empty symbols omitted
+        """
+        chunks: Dict[str, List[pd.DataFrame]] = {}
+        async for chunk in self.stream_range(symbols, interval, start, end, fields):
+            chunks.setdefault(chunk['symbol'].iat[0], []).append(chunk)
+        return {symbol: pd.concat(parts, ignore_index=True) for symbol, parts in chunks.items()}
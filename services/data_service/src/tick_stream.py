@@ -0,0 +1,344 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from aip import LIVE_STREAM_URL, ResponseMessage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (symbol, exchange timestamp in epoch ns, price, volume)
+TickHandler = Callable[[str, int, float, float], None]
+
+
+class TickRingBuffer:
+    """
+    Fixed-size tick history for one symbol.
+
+    Columns are preallocated NumPy arrays and ticks overwrite the oldest slot,
+    so appending never allocates.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        """
+        Initialize the buffer
+
+        Args:
+            capacity (int): Ticks kept before the oldest are overwritten
+        """
+        self.capacity = capacity
+        self.exchange_ts = np.zeros(capacity, dtype=np.int64)
+        self.recv_ts = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        # Total ticks ever written; also the sequence number of the next tick
+        self.count = 0
+
+    def append(self, exchange_ts: int, price: float, volume: float, recv_ts: int) -> None:
+        slot = self.count % self.capacity
+        self.exchange_ts[slot] = exchange_ts
+        self.recv_ts[slot] = recv_ts
+        self.price[slot] = price
+        self.volume[slot] = volume
+        self.count += 1
+
+    def since(self, seq: int) -> Tuple[Dict[str, np.ndarray], int]:
+        """
+        Ticks written after sequence number `seq`, oldest first
+
+        Ticks that were already overwritten are skipped. The result is a view
+        when the range does not wrap around the end of the buffer.
+
+        Args:
+            seq (int): Sequence number returned by the previous call (0 initially)
+
+        Returns:
+            Tuple[Dict[str, np.ndarray], int]: Column arrays and the next sequence number
+        """
+        end = self.count
+        start = max(seq, end - self.capacity, 0)
+        first, last = start % self.capacity, end % self.capacity
+
+        if start == end:
+            index = slice(0, 0)
+        elif first < last or last == 0:
+            index = slice(first, last or self.capacity)
+        else:
+            index = np.r_[first:self.capacity, 0:last]
+
+        columns = {
+            'exchange_ts': self.exchange_ts[index],
+            'recv_ts': self.recv_ts[index],
+            'price': self.price[index],
+            'volume': self.volume[index],
+        }
+        return columns, end
+
+    def latest(self, n: int) -> Dict[str, np.ndarray]:
+        """
+        The most recent `n` ticks, oldest first
+        """
+        columns, _ = self.since(self.count - n)
+        return columns
+
+
+class TickTransport(ABC):
+    """
+    Source of live ticks.
+
+    Implementations call `on_tick` for every tick and `on_disconnect` when
+    the feed drops. TickStream owns reconnecting and resubscribing.
+    """
+
+    @abstractmethod
+    def connect(self, on_tick: TickHandler, on_disconnect: Callable[[], None]) -> None:
+        ...
+
+    @abstractmethod
+    def subscribe(self, symbol: str) -> None:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, symbol: str) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+
+class BreezeSocketTransport(TickTransport):
+    """TickTransport backed by the Breeze SDK socket feed."""
+
+    def __init__(self, api, exchange_code: str = 'NSE'):
+        """
+        Args:
+            api: Authenticated BreezeConnect instance (e.g. BreezeConnector.api)
+            exchange_code (str): Exchange of the subscribed stocks
+        """
+        self.api = api
+        self.exchange_code = exchange_code
+        self._on_tick: Optional[TickHandler] = None
+        self._on_disconnect: Optional[Callable[[], None]] = None
+
+    def connect(self, on_tick: TickHandler, on_disconnect: Callable[[], None]) -> None:
+        self._on_tick = on_tick
+        self._on_disconnect = on_disconnect
+        self.api.on_ticks = self._handle_tick
+        logger.info(f"Connecting to live stream at {LIVE_STREAM_URL}")
+        self.api.ws_connect()
+
+    def _handle_tick(self, tick: Dict[str, Any]) -> None:
+        try:
+            symbol = tick.get('stock_code') or tick.get('symbol')
+            ltt = tick.get('ltt')
+            exchange_ts = (
+                int(datetime.strptime(ltt, '%a %b %d %H:%M:%S %Y').timestamp() * 1e9)
+                if ltt else time.time_ns()
+            )
+            self._on_tick(symbol, exchange_ts, float(tick['last']), float(tick.get('ltq') or 0))
+        except Exception as e:
+            logger.error(f"Malformed tick {tick}: {e}")
+
+    def subscribe(self, symbol: str) -> None:
+        self.api.subscribe_feeds(
+            exchange_code=self.exchange_code,
+            stock_code=symbol,
+            product_type='cash',
+            get_exchange_quotes=True,
+            get_market_depth=False
+        )
+
+    def unsubscribe(self, symbol: str) -> None:
+        self.api.unsubscribe_feeds(
+            exchange_code=self.exchange_code,
+            stock_code=symbol,
+            product_type='cash',
+            get_exchange_quotes=True,
+            get_market_depth=False
+        )
+
+    def close(self) -> None:
+        self.api.ws_disconnect()
+
+
+class TickStream:
+    """
+    Streaming tick ingestion into per-symbol ring buffers.
+
+    Ticks from the transport are written straight into preallocated
+    TickRingBuffers. When the feed drops, the stream reconnects with
+    exponential backoff and resubscribes every symbol. Transports that cannot
+    report a dropped feed are covered by the optional heartbeat watchdog.
+    """
+
+    def __init__(
+        self,
+        transport: TickTransport,
+        symbols: Iterable[str] = (),
+        capacity: int = 65536,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        heartbeat_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the stream
+
+        Args:
+            transport (TickTransport): Feed to read ticks from
+            symbols (Iterable[str]): Symbols to subscribe on start
+            capacity (int): Ring buffer size per symbol
+            reconnect_delay (float): First reconnect backoff in seconds
+            max_reconnect_delay (float): Backoff ceiling in seconds
+            heartbeat_timeout (Optional[float]): Seconds without any tick after
+                which the feed is treated as dropped. None disables the watchdog.
+        """
+        self.transport = transport
+        self.capacity = capacity
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat_timeout = heartbeat_timeout
+        self.buffers: Dict[str, TickRingBuffer] = {}
+        self.listeners: List[TickHandler] = []
+        self.connected = False
+        self.reconnects = 0
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._reconnecting = threading.Event()
+        self._closed = False
+        self._last_tick = time.monotonic()
+        self._watchdog: Optional[threading.Thread] = None
+        self._latency = {'ticks': 0, 'total_ns': 0, 'max_ns': 0}
+
+        for symbol in symbols:
+            self.buffers[symbol] = TickRingBuffer(capacity)
+
+    def start(self) -> None:
+        """
+        Connect and subscribe every registered symbol
+        """
+        self.transport.connect(self._on_tick, self._on_disconnect)
+        self.connected = True
+        self._last_tick = time.monotonic()
+        for symbol in list(self.buffers):
+            self._send_subscribe(symbol)
+
+        if self.heartbeat_timeout and self._watchdog is None:
+            self._watchdog = threading.Thread(target=self._watch_heartbeat, daemon=True)
+            self._watchdog.start()
+
+    def _watch_heartbeat(self) -> None:
+        while not self._closed:
+            time.sleep(self.heartbeat_timeout / 2)
+            if self.connected and time.monotonic() - self._last_tick > self.heartbeat_timeout:
+                logger.warning(f"No ticks for {self.heartbeat_timeout:.0f}s, reconnecting")
+                try:
+                    self.transport.close()
+                except Exception as e:
+                    logger.error(f"Error closing stale feed: {e}")
+                self._on_disconnect()
+
+    def _send_subscribe(self, symbol: str) -> None:
+        self.transport.subscribe(symbol)
+        logger.info(ResponseMessage.STOCK_SUBSCRIBE_MESSAGE.value.format(symbol))
+
+    def subscribe(self, symbol: str) -> None:
+        """
+        Add a symbol, allocating its buffer up front
+        """
+        with self._lock:
+            if symbol in self.buffers:
+                return
+            self.buffers[symbol] = TickRingBuffer(self.capacity)
+        if self.connected:
+            self._send_subscribe(symbol)
+
+    def unsubscribe(self, symbol: str) -> None:
+        with self._lock:
+            if self.buffers.pop(symbol, None) is None:
+                return
+        if self.connected:
+            self.transport.unsubscribe(symbol)
+            logger.info(ResponseMessage.STOCK_UNSUBSCRIBE_MESSAGE.value.format(symbol))
+
+    def add_listener(self, listener: TickHandler) -> None:
+        """
+        Call `listener` for every tick after it is buffered (e.g. a bar aggregator)
+        """
+        self.listeners.append(listener)
+
+    def _on_tick(self, symbol: str, exchange_ts: int, price: float, volume: float) -> None:
+        self._last_tick = time.monotonic()
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            self.dropped += 1
+            return
+        buffer.append(exchange_ts, price, volume, time.time_ns())
+        for listener in self.listeners:
+            listener(symbol, exchange_ts, price, volume)
+
+    def _on_disconnect(self) -> None:
+        self.connected = False
+        if self._closed or self._reconnecting.is_set():
+            return
+        logger.warning(ResponseMessage.RATE_REFRESH_DISCONNECTED.value)
+        self._reconnecting.set()
+        threading.Thread(target=self._reconnect, daemon=True).start()
+
+    def _reconnect(self) -> None:
+        delay = self.reconnect_delay
+        try:
+            while not self._closed:
+                time.sleep(delay)
+                try:
+                    self.start()
+                    self.reconnects += 1
+                    logger.info(f"Live feed reconnected, {len(self.buffers)} symbols resubscribed")
+                    return
+                except Exception as e:
+                    self.connected = False
+                    logger.error(f"Reconnect failed, retrying in {delay:.1f}s: {e}")
+                    delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            self._reconnecting.clear()
+
+    def read_new(self, symbol: str, seq: int = 0) -> Tuple[Dict[str, np.ndarray], int]:
+        """
+        Consume ticks buffered since `seq` and record tick-to-consumer latency
+
+        Args:
+            symbol (str): Stock code
+            seq (int): Sequence number returned by the previous read
+
+        Returns:
+            Tuple[Dict[str, np.ndarray], int]: Column arrays and the next sequence number
+        """
+        columns, next_seq = self.buffers[symbol].since(seq)
+        if len(columns['recv_ts']):
+            latency = time.time_ns() - columns['recv_ts']
+            self._latency['ticks'] += len(latency)
+            self._latency['total_ns'] += int(latency.sum())
+            self._latency['max_ns'] = max(self._latency['max_ns'], int(latency.max()))
+        return columns, next_seq
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        Mean and max time from tick arrival to `read_new`, in microseconds
+        """
+        ticks = self._latency['ticks']
+        return {
+            'ticks': ticks,
+            'mean_us': self._latency['total_ns'] / ticks / 1000 if ticks else 0.0,
+            'max_us': self._latency['max_ns'] / 1000,
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        self.connected = False
+        self.transport.close()
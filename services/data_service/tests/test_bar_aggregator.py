@@ -0,0 +1,147 @@
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from src.bar_aggregator import BarAggregator
+from src.preprocessor import DataPreprocessor
+
+SECOND = 10**9
+OPEN_NS = int(datetime(2024, 1, 2, 9, 15).timestamp()) * SECOND
+
+
+class TestBarAggregator(unittest.TestCase):
+    def test_builds_bars_for_several_intervals(self):
+        closed = []
+        aggregator = BarAggregator(['1minute', '5minute'], on_bar=lambda *event: closed.append(event))
+
+        for second, price in [(0, 100.0), (20, 103.0), (40, 99.0), (59, 101.0), (61, 102.0)]:
+            aggregator.on_tick('INFY', OPEN_NS + second * SECOND, price, 10.0)
+
+        self.assertEqual(len(closed), 1)
+        symbol, interval, bar = closed[0]
+        self.assertEqual((symbol, interval), ('INFY', '1minute'))
+        self.assertEqual(bar['datetime'], '2024-01-02 09:15:00')
+        self.assertEqual(
+            (bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']),
+            (100.0, 103.0, 99.0, 101.0, 40.0)
+        )
+
+        aggregator.advance(OPEN_NS + 300 * SECOND)
+        five_minute = aggregator.to_frame('INFY', '5minute')
+        self.assertEqual(five_minute['close'].tolist(), [102.0])
+        self.assertEqual(five_minute['volume'].tolist(), [50.0])
+
+    def test_bar_closes_exactly_at_boundary(self):
+        closed = []
+        aggregator = BarAggregator(['1minute'], on_bar=lambda *event: closed.append(event))
+        aggregator.on_tick('INFY', OPEN_NS, 100.0, 1.0)
+
+        aggregator.advance(OPEN_NS + 60 * SECOND - 1)
+        self.assertEqual(closed, [])
+        aggregator.advance(OPEN_NS + 60 * SECOND)
+        self.assertEqual(len(closed), 1)
+
+    def test_late_ticks_within_grace_update_the_closed_bar(self):
+        closed = []
+        aggregator = BarAggregator(['1minute'], grace_seconds=2, on_bar=lambda *event: closed.append(event))
+
+        aggregator.on_tick('INFY', OPEN_NS + 30 * SECOND, 100.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 60 * SECOND, 101.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 59 * SECOND, 98.0, 1.0)
+        self.assertEqual(closed, [])
+
+        aggregator.on_tick('INFY', OPEN_NS + 62 * SECOND, 102.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 58 * SECOND, 90.0, 1.0)
+
+        bar = closed[0][2]
+        self.assertEqual((bar['low'], bar['close'], bar['volume']), (98.0, 98.0, 2.0))
+        self.assertEqual(aggregator.late_dropped, 1)
+
+    def test_out_of_order_tick_does_not_move_the_close(self):
+        aggregator = BarAggregator(['1minute'], grace_seconds=5)
+        aggregator.on_tick('INFY', OPEN_NS + 10 * SECOND, 100.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 50 * SECOND, 104.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 30 * SECOND, 98.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 61 * SECOND, 105.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 55 * SECOND, 103.0, 1.0)
+        aggregator.on_tick('INFY', OPEN_NS + 40 * SECOND, 97.0, 1.0)
+        aggregator.advance(OPEN_NS + 66 * SECOND)
+
+        bar = aggregator.to_frame('INFY', '1minute').iloc[0]
+        self.assertEqual((bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']),
+                         (100.0, 104.0, 97.0, 103.0, 5.0))
+
+    def test_concurrent_ticks_and_timer_emit_each_bar_once(self):
+        closed = []
+        aggregator = BarAggregator(['1second'], on_bar=lambda *event: closed.append(event))
+        symbols = [f'S{i}' for i in range(50)]
+        seconds = 200
+
+        def feed():
+            for second in range(seconds):
+                for symbol in symbols:
+                    aggregator.on_tick(symbol, OPEN_NS + second * SECOND, 100.0 + second, 1.0)
+
+        def timer():
+            for second in range(seconds):
+                aggregator.advance(OPEN_NS + second * SECOND)
+
+        threads = [threading.Thread(target=feed), threading.Thread(target=timer)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        aggregator.advance(OPEN_NS + (seconds + 1) * SECOND)
+
+        keys = [(symbol, bar['datetime']) for symbol, _, bar in closed]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len(keys), len(symbols) * seconds)
+
+    def test_bars_reach_on_bar_in_time_order_across_threads(self):
+        closed = []
+
+        def on_bar(symbol, interval, bar):
+            # A slow handler lets the other thread close the next bar meanwhile
+            time.sleep(0.0002)
+            closed.append((symbol, bar['datetime']))
+
+        aggregator = BarAggregator(['1second'], on_bar=on_bar)
+        seconds = 300
+
+        def feed():
+            for second in range(seconds):
+                aggregator.on_tick('INFY', OPEN_NS + second * SECOND, 100.0 + second, 1.0)
+
+        def timer():
+            for second in range(seconds):
+                aggregator.advance(OPEN_NS + second * SECOND)
+
+        threads = [threading.Thread(target=feed), threading.Thread(target=timer)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        aggregator.advance(OPEN_NS + (seconds + 1) * SECOND)
+
+        stamps = [stamp for _, stamp in closed]
+        self.assertEqual(len(stamps), seconds)
+        self.assertEqual(stamps, sorted(stamps))
+
+    def test_bars_feed_the_preprocessor(self):
+        aggregator = BarAggregator(['1second'])
+        prices = 100 + np.cumsum(np.sin(np.arange(260)))
+        for second, price in enumerate(prices):
+            aggregator.on_tick('INFY', OPEN_NS + second * SECOND, float(price), 1.0)
+        aggregator.advance(OPEN_NS + 260 * SECOND)
+
+        processed = DataPreprocessor.preprocess_stock_data({'INFY': aggregator.to_frame('INFY', '1second')})
+
+        self.assertEqual(len(processed['INFY']), 260 - 199)
+        self.assertIn('rsi', processed['INFY'].columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from src.bar_cache import BarCache
+from src.data_fetcher import DataFetcher
+
+from .test_breeze_connector import FakeBreezeApi, make_connector
+
+
+class TestBarCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.api = FakeBreezeApi()
+        self.cache = BarCache(make_connector(self.api), cache_dir=self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_warm_read_skips_the_api(self):
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 12)
+
+        cold = self.cache.fetch_historical_frame('INFY', start, end, '1minute')
+        calls = len(self.api.calls)
+        warm = self.cache.fetch_historical_frame('INFY', start, end, '1minute')
+
+        self.assertGreater(calls, 0)
+        self.assertEqual(len(self.api.calls), calls)
+        self.assertEqual(len(warm), 10)
+        self.assertEqual(warm['close'].tolist(), cold['close'].tolist())
+
+    def test_only_missing_dates_are_fetched(self):
+        self.cache.fetch_historical_frame('INFY', datetime(2024, 1, 1), datetime(2024, 1, 5), '1day')
+        self.api.calls.clear()
+
+        df = self.cache.fetch_historical_frame('INFY', datetime(2024, 1, 1), datetime(2024, 1, 10), '1day')
+
+        self.assertEqual(self.api.calls, [('2024-01-08', '2024-01-10')])
+        self.assertEqual(len(df), 8)
+
+    def test_session_written_before_close_is_refetched(self):
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 2)
+        self.cache.fetch_historical_frame('INFY', start, end, '1day')
+        intraday = datetime(2024, 1, 2, 11, 0).timestamp()
+        path = self.cache._partition_path('INFY', '1day', end.date())
+        os.utime(path, (intraday, intraday))
+        self.api.calls.clear()
+
+        self.cache.fetch_historical_frame('INFY', start, end, '1day')
+
+        self.assertEqual(self.api.calls, [('2024-01-02', '2024-01-02')])
+
+    def test_disabled_cache_passes_through(self):
+        cache = BarCache(make_connector(self.api), cache_dir=self.cache_dir, enabled=False)
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 2)
+
+        cache.fetch_historical_frame('INFY', start, end, '1day')
+        cache.fetch_historical_frame('INFY', start, end, '1day')
+
+        self.assertEqual(len(self.api.calls), 2)
+
+    def test_frames_without_datetime_are_returned_but_not_cached(self):
+        self.api.get_historical_data = lambda **kwargs: {
+            'Success': [{'stock_code': 'INFY', 'close': 1.0}], 'Status': 200, 'Error': None
+        }
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 2)
+
+        response = self.cache.fetch_historical_data('INFY', start, end, '1day')
+
+        self.assertEqual(response['Success'], [{'stock_code': 'INFY', 'close': 1.0}])
+        self.assertEqual(self.cache.missing_ranges('INFY', '1day', start, end), [(start.date(), end.date())])
+
+    def test_throttled_gap_fill_is_retried_by_the_fetcher(self):
+        fetch = self.api.get_historical_data
+        throttled = []
+
+        def throttle_once(**kwargs):
+            if not throttled:
+                throttled.append(kwargs['stock_code'])
+                return {'Success': None, 'Status': 429, 'Error': 'Too Many Requests'}
+            return fetch(**kwargs)
+
+        self.api.get_historical_data = throttle_once
+        self.cache.connector.WINDOW_RETRIES = 0
+        fetcher = DataFetcher(self.cache, backoff_base=0.0)
+
+        df = fetcher.fetch_stock_data('INFY', '1day', datetime(2024, 1, 1), datetime(2024, 1, 5))
+
+        self.assertEqual(throttled, ['INFY'])
+        self.assertEqual(len(df), 5)
+        self.assertEqual(fetcher._throttled, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.bar_aggregator import BarAggregator
+from src.bar_store import BarStore
+from src.data_fetcher import DataFetcher
+
+
+def candles(start, periods):
+    close = np.arange(periods, dtype=float) + 100
+    return pd.DataFrame({
+        'datetime': pd.date_range(start, periods=periods, freq='min').strftime('%Y-%m-%d %H:%M:%S'),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': np.full(periods, 10.0),
+    })
+
+
+class CandleConnector:
+    def get_historical_data(self, stock_code, interval, from_date, to_date):
+        return candles('2024-01-01 09:15', 30).to_dict('records')
+
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = BarStore(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_range_reads_are_views_of_the_maps(self):
+        self.store.append_frame('INFY', '1minute', candles('2024-01-01 09:15', 100))
+
+        columns = self.store.read('INFY', '1minute', '2024-01-01 09:20', '2024-01-01 09:24')
+
+        self.assertEqual(columns['close'].tolist(), [105.0, 106.0, 107.0, 108.0, 109.0])
+        self.assertIsInstance(columns['close'].base, np.memmap)
+        self.assertFalse(columns['close'].flags.writeable)
+
+    def test_overlapping_appends_only_add_new_bars(self):
+        self.store.append_frame('INFY', '1minute', candles('2024-01-01 09:15', 10))
+        written = self.store.append_frame('INFY', '1minute', candles('2024-01-01 09:20', 10))
+
+        self.assertEqual(written, 5)
+        reopened = BarStore(self.root)
+        df = reopened.read_frame('INFY', '1minute')
+        self.assertEqual(len(df), 15)
+        self.assertEqual(df['datetime'].iloc[-1], pd.Timestamp('2024-01-01 09:29'))
+
+    def test_torn_append_is_repaired(self):
+        self.store.append_frame('INFY', '1minute', candles('2024-01-01 09:15', 10))
+        with (self.store.root / 'symbol=INFY' / 'interval=1minute' / 'close.bin').open('ab') as f:
+            f.write(b'\0' * 12)
+
+        store = BarStore(self.root)
+        self.assertEqual(store.count('INFY', '1minute'), 10)
+        store.append_frame('INFY', '1minute', candles('2024-01-01 09:25', 5))
+        np.testing.assert_array_equal(store.read('INFY', '1minute')['close'][-5:], [100.0, 101.0, 102.0, 103.0, 104.0])
+
+    def test_float32_prices(self):
+        store = BarStore(self.root, price_dtype='float32')
+        store.append_frame('INFY', '1day', candles('2024-01-01', 3))
+        self.assertEqual(BarStore(self.root).read('INFY', '1day')['close'].dtype, np.float32)
+
+    def test_live_bars_and_fetcher_feed_the_store(self):
+        aggregator = BarAggregator(['1minute'], on_bar=self.store.append_bar)
+        open_ns = int(datetime(2024, 1, 2, 9, 15).timestamp()) * 10**9
+        for minute in range(3):
+            aggregator.on_tick('TCS', open_ns + minute * 60 * 10**9, 3500.0 + minute, 1.0)
+        aggregator.advance(open_ns + 180 * 10**9)
+        self.assertEqual(self.store.read('TCS', '1minute')['close'].tolist(), [3500.0, 3501.0, 3502.0])
+
+        fetcher = DataFetcher(CandleConnector(), bar_store=self.store)
+        fetcher.fetch_multiple_stocks(['RELIANCE'], interval='1minute', days=1)
+        self.assertEqual(self.store.count('RELIANCE', '1minute'), 30)
+
+    def test_fetcher_leaves_out_the_open_bar(self):
+        clock = lambda: datetime(2024, 1, 1, 9, 44, 30)
+        fetcher = DataFetcher(CandleConnector(), bar_store=self.store, clock=clock)
+        fetcher.fetch_multiple_stocks(['RELIANCE'], interval='1minute', days=1)
+        # 09:44 is still forming at 09:44:30
+        self.assertEqual(self.store.count('RELIANCE', '1minute'), 29)
+
+        fetcher.clock = lambda: datetime(2024, 1, 1, 9, 45)
+        fetcher.fetch_multiple_stocks(['RELIANCE'], interval='1minute', days=1)
+        self.assertEqual(self.store.count('RELIANCE', '1minute'), 30)
+
+    def test_missing_series_reads_empty(self):
+        self.assertEqual(len(self.store.read('NONE', '1minute')['ts']), 0)
+        self.assertEqual(self.store.count('NONE', '1minute'), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from src.breeze_connector import BreezeConnector
+from src.quote_cache import QuoteCache
+
+
+class FakeBreezeApi:
+    """Returns one 1minute candle per weekday in the requested window."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_historical_data(self, stock_code, interval, from_date, to_date, exchange):
+        with self.lock:
+            self.calls.append((from_date, to_date))
+        day = datetime.strptime(from_date, '%Y-%m-%d')
+        end = datetime.strptime(to_date, '%Y-%m-%d')
+        candles = []
+        while day <= end:
+            if day.weekday() < 5:
+                candles.append({
+                    'datetime': day.replace(hour=9, minute=15).strftime('%Y-%m-%d %H:%M:%S'),
+                    'stock_code': stock_code,
+                    'close': float(day.day),
+                })
+            day += timedelta(days=1)
+        return {'Success': candles, 'Status': 200, 'Error': None}
+
+    def get_quotes(self, stock_code, exchange):
+        with self.lock:
+            self.calls.append(stock_code)
+        time.sleep(0.05)
+        if stock_code == 'BAD':
+            return {'Success': None, 'Status': 500, 'Error': 'Invalid stock code'}
+        return {'Success': [{'stock_code': stock_code, 'ltp': 100.0}], 'Status': 200, 'Error': None}
+
+
+def make_connector(api):
+    connector = BreezeConnector.__new__(BreezeConnector)
+    connector.api = api
+    connector.connected = True
+    connector.logger = logging.getLogger(__name__)
+    connector.quote_cache = QuoteCache(ttl=BreezeConnector.QUOTE_TTL)
+    return connector
+
+
+class TestHistoricalWindows(unittest.TestCase):
+    def test_plan_covers_range_without_overlap(self):
+        connector = make_connector(FakeBreezeApi())
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 30)
+
+        windows = connector._plan_windows(start, end, '1minute')
+
+        self.assertEqual(windows[0][0], start)
+        self.assertEqual(windows[-1][1], end)
+        self.assertEqual(len(windows), 15)
+        for (_, prev_end), (next_start, _) in zip(windows, windows[1:]):
+            self.assertEqual(next_start - prev_end, timedelta(days=1))
+
+    def test_daily_range_is_a_single_request(self):
+        connector = make_connector(FakeBreezeApi())
+        windows = connector._plan_windows(datetime(2023, 1, 1), datetime(2024, 1, 1), '1day')
+        self.assertEqual(len(windows), 1)
+
+    def test_windows_are_stitched_in_order(self):
+        api = FakeBreezeApi()
+        connector = make_connector(api)
+
+        df = connector.fetch_historical_frame(
+            'RELIANCE', datetime(2024, 1, 1), datetime(2024, 3, 31), '1minute'
+        )
+
+        self.assertGreater(len(api.calls), 1)
+        self.assertTrue(df['datetime'].is_monotonic_increasing)
+        self.assertFalse(df['datetime'].duplicated().any())
+        self.assertEqual(len(df), 65)
+
+    def test_throttled_window_is_retried_alone(self):
+        api = FakeBreezeApi()
+        fetch = api.get_historical_data
+        throttled = []
+
+        def throttle_second_window(**kwargs):
+            if kwargs['from_date'] == '2024-01-03' and not throttled:
+                throttled.append(kwargs['from_date'])
+                return {'Success': None, 'Status': 429, 'Error': 'Too Many Requests'}
+            return fetch(**kwargs)
+
+        api.get_historical_data = throttle_second_window
+        connector = make_connector(api)
+        connector.WINDOW_BACKOFF = 0.0
+
+        df = connector.fetch_historical_frame('RELIANCE', datetime(2024, 1, 1), datetime(2024, 1, 10), '1minute')
+
+        self.assertEqual(throttled, ['2024-01-03'])
+        self.assertEqual(len(df), 8)
+        self.assertEqual([call[0] for call in api.calls].count('2024-01-03'), 1)
+        self.assertEqual(len(api.calls), 5)
+
+    def test_every_window_request_takes_a_limiter_token(self):
+        class CountingLimiter:
+            def __init__(self):
+                self.acquired = 0
+                self.lock = threading.Lock()
+
+            def acquire(self):
+                with self.lock:
+                    self.acquired += 1
+                return 0.0
+
+        api = FakeBreezeApi()
+        connector = make_connector(api)
+        connector.rate_limiter = CountingLimiter()
+
+        connector.fetch_historical_frame('RELIANCE', datetime(2024, 1, 1), datetime(2024, 1, 30), '1minute')
+
+        self.assertEqual(connector.rate_limiter.acquired, len(api.calls))
+        self.assertEqual(len(api.calls), 15)
+
+    def test_overlapping_records_are_deduplicated(self):
+        window = [{'datetime': '2024-01-02 09:15:00', 'close': 1.0}]
+        later = [
+            {'datetime': '2024-01-02 09:15:00', 'close': 2.0},
+            {'datetime': '2024-01-01 09:15:00', 'close': 0.5},
+        ]
+
+        df = BreezeConnector._stitch_windows([window, later])
+
+        self.assertEqual(df['close'].tolist(), [0.5, 2.0])
+
+
+class TestQuoteCache(unittest.TestCase):
+    def test_concurrent_callers_share_one_request(self):
+        api = FakeBreezeApi()
+        connector = make_connector(api)
+
+        threads = [threading.Thread(target=connector.get_quote, args=('TCS',)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = connector.quote_cache.stats()
+        self.assertEqual(api.calls, ['TCS'])
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'] + stats['coalesced'], 9)
+
+    def test_quotes_expire_after_ttl(self):
+        now = [0.0]
+        cache = QuoteCache(ttl=0.5, symbol_ttls={'INFY': 0.1}, clock=lambda: now[0])
+
+        def fetch():
+            return {'ltp': now[0]}
+
+        cache.get_or_fetch('TCS', fetch)
+        cache.get_or_fetch('INFY', fetch)
+        now[0] = 0.2
+        self.assertEqual(cache.get_or_fetch('TCS', fetch), {'ltp': 0.0})
+        self.assertEqual(cache.get_or_fetch('INFY', fetch), {'ltp': 0.2})
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_callers_get_independent_copies(self):
+        cache = QuoteCache()
+        fetch = lambda: {'Success': [{'stock_code': 'TCS', 'ltp': 100.0}], 'Status': 200}
+
+        first = cache.get_or_fetch('TCS', fetch)
+        first['Success'][0]['ltp'] = -1.0
+        second = cache.get_or_fetch('TCS', fetch)
+        second['Status'] = 500
+
+        self.assertEqual(cache.get_or_fetch('TCS', fetch)['Success'][0]['ltp'], 100.0)
+        self.assertEqual(cache.get_or_fetch('TCS', fetch)['Status'], 200)
+
+    def test_quote_ttl_is_read_from_config(self):
+        class Config:
+            values = {'data_service.quotes.ttl': 2.0, 'data_service.quotes.symbol_ttls': {'NIFTY': 0.1}}
+
+            def get(self, key, default=None):
+                return self.values.get(key, default)
+
+        original = BreezeConnector._load_credentials, BreezeConnector._initialize_connection
+        BreezeConnector._load_credentials = BreezeConnector._initialize_connection = lambda self: None
+        try:
+            connector = BreezeConnector.from_config(Config())
+        finally:
+            BreezeConnector._load_credentials, BreezeConnector._initialize_connection = original
+
+        self.assertEqual(connector.quote_cache.ttl, 2.0)
+        self.assertEqual(connector.quote_cache.symbol_ttls, {'NIFTY': 0.1})
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        cache = QuoteCache()
+
+        def fail():
+            raise ConnectionError("down")
+
+        with self.assertRaises(ConnectionError):
+            cache.get_or_fetch('TCS', fail)
+        self.assertEqual(cache.get_or_fetch('TCS', lambda: {'ltp': 1.0}), {'ltp': 1.0})
+
+
+class TestQuoteSnapshot(unittest.TestCase):
+    def test_snapshot_is_indexed_by_symbol(self):
+        connector = make_connector(FakeBreezeApi())
+        symbols = [f'SYM{i}' for i in range(40)]
+
+        started = time.perf_counter()
+        snapshot = connector.get_quotes(symbols)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(snapshot.index.tolist(), symbols)
+        self.assertTrue((snapshot['ltp'] == 100.0).all())
+        self.assertTrue(snapshot['error'].isna().all())
+        self.assertTrue((snapshot['received_at'] >= snapshot['requested_at']).all())
+        self.assertLess(elapsed, 40 * 0.05 / 2)
+
+    def test_failures_are_reported_per_symbol(self):
+        connector = make_connector(FakeBreezeApi())
+
+        snapshot = connector.get_quotes(['TCS', 'BAD'])
+
+        self.assertTrue(pd.isna(snapshot.loc['TCS', 'error']))
+        self.assertEqual(snapshot.loc['BAD', 'error'], 'Invalid stock code')
+        self.assertTrue(pd.isna(snapshot.loc['BAD', 'ltp']))
+        self.assertEqual(connector.get_quote('BAD'), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
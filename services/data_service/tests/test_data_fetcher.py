@@ -0,0 +1,96 @@
+import threading
+import unittest
+
+from src.data_fetcher import DataFetcher
+from src.rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeConnector:
+    def __init__(self, throttle_once=()):
+        self.calls = []
+        self.throttle_once = set(throttle_once)
+        self.lock = threading.Lock()
+
+    def get_historical_data(self, stock_code, interval, from_date, to_date):
+        with self.lock:
+            self.calls.append(stock_code)
+            if stock_code in self.throttle_once:
+                self.throttle_once.discard(stock_code)
+                return {"Status": 429, "Error": "Too Many Requests"}
+        if stock_code == "EMPTY":
+            return []
+        return [{"datetime": "2024-01-01 09:15:00", "close": 100.0, "stock_code": stock_code}]
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refills_at_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, clock=clock)
+        bucket.consume(2)
+        self.assertAlmostEqual(bucket.wait_time(), 0.5)
+        clock.now += 0.5
+        self.assertEqual(bucket.wait_time(), 0.0)
+
+    def test_limiter_enforces_per_minute_quota(self):
+        clock = FakeClock()
+        limiter = RateLimiter(per_second=10, per_minute=12, clock=clock, sleep=clock.sleep)
+        for _ in range(12):
+            limiter.acquire()
+        self.assertLess(clock.now, 2.0)
+        waited = limiter.acquire()
+        self.assertGreater(waited, 4.0)
+
+    def test_limiter_from_config(self):
+        limiter = RateLimiter.from_config({'data_service.api.rate_limit.per_minute': 30})
+        self.assertEqual([bucket.capacity for bucket in limiter.buckets], [RateLimiter.BREEZE_PER_SECOND, 30])
+
+
+class TestDataFetcher(unittest.TestCase):
+    def test_concurrent_fetch_preserves_contract(self):
+        stocks = [f"SYM{i}" for i in range(20)] + ["EMPTY"]
+        fetcher = DataFetcher(FakeConnector(), max_workers=8)
+
+        data = fetcher.fetch_multiple_stocks(stocks, interval="1day", days=5)
+
+        self.assertEqual(list(data), stocks)
+        self.assertIsNone(data["EMPTY"])
+        self.assertEqual(data["SYM3"]["stock_code"].iloc[0], "SYM3")
+        self.assertEqual(fetcher.last_run_stats["succeeded"], 20)
+
+    def test_rate_limited_symbols_are_retried(self):
+        connector = FakeConnector(throttle_once={"TCS"})
+        fetcher = DataFetcher(connector, max_workers=2, backoff_base=0.0)
+
+        data = fetcher.fetch_multiple_stocks(["RELIANCE", "TCS"], days=1)
+
+        self.assertIsNotNone(data["TCS"])
+        self.assertEqual(connector.calls.count("TCS"), 2)
+        self.assertEqual(fetcher.last_run_stats["throttled"], 1)
+        self.assertEqual(fetcher.last_run_stats["backoffs"], 1)
+
+    def test_only_status_429_counts_as_throttling(self):
+        class Response:
+            status_code = 429
+
+        class HTTPError(Exception):
+            response = Response()
+
+        self.assertTrue(DataFetcher._is_rate_limited({"Status": 429}))
+        self.assertTrue(DataFetcher._is_rate_limited(HTTPError("throttled")))
+        self.assertFalse(DataFetcher._is_rate_limited(ValueError("No data for order 4291")))
+        self.assertFalse(DataFetcher._is_rate_limited({"Status": 200, "Error": "429 rows"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
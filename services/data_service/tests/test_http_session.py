@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.http_session import HTTPSessionPool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"Status": 200}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHTTPSessionPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}/quotes'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_connections_are_reused(self):
+        http = HTTPSessionPool(pool_size=2)
+
+        first = http.get(self.url, endpoint='quotes')
+        second = http.get(self.url, endpoint='quotes')
+
+        self.assertGreater(first.timing['connect'], 0)
+        self.assertEqual(second.timing['connect'], 0)
+        stats = http.latency_stats()['quotes']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['new_connections'], 1)
+        http.close()
+
+    def test_async_requests_share_the_pool(self):
+        http = HTTPSessionPool(pool_size=4)
+
+        async def burst():
+            return await asyncio.gather(*(http.aget(self.url, endpoint='quotes') for _ in range(8)))
+
+        responses = asyncio.run(burst())
+
+        self.assertTrue(all(response.json() == {'Status': 200} for response in responses))
+        self.assertLessEqual(http.latency_stats()['quotes']['new_connections'], 4)
+        http.close()
+
+    def test_per_endpoint_timeouts(self):
+        http = HTTPSessionPool(timeout={'default': 30, 'quotes': 5})
+        self.assertEqual(http.timeout_for('quotes'), 5.0)
+        self.assertEqual(http.timeout_for('historicalcharts'), 30.0)
+        self.assertEqual(HTTPSessionPool(timeout=12).timeout_for('quotes'), 12.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
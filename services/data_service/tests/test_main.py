@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from src import breeze_connector
+from src.main import DataService
+from .test_storage import FakeDatabase
+
+
+class FakeBreezeSDK:
+    """breeze_connect.BreezeConnect stand-in: a full session of 1minute candles per weekday."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.sessions = []
+
+    def generate_session(self, api_key, session_token):
+        self.sessions.append(session_token)
+
+    def get_historical_data(self, stock_code, interval, from_date, to_date, exchange):
+        day = datetime.strptime(from_date, '%Y-%m-%d')
+        end = datetime.strptime(to_date, '%Y-%m-%d')
+        candles = []
+        while day <= end:
+            if day.weekday() < 5:
+                session_open = day.replace(hour=9, minute=15)
+                candles.extend(
+                    {
+                        'datetime': (session_open + timedelta(minutes=m)).strftime('%Y-%m-%d %H:%M:%S'),
+                        'stock_code': stock_code,
+                        'open': 100.0 + m % 7, 'high': 101.0 + m % 7, 'low': 99.0 + m % 7,
+                        'close': 100.0 + m % 7, 'volume': 10.0,
+                    }
+                    for m in range(375)
+                )
+            day += timedelta(days=1)
+        return {'Success': candles, 'Status': 200, 'Error': None}
+
+
+class TestDataService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        patches = [
+            mock.patch.object(breeze_connector, 'BreezeConnect', FakeBreezeSDK),
+            mock.patch.dict(os.environ, {'BREEZE_API_KEY': 'key', 'BREEZE_SESSION_TOKEN': 'token'}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_pipeline_fetches_through_the_bar_cache(self):
+        service = DataService('unused.json', 'mongodb://localhost:27017', {'caching.path': self.cache_dir})
+        service.storage.db = FakeDatabase()
+
+        stats = await service.run_data_pipeline(['INFY'], interval='1minute', days=7)
+
+        self.assertTrue(service.breeze_connector.connected)
+        self.assertIs(service.data_fetcher.connector, service.bar_cache)
+        self.assertIsNotNone(service.breeze_connector.rate_limiter)
+        self.assertIs(service.data_fetcher.rate_limiter, service.breeze_connector.rate_limiter)
+        self.assertIs(service.bar_cache.rate_limiter, service.breeze_connector.rate_limiter)
+        self.assertEqual(stats['completed'], ['INFY'])
+        self.assertGreater(len(service.storage.db['processed_INFY'].docs), 0)
+        self.assertTrue(any(os.scandir(self.cache_dir)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+
+from src.parallel_preprocessor import ParallelPreprocessor
+from src.preprocessor import DataPreprocessor
+
+from .test_preprocessor import INDICATORS, random_walk
+
+
+class TestParallelPreprocessor(unittest.TestCase):
+    def test_matches_serial_path_in_input_order(self):
+        universe = {f'SYM{i}': random_walk(300 + 25 * i, seed=i) for i in range(7)}
+        serial = DataPreprocessor.preprocess_stock_data({s: df.copy() for s, df in universe.items()})
+
+        engine = ParallelPreprocessor(workers=2, chunk_size=3)
+        parallel = engine.preprocess_stock_data({s: df.copy() for s, df in universe.items()})
+
+        self.assertEqual(list(parallel), list(universe))
+        for symbol, expected in serial.items():
+            result = parallel[symbol]
+            self.assertEqual(len(result), len(expected))
+            for column in INDICATORS:
+                np.testing.assert_allclose(
+                    result[column].to_numpy(), expected[column].to_numpy(), rtol=1e-7, atol=1e-10
+                )
+
+        stats = engine.last_run_stats
+        self.assertEqual(stats['chunks'], 3)
+        self.assertEqual(sum(worker['symbols'] for worker in stats['per_worker'].values()), 7)
+
+    def test_empty_input(self):
+        self.assertEqual(ParallelPreprocessor(workers=2).preprocess_stock_data({}), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
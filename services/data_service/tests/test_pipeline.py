@@ -0,0 +1,70 @@
+import asyncio
+import time
+import unittest
+
+import pandas as pd
+
+from src.pipeline import StagedPipeline
+
+
+def frame(symbol):
+    return pd.DataFrame({'close': [1.0, 2.0, 3.0], 'stock_code': symbol})
+
+
+class TestStagedPipeline(unittest.IsolatedAsyncioTestCase):
+    async def test_stages_overlap(self):
+        events = []
+
+        def fetch(symbol):
+            time.sleep(0.02)
+            events.append(('fetched', symbol, time.perf_counter()))
+            return frame(symbol)
+
+        async def store(symbol, df):
+            events.append(('stored', symbol, time.perf_counter()))
+
+        pipeline = StagedPipeline(fetch, lambda symbol, df: df, store, fetch_workers=1)
+        stats = await pipeline.run([f'SYM{i}' for i in range(5)])
+
+        first_store = min(at for kind, _, at in events if kind == 'stored')
+        last_fetch = max(at for kind, _, at in events if kind == 'fetched')
+        self.assertLess(first_store, last_fetch)
+        self.assertEqual(sorted(stats['completed']), [f'SYM{i}' for i in range(5)])
+        self.assertEqual(stats['stages']['fetch']['items'], 5)
+        self.assertGreater(stats['stages']['fetch']['mean_ms'], 15)
+
+    async def test_slow_store_applies_backpressure(self):
+        async def store(symbol, df):
+            await asyncio.sleep(0.01)
+
+        pipeline = StagedPipeline(
+            frame, lambda symbol, df: df, store,
+            fetch_workers=4, preprocess_workers=1, store_workers=1, queue_size=2
+        )
+        stats = await pipeline.run([f'SYM{i}' for i in range(12)])
+
+        self.assertEqual(len(stats['completed']), 12)
+        self.assertLessEqual(stats['stages']['store']['queue_depth_max'], 2)
+        self.assertGreater(stats['stages']['preprocess']['blocked_seconds'], 0)
+
+    async def test_failures_do_not_stop_other_symbols(self):
+        def fetch(symbol):
+            if symbol == 'BROKEN':
+                raise ConnectionError("reset by peer")
+            return None if symbol == 'EMPTY' else frame(symbol)
+
+        stored = []
+
+        async def store(symbol, df):
+            stored.append(symbol)
+
+        pipeline = StagedPipeline(fetch, lambda symbol, df: df, store)
+        stats = await pipeline.run(['INFY', 'BROKEN', 'EMPTY', 'TCS'])
+
+        self.assertEqual(sorted(stored), ['INFY', 'TCS'])
+        self.assertEqual(sorted(stats['failed']), ['BROKEN', 'EMPTY'])
+        self.assertEqual(stats['stages']['fetch']['errors'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessor import DataPreprocessor, IncrementalPreprocessor
+
+INDICATORS = ['return', 'ma_50', 'ma_200', 'rsi', 'volatility']
+
+
+def random_walk(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'datetime': pd.date_range('2024-01-01 09:15', periods=n, freq='min'),
+        'close': close,
+        'volume': rng.integers(1, 1000, n).astype(float),
+    })
+
+
+class TestIncrementalPreprocessor(unittest.TestCase):
+    def test_matches_batch_path(self):
+        df = random_walk(2500)
+        batch = DataPreprocessor._process_single_stock(df.copy())
+
+        incremental = IncrementalPreprocessor().seed('INFY', df)
+
+        self.assertEqual(len(incremental), len(batch))
+        for column in INDICATORS:
+            np.testing.assert_allclose(
+                incremental[column].to_numpy(), batch[column].to_numpy(), rtol=1e-7, atol=1e-10
+            )
+
+    def test_updates_continue_from_seeded_state(self):
+        df = random_walk(400)
+        engine = IncrementalPreprocessor()
+        engine.seed('INFY', df.iloc[:300])
+
+        rows = [engine.update('INFY', bar) for bar in df.iloc[300:].to_dict('records')]
+        batch = DataPreprocessor._process_single_stock(df.copy()).iloc[-100:]
+
+        np.testing.assert_allclose([row['rsi'] for row in rows], batch['rsi'].to_numpy(), rtol=1e-7)
+        np.testing.assert_allclose([row['ma_200'] for row in rows], batch['ma_200'].to_numpy(), rtol=1e-9)
+
+    def test_warm_up_returns_none(self):
+        engine = IncrementalPreprocessor()
+        self.assertIsNone(engine.update('INFY', {'close': 100.0}))
+
+
+class TestPanelPreprocessing(unittest.TestCase):
+    def test_panel_matches_per_symbol_loop(self):
+        universe = {f'SYM{i}': random_walk(600, seed=i) for i in range(5)}
+        batch = DataPreprocessor.preprocess_stock_data({s: df.copy() for s, df in universe.items()})
+
+        panel = DataPreprocessor.preprocess_panel(universe)
+
+        self.assertEqual(panel.symbols, list(universe))
+        for symbol, expected in batch.items():
+            result = panel.get(symbol)
+            self.assertEqual(len(result), len(expected))
+            for column in INDICATORS:
+                np.testing.assert_allclose(
+                    result[column].to_numpy(), expected[column].to_numpy(), rtol=1e-7, atol=1e-10
+                )
+
+    def test_symbols_with_different_histories_are_aligned(self):
+        long_history = random_walk(500, seed=1)
+        short_history = random_walk(300, seed=2)
+        short_history['datetime'] = long_history['datetime'].iloc[200:].to_numpy()
+
+        panel = DataPreprocessor.preprocess_panel({'LONG': long_history, 'SHORT': short_history})
+
+        self.assertEqual(panel.columns['close'].shape, (500, 2))
+        self.assertTrue(np.isnan(panel.columns['ma_200'][:399, 1]).all())
+        self.assertEqual(len(panel.get('SHORT')), 101)
+        self.assertEqual(len(panel.get('LONG')), 301)
+
+    def test_symbol_with_missing_bars_matches_per_symbol_loop(self):
+        full = random_walk(600, seed=3)
+        ragged = random_walk(600, seed=4).drop(index=[250, 400, 401]).reset_index(drop=True)
+        ragged['datetime'] = full['datetime'].drop(index=[250, 400, 401]).to_numpy()
+        batch = DataPreprocessor.preprocess_stock_data({'FULL': full.copy(), 'RAGGED': ragged.copy()})
+
+        panel = DataPreprocessor.preprocess_panel({'FULL': full, 'RAGGED': ragged})
+
+        for symbol, expected in batch.items():
+            result = panel.get(symbol)
+            self.assertEqual(len(result), len(expected))
+            for column in INDICATORS:
+                np.testing.assert_allclose(
+                    result[column].to_numpy(), expected[column].to_numpy(), rtol=1e-7, atol=1e-10
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.scheduler import MarketCalendar, RefreshScheduler
+
+SESSION_OPEN = datetime(2024, 1, 2, 9, 15)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class MinuteBarFetcher:
+    """Serves 1minute bars that have closed by the clock's current time."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.fail = False
+        self.calls = []
+        closes = 100 + np.cumsum(np.sin(np.arange(375)))
+        self.bars = pd.DataFrame({
+            'datetime': pd.date_range(SESSION_OPEN, periods=375, freq='min').strftime('%Y-%m-%d %H:%M:%S'),
+            'close': closes,
+        })
+
+    def fetch_stock_data(self, stock, interval, start_date, end_date):
+        self.calls.append((stock, start_date))
+        if self.fail:
+            raise ConnectionError("gateway timeout")
+        starts = pd.to_datetime(self.bars['datetime'])
+        return self.bars[(starts + pd.Timedelta(minutes=1) <= self.clock.now).to_numpy()]
+
+
+class RecordingStorage:
+    def __init__(self):
+        self.writes = []
+
+    async def store_processed_data(self, processed_data, interval='1minute'):
+        for symbol, df in processed_data.items():
+            self.writes.append((symbol, df['datetime'].tolist()))
+
+
+class TestMarketCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = MarketCalendar(holidays=['2024-01-26'])
+
+    def test_boundaries_align_to_the_session_open(self):
+        self.assertEqual(
+            self.calendar.next_boundary(datetime(2024, 1, 2, 9, 16, 30), 300),
+            datetime(2024, 1, 2, 9, 20)
+        )
+        self.assertEqual(
+            self.calendar.next_boundary(datetime(2024, 1, 2, 9, 17), 60),
+            datetime(2024, 1, 2, 9, 18)
+        )
+        self.assertEqual(
+            self.calendar.next_boundary(datetime(2024, 1, 2, 7, 0), 900),
+            datetime(2024, 1, 2, 9, 30)
+        )
+        self.assertEqual(
+            self.calendar.next_boundary(datetime(2024, 1, 2, 12, 0), 86400),
+            datetime(2024, 1, 2, 15, 30)
+        )
+
+    def test_weekends_and_holidays_are_skipped(self):
+        # Thursday 25th after close -> Friday 26th is a holiday -> Monday 29th
+        self.assertEqual(
+            self.calendar.next_boundary(datetime(2024, 1, 25, 15, 45), 60),
+            datetime(2024, 1, 29, 9, 16)
+        )
+        self.assertFalse(self.calendar.is_trading_day(date(2024, 1, 27)))
+
+
+class TestRefreshScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock(datetime(2024, 1, 2, 13, 0, 5))
+        self.fetcher = MinuteBarFetcher(self.clock)
+        self.storage = RecordingStorage()
+        self.scheduler = RefreshScheduler(
+            self.fetcher, self.storage, ['INFY'],
+            jitter_seconds=0, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    async def test_seeds_then_writes_only_new_bars(self):
+        await self.scheduler.run_cycle(self.clock.now)
+        seeded = self.storage.writes[-1][1]
+        self.assertEqual(seeded[-1], '2024-01-02 12:59:00')
+        self.assertEqual(len(seeded), 225 - 199)
+
+        self.clock.now = datetime(2024, 1, 2, 13, 1, 2)
+        cycle = await self.scheduler.run_cycle(datetime(2024, 1, 2, 13, 1))
+
+        self.assertEqual(self.storage.writes[-1], ('INFY', ['2024-01-02 13:00:00']))
+        self.assertEqual(self.fetcher.calls[-1], ('INFY', datetime(2024, 1, 2, 12, 59)))
+        self.assertEqual(cycle['bars'], 1)
+        self.assertAlmostEqual(cycle['wake_lag_seconds'], 2.0)
+
+    async def test_missed_cycles_are_caught_up(self):
+        await self.scheduler.run_cycle(self.clock.now)
+
+        self.fetcher.fail = True
+        self.clock.now = datetime(2024, 1, 2, 13, 1)
+        failed = await self.scheduler.run_cycle(self.clock.now)
+        self.assertEqual(failed['failed'], ['INFY'])
+
+        self.fetcher.fail = False
+        self.clock.now = datetime(2024, 1, 2, 13, 3)
+        await self.scheduler.run_cycle(self.clock.now)
+        self.assertEqual(
+            self.storage.writes[-1][1],
+            ['2024-01-02 13:00:00', '2024-01-02 13:01:00', '2024-01-02 13:02:00']
+        )
+
+    async def test_run_wakes_on_boundaries(self):
+        await self.scheduler.run(max_cycles=3)
+
+        boundaries = [cycle['boundary'] for cycle in self.scheduler.cycles]
+        self.assertEqual(boundaries[1:], [datetime(2024, 1, 2, 13, 1), datetime(2024, 1, 2, 13, 2)])
+        self.assertEqual([cycle['bars'] for cycle in self.scheduler.cycles][1:], [1, 1])
+        self.assertEqual(self.scheduler.latency_stats()['cycles'], 3)
+
+    def test_warmup_covers_the_long_window_on_slow_intervals(self):
+        boundary = datetime(2024, 1, 31, 15, 30)
+        calendar = MarketCalendar(holidays=['2024-01-26'])
+        for interval, per_session in [('1minute', 375), ('15minute', 25), ('30minute', 13), ('1day', 1)]:
+            scheduler = RefreshScheduler(self.fetcher, self.storage, ['INFY'], interval=interval, calendar=calendar)
+            start = scheduler.warmup_start(boundary)
+            sessions = pd.bdate_range(start.date(), boundary.date() - timedelta(days=1))
+            sessions = [day for day in sessions if day.date() not in calendar.holidays]
+            self.assertEqual(start.time(), calendar.open_time)
+            self.assertGreaterEqual(len(sessions) * per_session, scheduler.preprocessor.LONG_WINDOW, interval)
+            self.assertLessEqual(start.date(), (boundary - timedelta(days=scheduler.warmup_days)).date())
+
+    def test_last_bar_of_the_session_closes_at_the_close(self):
+        thirty_minute = pd.DataFrame({
+            'datetime': ['2024-01-02 14:45:00', '2024-01-02 15:15:00'],
+            'close': [101.0, 102.0],
+        })
+        daily = pd.DataFrame({'datetime': ['2024-01-01 00:00:00', '2024-01-02 00:00:00'], 'close': [1.0, 2.0]})
+        session_close = datetime(2024, 1, 2, 15, 30)
+
+        scheduler = RefreshScheduler(self.fetcher, self.storage, ['INFY'], interval='30minute')
+        self.assertEqual(len(scheduler._closed_bars(thirty_minute, 'INFY', session_close)), 2)
+        self.assertEqual(len(scheduler._closed_bars(thirty_minute, 'INFY', datetime(2024, 1, 2, 15, 15))), 1)
+
+        scheduler = RefreshScheduler(self.fetcher, self.storage, ['INFY'], interval='1day')
+        self.assertEqual(len(scheduler._closed_bars(daily, 'INFY', session_close)), 2)
+        self.assertEqual(len(scheduler._closed_bars(daily, 'INFY', datetime(2024, 1, 2, 15, 0))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,287 @@
+import asyncio
+import itertools
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from pymongo.errors import CollectionInvalid, DuplicateKeyError
+
+from src.storage import DataStorage
+
+
+def lookup(doc, dotted):
+    for key in dotted.split('.'):
+        doc = doc[key]
+    return doc
+
+
+def matches(doc, query):
+    """The subset of the query language the legacy migration uses: $exists, $ne, and None."""
+    for field, condition in query.items():
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if '$exists' in condition and (field in doc) != condition['$exists']:
+                return False
+            if '$ne' in condition and value == condition['$ne']:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+OBJECT_IDS = itertools.count()
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+        self.batch = None
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def batch_size(self, size):
+        self.batch = size
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """In-memory stand-in for the motor collection calls DataStorage makes."""
+
+    def __init__(self):
+        self.docs = {}
+        self.rows = []
+        self.indexes = []
+        self.bulk_sizes = []
+
+    async def create_index(self, keys, unique=False, partialFilterExpression=None):
+        if unique:
+            seen = set()
+            for doc in self.rows:
+                if partialFilterExpression and not matches(doc, partialFilterExpression):
+                    continue
+                key = tuple(doc.get(field) for field, _ in keys)
+                if key in seen:
+                    raise DuplicateKeyError(f"E11000 duplicate key {key}")
+                seen.add(key)
+        self.indexes.append((keys, unique))
+
+    async def count_documents(self, query):
+        return sum(matches(doc, query) for doc in self.rows)
+
+    async def update_many(self, query, pipeline):
+        # Only the legacy backfill: {'$set': {..., 'timestamp': {'$toDate': '$datetime'}}}
+        fields = pipeline[0]['$set']
+        for doc in self.rows:
+            if matches(doc, query):
+                doc.update({key: value for key, value in fields.items() if key != 'timestamp'})
+                doc['timestamp'] = pd.Timestamp(doc['datetime']).to_pydatetime()
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        groups = {}
+        for doc in sorted(self.rows, key=lambda doc: doc['_id']):
+            if 'timestamp' not in doc:
+                continue
+            key = (doc['symbol'], doc['interval'], doc['timestamp'])
+            groups.setdefault(key, []).append(doc['_id'])
+        return FakeCursor([{'ids': ids} for ids in groups.values() if len(ids) > 1])
+
+    async def delete_many(self, query):
+        stale = set(query['_id']['$in'])
+        self.rows = [doc for doc in self.rows if doc['_id'] not in stale]
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_sizes.append(len(operations))
+        upserted = modified = 0
+        for op in operations:
+            key = tuple(sorted(op._filter.items()))
+            if key in self.docs:
+                modified += 1
+            else:
+                upserted += 1
+            self.docs[key] = dict(op._doc['$set'])
+        return SimpleNamespace(upserted_count=upserted, modified_count=modified)
+
+    async def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            doc.setdefault('_id', next(OBJECT_IDS))
+        self.rows.extend(docs)
+
+    def find(self, query, projection):
+        matched = []
+        for doc in list(self.docs.values()) + self.rows:
+            window = query.get('timestamp', {})
+            if any(lookup(doc, key) != value for key, value in query.items() if key != 'timestamp'):
+                continue
+            if doc['timestamp'] < window.get('$gte', doc['timestamp']):
+                continue
+            if doc['timestamp'] > window.get('$lte', doc['timestamp']):
+                continue
+            if any(value for value in projection.values()):
+                doc = {key: doc[key] for key, value in projection.items() if value}
+            else:
+                doc = {key: value for key, value in doc.items() if key not in projection}
+            matched.append(doc)
+        return FakeCursor(matched)
+
+    async def distinct(self, field, query):
+        return [
+            doc[field] for doc in self.rows
+            if doc['meta']['symbol'] == query['meta.symbol']
+            and query['timestamp']['$gte'] <= doc[field] <= query['timestamp']['$lte']
+        ]
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+        self.time_series_options = {}
+        self.created_elsewhere = set()
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    async def list_collection_names(self):
+        return list(self.collections)
+
+    async def create_collection(self, name, timeseries=None):
+        if name in self.created_elsewhere:
+            raise CollectionInvalid(f"collection {name} already exists")
+        self.time_series_options[name] = timeseries
+        return self[name]
+
+
+def processed(periods, start='2024-01-01 09:15'):
+    close = np.linspace(100, 110, periods)
+    return pd.DataFrame({
+        'datetime': pd.date_range(start, periods=periods, freq='min').strftime('%Y-%m-%d %H:%M:%S'),
+        'close': close,
+        'volume': np.arange(periods),
+        'rsi': np.full(periods, 55.0),
+    })
+
+
+class TestDataStorage(unittest.IsolatedAsyncioTestCase):
+    def make_storage(self, **kwargs):
+        storage = DataStorage('mongodb://localhost:27017', **kwargs)
+        storage.db = FakeDatabase()
+        return storage
+
+    async def test_rerun_upserts_instead_of_duplicating(self):
+        storage = self.make_storage(batch_size=4)
+
+        await storage.store_processed_data({'INFY': processed(10)})
+        stats = await storage.store_processed_data({'INFY': processed(12, start='2024-01-01 09:20')})
+
+        collection = storage.db['processed_INFY']
+        self.assertEqual(len(collection.docs), 17)
+        self.assertEqual((stats['upserted'], stats['modified']), (7, 5))
+        self.assertEqual(collection.bulk_sizes, [4, 4, 2, 4, 4, 4])
+        self.assertEqual(
+            collection.indexes[0],
+            ([('symbol', 1), ('interval', 1), ('timestamp', 1)], True)
+        )
+
+    async def test_time_series_mode_only_inserts_new_timestamps(self):
+        storage = self.make_storage(time_series=True)
+
+        await storage.store_processed_data({'INFY': processed(10), 'TCS': processed(10)})
+        stats = await storage.store_processed_data({'INFY': processed(12, start='2024-01-01 09:20')})
+
+        collection = storage.db['bars']
+        self.assertEqual(len(collection.rows), 27)
+        self.assertEqual((stats['inserted'], stats['skipped']), (7, 5))
+        self.assertEqual(storage.db.time_series_options['bars']['metaField'], 'meta')
+        self.assertEqual(collection.rows[0]['meta'], {'symbol': 'INFY', 'interval': '1minute'})
+
+    async def test_stream_range_yields_bounded_chunks(self):
+        storage = self.make_storage()
+        await storage.store_processed_data({'INFY': processed(25), 'TCS': processed(5)})
+
+        chunks = [
+            chunk async for chunk in storage.stream_range(
+                ['INFY', 'TCS'], start='2024-01-01 09:17', end='2024-01-01 09:35',
+                fields=['close', 'rsi'], chunk_size=8
+            )
+        ]
+
+        self.assertEqual([len(chunk) for chunk in chunks], [8, 8, 3, 3])
+        self.assertEqual(list(chunks[0].columns), ['symbol', 'timestamp', 'close', 'rsi'])
+        self.assertEqual(chunks[0]['timestamp'].iat[0], pd.Timestamp('2024-01-01 09:17'))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(chunks[0]['timestamp']))
+        self.assertEqual(chunks[-1]['symbol'].iat[0], 'TCS')
+        self.assertEqual(storage.last_read_stats['rows'], 22)
+        self.assertEqual(storage.db['processed_INFY'].indexes[0][1], True)
+
+    async def test_read_range_from_time_series_collection(self):
+        storage = self.make_storage(time_series=True)
+        await storage.store_processed_data({'INFY': processed(10), 'TCS': processed(10)})
+
+        data = await storage.read_range(['INFY', 'NONE'])
+
+        self.assertEqual(list(data), ['INFY'])
+        self.assertEqual(len(data['INFY']), 10)
+        self.assertNotIn('meta', data['INFY'].columns)
+        np.testing.assert_allclose(data['INFY']['close'], processed(10)['close'])
+
+    async def test_legacy_documents_are_backfilled_before_the_unique_index(self):
+        storage = self.make_storage()
+        collection = storage.db['processed_INFY']
+        legacy = processed(5)
+        # The old writer inserted raw records, twice on a re-run
+        await collection.insert_many(legacy.to_dict('records'))
+        await collection.insert_many(legacy.iloc[3:].to_dict('records'))
+
+        await storage.store_processed_data({'INFY': processed(2, start='2024-01-01 09:20')})
+
+        self.assertEqual(len(collection.rows), 5)
+        self.assertEqual({doc['symbol'] for doc in collection.rows}, {'INFY'})
+        self.assertEqual(collection.rows[0]['timestamp'], pd.Timestamp('2024-01-01 09:15').to_pydatetime())
+        self.assertEqual(collection.indexes[0][1], True)
+
+    async def test_legacy_documents_without_datetime_are_kept(self):
+        storage = self.make_storage()
+        collection = storage.db['processed_INFY']
+        await collection.insert_many([{'close': 100.0}, {'close': 101.0}, {'close': 102.0}])
+
+        with self.assertLogs('src.storage', 'WARNING'):
+            await storage.store_processed_data({'INFY': processed(2)})
+
+        self.assertEqual(sorted(doc['close'] for doc in collection.rows), [100.0, 101.0, 102.0])
+        self.assertTrue(all('timestamp' not in doc for doc in collection.rows))
+        self.assertEqual(collection.indexes[0][1], True)
+
+    async def test_time_series_collection_created_concurrently(self):
+        storage = self.make_storage(time_series=True)
+        storage.db.created_elsewhere.add('bars')
+
+        await asyncio.gather(
+            storage.store_processed_data({'INFY': processed(3)}),
+            storage.store_processed_data({'TCS': processed(3)}),
+        )
+
+        self.assertEqual(len(storage.db['bars'].rows), 6)
+        self.assertEqual(len(storage.db['bars'].indexes), 1)
+
+    def test_documents_match_records(self):
+        df = processed(5)
+        docs = DataStorage.build_documents(df, 'INFY', '1minute')
+
+        for doc, record in zip(docs, df.to_dict('records')):
+            self.assertEqual({k: doc[k] for k in record}, record)
+            self.assertEqual(doc['timestamp'], pd.Timestamp(record['datetime']).to_pydatetime())
+        self.assertIsInstance(docs[0]['volume'], int)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import time
+import unittest
+
+import numpy as np
+
+from aip import ResponseMessage
+from src.tick_stream import TickRingBuffer, TickStream, TickTransport
+
+
+class FakeFeed(TickTransport):
+    """In-process feed that lets tests push ticks and drop the connection."""
+
+    def __init__(self, fail_connects=0):
+        self.subscribed = set()
+        self.connects = 0
+        self.fail_connects = fail_connects
+        self.on_tick = None
+        self.on_disconnect = None
+
+    def connect(self, on_tick, on_disconnect):
+        self.connects += 1
+        if self.connects > 1 and self.fail_connects:
+            self.fail_connects -= 1
+            raise ConnectionError("feed unavailable")
+        self.on_tick = on_tick
+        self.on_disconnect = on_disconnect
+
+    def subscribe(self, symbol):
+        self.subscribed.add(symbol)
+
+    def unsubscribe(self, symbol):
+        self.subscribed.discard(symbol)
+
+    def close(self):
+        self.subscribed.clear()
+
+    def push(self, symbol, price, volume=1.0):
+        if symbol in self.subscribed:
+            self.on_tick(symbol, time.time_ns(), price, volume)
+
+    def drop(self):
+        self.subscribed.clear()
+        self.on_disconnect()
+
+
+class TestTickRingBuffer(unittest.TestCase):
+    def test_wraps_without_reallocating(self):
+        buffer = TickRingBuffer(capacity=4)
+        price = buffer.price
+        for i in range(6):
+            buffer.append(i, float(i), 1.0, i)
+
+        self.assertIs(buffer.price, price)
+        np.testing.assert_array_equal(buffer.latest(3)['price'], [3.0, 4.0, 5.0])
+        columns, seq = buffer.since(0)
+        np.testing.assert_array_equal(columns['price'], [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(seq, 6)
+        self.assertEqual(len(buffer.since(seq)[0]['price']), 0)
+
+
+class TestTickStream(unittest.TestCase):
+    def test_ticks_reach_buffers_and_listeners(self):
+        feed = FakeFeed()
+        stream = TickStream(feed, ['INFY'], capacity=16)
+        seen = []
+        stream.add_listener(lambda symbol, ts, price, volume: seen.append((symbol, price)))
+        stream.start()
+
+        feed.push('INFY', 1500.0)
+        feed.push('INFY', 1501.5)
+        columns, seq = stream.read_new('INFY')
+
+        np.testing.assert_array_equal(columns['price'], [1500.0, 1501.5])
+        self.assertEqual(seen, [('INFY', 1500.0), ('INFY', 1501.5)])
+        self.assertEqual(stream.latency_stats()['ticks'], 2)
+        self.assertGreaterEqual(stream.latency_stats()['mean_us'], 0)
+
+    def test_reconnects_and_resubscribes(self):
+        feed = FakeFeed(fail_connects=1)
+        stream = TickStream(feed, ['INFY', 'TCS'], reconnect_delay=0.01)
+        stream.start()
+
+        with self.assertLogs('src.tick_stream', level='WARNING') as logs:
+            feed.drop()
+        self.assertIn(ResponseMessage.RATE_REFRESH_DISCONNECTED.value, logs.output[0])
+        deadline = time.time() + 2
+        while stream.reconnects == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(stream.reconnects, 1)
+        self.assertEqual(feed.connects, 3)
+        self.assertEqual(feed.subscribed, {'INFY', 'TCS'})
+        feed.push('TCS', 3500.0)
+        self.assertEqual(stream.buffers['TCS'].count, 1)
+        stream.close()
+
+    def test_transport_must_implement_every_method(self):
+        class SubscribeOnly(TickTransport):
+            def subscribe(self, symbol):
+                pass
+
+        with self.assertRaises(TypeError):
+            SubscribeOnly()
+
+
+if __name__ == "__main__":
+    unittest.main()
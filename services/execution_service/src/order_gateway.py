@@ -0,0 +1,406 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from .order_manager import ExecutionClient, Instrument, OrderRecord, instrument_key
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Dispatch order of queued requests; lower goes first."""
+    CANCEL = 0
+    REDUCE = 1
+    NEW = 2
+
+
+class TokenBucket:
+    """Request-rate limiter: `rate` tokens per second, holding at most `capacity`."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'clock')
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, tokens: float) -> float:
+        """Seconds until `tokens` are available (0 if they are now)"""
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def consume(self, tokens: float) -> None:
+        self._refill()
+        self.tokens -= tokens
+
+
+class _Request:
+    """A queued order, cancel or basket."""
+
+    __slots__ = ('priority', 'kind', 'args', 'future', 'cost', 'enqueued_at')
+
+    def __init__(self, priority: Priority, kind: str, args: Any, cost: int, enqueued_at: float):
+        self.priority = priority
+        self.kind = kind
+        self.args = args
+        self.future: Future = Future()
+        self.cost = cost
+        self.enqueued_at = enqueued_at
+
+
+def straddle_legs(stock_code: str, strike_price: float, quantity: int, expiry_date: str,
+                  strategy_type: str = 'long', **order) -> List[Dict[str, Any]]:
+    """Call and put at one strike, bought for 'long' and sold for 'short'"""
+    return strangle_legs(stock_code, strike_price, strike_price, quantity, expiry_date, strategy_type, **order)
+
+
+def strangle_legs(stock_code: str, strike_price_call: float, strike_price_put: float, quantity: int,
+                  expiry_date: str, strategy_type: str = 'long', **order) -> List[Dict[str, Any]]:
+    """Call and put at separate strikes, bought for 'long' and sold for 'short'"""
+    action = 'buy' if strategy_type == 'long' else 'sell'
+    common = dict(stock_code=stock_code, quantity=quantity, expiry_date=expiry_date, action=action,
+                  product='options', exchange_code='NFO', order_type='market', **order)
+    return [
+        dict(common, right='call', strike_price=strike_price_call),
+        dict(common, right='put', strike_price=strike_price_put),
+    ]
+
+
+def four_leg_legs(stock_code: str, quantity: int, expiry_date: str, call_short_strike: float,
+                  put_short_strike: float, call_long_strike: float, put_long_strike: float,
+                  **order) -> List[Dict[str, Any]]:
+    """
+    Short call and put protected by long wings (iron condor)
+
+    The long wings come first, so the basket never holds naked short legs
+    while the rest is in flight.
+    """
+    common = dict(stock_code=stock_code, quantity=quantity, expiry_date=expiry_date,
+                  product='options', exchange_code='NFO', order_type='market', **order)
+    return [
+        dict(common, action='buy', right='call', strike_price=call_long_strike),
+        dict(common, action='buy', right='put', strike_price=put_long_strike),
+        dict(common, action='sell', right='call', strike_price=call_short_strike),
+        dict(common, action='sell', right='put', strike_price=put_short_strike),
+    ]
+
+
+class OrderGateway:
+    """
+    Prioritized, rate-limited front door to an ExecutionClient.
+
+    Requests wait in one heap ordered by (priority, arrival): cancels, then
+    risk-reducing orders, then new entries, first-come first-served within a
+    priority. A single dispatcher sends the head of the heap whenever the
+    token bucket allows, so a cancel that arrives behind a backlog of new
+    orders is the next request sent. New entries also leave `reserve`
+    tokens and `reserve` client workers free, so cancels and reductions are
+    never stuck behind them in the rate limit or the client's thread pool.
+    A basket is one request costing one token per leg, so the throttle never
+    splits it: each leg is sent once the previous one is acknowledged, and
+    the remaining legs are dropped if one is rejected.
+    """
+
+    def __init__(
+        self,
+        client: ExecutionClient,
+        rate: float = 100 / 60,
+        burst: int = 10,
+        reserve: int = 1,
+        position_of: Optional[Callable[[Instrument], float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        history: int = 10000
+    ):
+        """
+        Args:
+            client (ExecutionClient): Sends the orders
+            rate (float): Broker requests per second
+            burst (int): Most requests sent back to back
+            reserve (int): Tokens and workers new entries leave for cancels and reductions
+            position_of (Optional[Callable[[Instrument], float]]): Signed position of an
+                instrument, e.g. PositionBook.position; orders shrinking it are
+                prioritized as risk-reducing
+            clock (Callable[[], float]): Monotonic seconds
+            history (int): Wait-time samples kept per priority
+        """
+        if reserve >= min(burst, client.max_workers):
+            raise ValueError("reserve must be smaller than the burst and the client's workers")
+        self.client = client
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.reserve = reserve
+        self.position_of = position_of
+        self.clock = clock
+        self.waits: Dict[Priority, Deque[float]] = {p: deque(maxlen=history) for p in Priority}
+        self.in_flight = 0
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config, client: Optional[ExecutionClient] = None,
+                    position_of: Optional[Callable[[Instrument], float]] = None) -> 'OrderGateway':
+        """
+        Build a gateway from the `order_gateway` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+            client (Optional[ExecutionClient]): Defaults to ExecutionClient.from_config(config)
+            position_of (Optional[Callable[[Instrument], float]]): Signed position lookup
+        """
+        return cls(
+            client or ExecutionClient.from_config(config),
+            rate=config.get('order_gateway.rate_per_minute', 100) / 60,
+            burst=config.get('order_gateway.burst', 10),
+            reserve=config.get('order_gateway.reserve', 1),
+            position_of=position_of,
+        )
+
+    def start(self) -> 'OrderGateway':
+        if self._thread is None:
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name='order-gateway', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, drain: bool = True) -> None:
+        """
+        Stop the dispatcher
+
+        Args:
+            drain (bool): Send everything queued first; otherwise cancel queued futures
+        """
+        with self._cond:
+            self._closing = True
+            if not drain:
+                while self._heap:
+                    heapq.heappop(self._heap)[2].future.cancel()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'OrderGateway':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _classify(self, order: Dict[str, Any]) -> Priority:
+        """REDUCE if the order shrinks the position in its exact instrument, else NEW"""
+        if self.position_of is None:
+            return Priority.NEW
+        instrument = instrument_key(
+            order['stock_code'], order.get('exchange_code') or self.client.exchange_code,
+            order.get('product') or self.client.product, order.get('expiry_date'),
+            order.get('right'), order.get('strike_price')
+        )
+        position = self.position_of(instrument) or 0
+        action, quantity = order.get('action', 'buy'), order['quantity']
+        if action == 'sell' and 0 < quantity <= position:
+            return Priority.REDUCE
+        if action == 'buy' and 0 < quantity <= -position:
+            return Priority.REDUCE
+        return Priority.NEW
+
+    def _enqueue(self, priority: Priority, kind: str, args: Any, cost: int) -> Future:
+        request = _Request(priority, kind, args, cost, self.clock())
+        with self._cond:
+            if self._closing:
+                raise RuntimeError("Order gateway is closed")
+            heapq.heappush(self._heap, (priority, next(self._seq), request))
+            self._cond.notify()
+        return request.future
+
+    def submit(self, stock_code: str, quantity: int, order_type: str, price: Optional[float] = None,
+               action: str = 'buy', priority: Optional[Priority] = None, **order) -> 'Future[OrderRecord]':
+        """
+        Queue an order; see ExecutionClient.submit for the order arguments
+
+        Args:
+            priority (Optional[Priority]): Overrides classification by position
+
+        Returns:
+            Future[OrderRecord]: Resolves once the broker acknowledges or rejects the order.
+                Cancelling it before dispatch withdraws the order.
+        """
+        self.client.validate(quantity, order_type, action, order.get('product'), order.get('validity'),
+                             order.get('stoploss'), order.get('right'), order.get('strike_price'),
+                             order.get('expiry_date'))
+        order = dict(order, stock_code=stock_code, quantity=quantity, order_type=order_type,
+                     price=price, action=action)
+        if priority is None:
+            priority = self._classify(order)
+        return self._enqueue(priority, 'order', order, 1)
+
+    def cancel(self, order_id: str, exchange_code: Optional[str] = None) -> 'Future[Dict[str, Any]]':
+        """
+        Queue a cancel ahead of every order
+
+        Args:
+            exchange_code (Optional[str]): Defaults to the exchange the order was sent to
+
+        Returns:
+            Future[Dict[str, Any]]: Broker response
+        """
+        return self._enqueue(Priority.CANCEL, 'cancel', (order_id, exchange_code), 1)
+
+    def submit_basket(self, legs: List[Dict[str, Any]], priority: Optional[Priority] = None
+                      ) -> 'Future[List[OrderRecord]]':
+        """
+        Queue a multi-leg order whose legs are sent together
+
+        Args:
+            legs (List[Dict[str, Any]]): ExecutionClient.submit arguments per leg, e.g.
+                from straddle_legs, strangle_legs or four_leg_legs
+            priority (Optional[Priority]): Defaults to REDUCE if every leg reduces, else NEW
+
+        Returns:
+            Future[List[OrderRecord]]: Records of the legs sent, in order; shorter
+                than `legs` if a leg was rejected
+
+        Raises:
+            ValueError: If a leg is invalid or the basket exceeds the burst size
+        """
+        if not legs:
+            raise ValueError("Basket has no legs")
+        limit = min(self.bucket.capacity, self.client.max_workers) - self.reserve
+        if len(legs) > limit:
+            raise ValueError(f"Basket of {len(legs)} legs exceeds the {limit} legs sendable at once")
+        for leg in legs:
+            self.client.validate(leg['quantity'], leg['order_type'], leg.get('action', 'buy'),
+                                 leg.get('product'), leg.get('validity'), leg.get('stoploss'),
+                                 leg.get('right'), leg.get('strike_price'), leg.get('expiry_date'))
+        if priority is None:
+            reduces = all(self._classify(leg) == Priority.REDUCE for leg in legs)
+            priority = Priority.REDUCE if reduces else Priority.NEW
+        return self._enqueue(priority, 'basket', [dict(leg) for leg in legs], len(legs))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        if self._closing:
+                            return
+                        self._cond.wait()
+                        continue
+                    request = self._heap[0][2]
+                    reserve = self.reserve if request.priority == Priority.NEW else 0
+                    if self.in_flight + request.cost + reserve > self.client.max_workers:
+                        self._cond.wait()
+                        continue
+                    delay = self.bucket.delay(request.cost + reserve)
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                    heapq.heappop(self._heap)
+                    if not request.future.set_running_or_notify_cancel():
+                        continue
+                    self.bucket.consume(request.cost)
+                    self.in_flight += request.cost
+                    self.waits[request.priority].append(self.clock() - request.enqueued_at)
+                    break
+            self._dispatch(request)
+
+    def _release(self, slots: int) -> None:
+        with self._cond:
+            self.in_flight -= slots
+            self._cond.notify()
+
+    def _dispatch(self, request: _Request) -> None:
+        if request.kind == 'basket':
+            self._send_leg(request, [], 0)
+            return
+        try:
+            if request.kind == 'cancel':
+                inner = self.client.cancel(*request.args)
+            else:
+                inner = self.client.submit(**request.args)
+        except Exception as e:
+            logger.error(f"Dispatching {request.kind} failed: {e}")
+            self._release(1)
+            request.future.set_exception(e)
+            return
+
+        def finished(future: Future) -> None:
+            self._release(1)
+            if future.exception() is not None:
+                request.future.set_exception(future.exception())
+            else:
+                request.future.set_result(future.result())
+
+        inner.add_done_callback(finished)
+
+    def _send_leg(self, request: _Request, records: List[OrderRecord], leg: int) -> None:
+        legs = request.args
+        try:
+            inner = self.client.submit(**legs[leg])
+        except Exception as e:
+            logger.error(f"Dispatching basket leg {leg + 1} of {len(legs)} failed: {e}")
+            self._release(len(legs) - leg)
+            request.future.set_exception(e)
+            return
+
+        def finished(future: Future) -> None:
+            self._release(1)
+            if future.exception() is not None:
+                self._release(len(legs) - leg - 1)
+                request.future.set_exception(future.exception())
+                return
+            records.append(future.result())
+            if leg + 1 == len(legs):
+                request.future.set_result(records)
+            elif records[-1].status != 'acknowledged':
+                logger.warning(
+                    f"Basket stopped after leg {leg + 1} of {len(legs)} was {records[-1].status}: {records[-1].error}"
+                )
+                self._release(len(legs) - leg - 1)
+                request.future.set_result(records)
+            else:
+                self._send_leg(request, records, leg + 1)
+
+        inner.add_done_callback(finished)
+
+    def pending(self) -> Dict[str, int]:
+        """Queued requests per priority"""
+        with self._cond:
+            counts = {p.name.lower(): 0 for p in Priority}
+            for priority, _, _ in self._heap:
+                counts[Priority(priority).name.lower()] += 1
+        return counts
+
+    def wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Queue wait (enqueue to dispatch) per priority, in milliseconds
+
+        Returns:
+            Dict[str, Dict[str, float]]: count, p50_ms, p95_ms and max_ms per priority
+        """
+        stats = {}
+        for priority, samples in self.waits.items():
+            ms = np.array(samples) * 1000
+            stats[priority.name.lower()] = {
+                'count': len(ms),
+                'p50_ms': float(np.percentile(ms, 50)) if len(ms) else 0.0,
+                'p95_ms': float(np.percentile(ms, 95)) if len(ms) else 0.0,
+                'max_ms': float(ms.max()) if len(ms) else 0.0,
+            }
+        return stats
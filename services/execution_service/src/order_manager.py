@@ -1,11 +1,640 @@
-from .breeze_connector import initialize_breeze
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
 
-def place_order(stock_code, quantity, order_type, price=None):
-    breeze = initialize_breeze()
-    order = breeze.place_order(
-        stock_code=stock_code,
-        quantity=quantity,
-        order_type=order_type,
-        price=price
+import numpy as np
+
+from aip import ACTION_TYPES, ORDER_TYPES, PRODUCT_TYPES, VALIDITY_TYPES, ExceptionMessage, ResponseMessage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Broker order states after which no fill can follow
+FILLED_STATES = {'executed', 'complete', 'filled'}
+DEAD_STATES = {'cancelled', 'rejected', 'expired'}
+
+
+def breeze_login() -> Any:
+    """
+    Create an authenticated BreezeConnect client from environment credentials
+
+    Returns:
+        BreezeConnect: Client with a generated session
+
+    Raises:
+        ValueError: If BREEZE_API_KEY, BREEZE_API_SECRET or BREEZE_SESSION_TOKEN is missing
+    """
+    # Imported here: the SDK downloads the security master when imported
+    from breeze_connect import BreezeConnect
+
+    api_key = os.getenv('BREEZE_API_KEY')
+    api_secret = os.getenv('BREEZE_API_SECRET')
+    session_token = os.getenv('BREEZE_SESSION_TOKEN')
+    if not all([api_key, api_secret, session_token]):
+        raise ValueError(
+            "Missing required environment variables: BREEZE_API_KEY, BREEZE_API_SECRET, BREEZE_SESSION_TOKEN"
+        )
+    api = BreezeConnect(api_key=api_key)
+    api.generate_session(api_secret=api_secret, session_token=session_token)
+    return api
+
+
+def _funds_probe(api: Any) -> bool:
+    response = api.get_funds()
+    return bool(response) and response.get('Status') == 200
+
+
+class BrokerSession:
+    """
+    One authenticated broker session shared by every order.
+
+    The session is created on first use and re-created shortly before it
+    expires, after a failed health probe, or after an order call raised.
+    Login is serialized, so concurrent orders never trigger parallel logins.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any] = breeze_login,
+        ttl_seconds: float = 24 * 3600,
+        refresh_margin: float = 600,
+        health_interval: float = 60,
+        probe: Callable[[Any], bool] = _funds_probe,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            connect (Callable[[], Any]): Returns a freshly authenticated API client
+            ttl_seconds (float): Lifetime of a session token
+            refresh_margin (float): Seconds before expiry to log in again
+            health_interval (float): Seconds between health probes
+            probe (Callable[[Any], bool]): Cheap authenticated call, True when healthy
+            clock (Callable[[], float]): Monotonic seconds
+        """
+        self.connect = connect
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.health_interval = health_interval
+        self.probe = probe
+        self.clock = clock
+        self.api: Any = None
+        self.expires_at = 0.0
+        self.checked_at = 0.0
+        self.stats = {'logins': 0, 'login_failures': 0, 'health_checks': 0, 'health_failures': 0}
+        self._lock = threading.Lock()
+
+    def _login(self) -> None:
+        started = self.clock()
+        try:
+            api = self.connect()
+        except Exception as e:
+            self.stats['login_failures'] += 1
+            logger.error(f"{ExceptionMessage.AUTHENICATION_EXCEPTION.value}: {e}")
+            raise
+        self.api = api
+        self.expires_at = started + self.ttl_seconds
+        self.checked_at = self.clock()
+        self.stats['logins'] += 1
+        logger.info(f"Broker session established in {(self.checked_at - started) * 1000:.0f}ms")
+
+    def client(self) -> Any:
+        """
+        The authenticated API client, logging in first if needed
+
+        Returns:
+            Any: API client
+        """
+        api = self.api
+        if api is not None and self.clock() < self.expires_at - self.refresh_margin:
+            return api
+        with self._lock:
+            if self.api is None or self.clock() >= self.expires_at - self.refresh_margin:
+                self._login()
+            return self.api
+
+    def invalidate(self) -> None:
+        """Force a fresh login on next use"""
+        self.api = None
+
+    def maintain(self) -> None:
+        """
+        Refresh a session near expiry and probe an idle one; run periodically off the order path
+        """
+        if self.api is None:
+            return
+        if self.clock() >= self.expires_at - self.refresh_margin:
+            self.client()
+            return
+        if self.clock() - self.checked_at < self.health_interval:
+            return
+        self.stats['health_checks'] += 1
+        try:
+            healthy = self.probe(self.api)
+        except Exception as e:
+            logger.warning(f"Broker health probe failed: {e}")
+            healthy = False
+        self.checked_at = self.clock()
+        if not healthy:
+            self.stats['health_failures'] += 1
+            logger.warning("Broker session unhealthy, logging in again")
+            with self._lock:
+                self._login()
+
+
+class Instrument(NamedTuple):
+    """A tradable contract; option legs of one underlying are distinct instruments."""
+    stock_code: str
+    exchange_code: str = 'NSE'
+    product: str = 'cash'
+    expiry_date: str = ''
+    right: str = ''
+    strike_price: float = 0.0
+
+
+def _expiry_day(value: Any) -> str:
+    """ISO date of an expiry given as ISO8601 (orders) or DD-Mon-YYYY (portfolio rows)"""
+    text = str(value).strip()
+    for parse in (lambda t: datetime.fromisoformat(t.replace('Z', '+00:00')),
+                  lambda t: datetime.strptime(t, '%d-%b-%Y')):
+        try:
+            return parse(text).date().isoformat()
+        except ValueError:
+            continue
+    return text
+
+
+def instrument_key(stock_code: str, exchange_code: Optional[str] = 'NSE', product: Optional[str] = 'cash',
+                   expiry_date: Any = None, right: Optional[str] = None, strike_price: Any = None) -> Instrument:
+    """
+    Normalized instrument of an order, fill or broker position
+
+    Expiry applies to futures and options, right and strike to options only,
+    so an equity order and its portfolio row build the same key whatever
+    placeholder values the broker fills in.
+
+    Returns:
+        Instrument: Key shared by OrderRecord, PositionBook and OrderGateway
+    """
+    product = (product or 'cash').lower()
+    derivative = product in ('futures', 'options')
+    option = product == 'options'
+    return Instrument(
+        stock_code,
+        (exchange_code or 'NSE').upper(),
+        product,
+        _expiry_day(expiry_date) if derivative and expiry_date else '',
+        str(right).lower() if option and right else '',
+        float(strike_price) if option and strike_price not in (None, '') else 0.0,
+    )
+
+
+class OrderRecord:
+    """One order and its client-side, acknowledgement and fill timestamps."""
+
+    __slots__ = (
+        'client_id', 'stock_code', 'action', 'quantity', 'order_type', 'price',
+        'exchange_code', 'product', 'expiry_date', 'right', 'strike_price',
+        'order_id', 'status', 'response', 'error', 'fill_price',
+        'queued_at', 'sent_at', 'acked_at', 'filled_at',
     )
-    return order
+
+    def __init__(self, client_id: int, stock_code: str, action: str, quantity: int,
+                 order_type: str, price: Optional[float], queued_at: float,
+                 exchange_code: str = 'NSE', product: str = 'cash', expiry_date: Optional[str] = None,
+                 right: Optional[str] = None, strike_price: Optional[float] = None):
+        self.client_id = client_id
+        self.stock_code = stock_code
+        self.action = action
+        self.quantity = quantity
+        self.order_type = order_type
+        self.price = price
+        self.exchange_code = exchange_code
+        self.product = product
+        self.expiry_date = expiry_date
+        self.right = right
+        self.strike_price = strike_price
+        self.order_id: Optional[str] = None
+        self.status = 'queued'
+        self.response: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.fill_price: Optional[float] = None
+        self.queued_at = queued_at
+        self.sent_at: Optional[float] = None
+        self.acked_at: Optional[float] = None
+        self.filled_at: Optional[float] = None
+
+    @property
+    def ack_latency(self) -> Optional[float]:
+        """Seconds from the request leaving the client to the broker's reply"""
+        return None if self.acked_at is None else self.acked_at - self.sent_at
+
+    @property
+    def fill_latency(self) -> Optional[float]:
+        """Seconds from the submit call to the observed fill"""
+        return None if self.filled_at is None else self.filled_at - self.queued_at
+
+    @property
+    def instrument(self) -> Instrument:
+        return instrument_key(self.stock_code, self.exchange_code, self.product,
+                              self.expiry_date, self.right, self.strike_price)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ExecutionClient:
+    """
+    Asynchronous order submission over one persistent broker session.
+
+    `submit` validates an order and hands it to a small thread pool, so the
+    caller gets a Future immediately and many orders are in flight at once
+    over the shared session. A background thread keeps the session
+    refreshed and health-checked between orders. Every order records when it
+    was queued, sent, acknowledged and filled; fills come from `poll_fills`
+    or from broker order notifications passed to `on_order_update`.
+    """
+
+    def __init__(
+        self,
+        session: Optional[BrokerSession] = None,
+        max_workers: int = 8,
+        exchange_code: str = 'NSE',
+        product: str = 'cash',
+        validity: str = 'day',
+        maintain_interval: float = 30.0,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        """
+        Args:
+            session (Optional[BrokerSession]): Shared broker session
+            max_workers (int): Orders in flight at once
+            exchange_code (str): Default exchange
+            product (str): Default product, one of aip.PRODUCT_TYPES
+            validity (str): Default validity, one of aip.VALIDITY_TYPES
+            maintain_interval (float): Seconds between background session checks
+            clock (Callable[[], float]): Seconds timer for order timestamps
+        """
+        self.session = session or BrokerSession()
+        self.max_workers = max_workers
+        self.exchange_code = exchange_code
+        self.product = product
+        self.validity = validity
+        self.maintain_interval = maintain_interval
+        self.clock = clock
+        self.orders: Dict[int, OrderRecord] = {}
+        self._by_order_id: Dict[str, OrderRecord] = {}
+        self.fill_listeners: List[Callable[[OrderRecord], None]] = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='orders')
+        self._stop = threading.Event()
+        self._maintainer: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config) -> 'ExecutionClient':
+        """
+        Build a client from the `execution` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        session = BrokerSession(
+            ttl_seconds=config.get('execution.session_ttl_hours', 24) * 3600,
+            refresh_margin=config.get('execution.refresh_margin_seconds', 600),
+            health_interval=config.get('execution.health_interval_seconds', 60),
+        )
+        return cls(
+            session=session,
+            max_workers=config.get('execution.max_workers', 8),
+            exchange_code=config.get('execution.exchange_code', 'NSE'),
+            product=config.get('execution.product', 'cash'),
+            validity=config.get('execution.validity', 'day'),
+        )
+
+    def start(self) -> 'ExecutionClient':
+        """Log in now and start the background session maintenance"""
+        self.session.client()
+        if self._maintainer is None:
+            self._stop.clear()
+            self._maintainer = threading.Thread(target=self._maintain, name='broker-session', daemon=True)
+            self._maintainer.start()
+        return self
+
+    def _maintain(self) -> None:
+        while not self._stop.wait(self.maintain_interval):
+            try:
+                self.session.maintain()
+            except Exception as e:
+                logger.error(f"Broker session maintenance failed: {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._maintainer is not None:
+            self._maintainer.join()
+            self._maintainer = None
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'ExecutionClient':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def validate(
+        self,
+        quantity: int,
+        order_type: str,
+        action: str = 'buy',
+        product: Optional[str] = None,
+        validity: Optional[str] = None,
+        stoploss: Optional[float] = None,
+        right: Optional[str] = None,
+        strike_price: Optional[float] = None,
+        expiry_date: Optional[str] = None
+    ) -> None:
+        """
+        Check an order against the Breeze vocabulary without sending it
+
+        Raises:
+            ValueError: On an invalid action, order type, product, validity,
+                quantity or an incomplete option contract
+        """
+        product = product or self.product
+        validity = validity or self.validity
+        if action not in ACTION_TYPES:
+            raise ValueError(ResponseMessage.ACTION_TYPE_ERROR.value)
+        if order_type not in ORDER_TYPES:
+            raise ValueError(ResponseMessage.ORDER_TYPE_ERROR.value)
+        if product not in PRODUCT_TYPES:
+            raise ValueError(ResponseMessage.PRODUCT_TYPE_ERROR.value)
+        if validity not in VALIDITY_TYPES:
+            raise ValueError(ResponseMessage.VALIDITY_TYPE_ERROR.value)
+        if not quantity or quantity <= 0:
+            raise ValueError(ResponseMessage.BLANK_QUANTITY.value)
+        if order_type == 'stoploss' and stoploss is None:
+            raise ValueError(ResponseMessage.STOP_LOSS_TRIGGER.value)
+        if product in ('options', 'optionplus'):
+            if right not in ('call', 'put', 'others'):
+                raise ValueError(ResponseMessage.RIGHT_TYPE_ERROR.value)
+            if strike_price is None:
+                raise ValueError(ResponseMessage.BLANK_STRIKE_PRICE.value)
+        if product in ('futures', 'futureplus', 'options', 'optionplus') and not expiry_date:
+            raise ValueError(ResponseMessage.BLANK_EXPIRY_DATE.value)
+
+    def submit(
+        self,
+        stock_code: str,
+        quantity: int,
+        order_type: str,
+        price: Optional[float] = None,
+        action: str = 'buy',
+        product: Optional[str] = None,
+        validity: Optional[str] = None,
+        stoploss: Optional[float] = None,
+        exchange_code: Optional[str] = None,
+        right: Optional[str] = None,
+        strike_price: Optional[float] = None,
+        expiry_date: Optional[str] = None
+    ) -> 'Future[OrderRecord]':
+        """
+        Validate an order and send it without waiting for the broker
+
+        Args:
+            stock_code (str): Broker stock code
+            quantity (int): Shares or contracts
+            order_type (str): One of aip.ORDER_TYPES
+            price (Optional[float]): Limit price
+            action (str): One of aip.ACTION_TYPES
+            product (Optional[str]): One of aip.PRODUCT_TYPES; defaults to the client's
+            validity (Optional[str]): One of aip.VALIDITY_TYPES; defaults to the client's
+            stoploss (Optional[float]): Trigger price of stoploss orders
+            exchange_code (Optional[str]): Defaults to the client's
+            right (Optional[str]): 'call' or 'put' for options
+            strike_price (Optional[float]): Strike of options
+            expiry_date (Optional[str]): ISO8601 expiry of futures and options
+
+        Returns:
+            Future[OrderRecord]: Resolves once the broker acknowledges or rejects the order
+
+        Raises:
+            ValueError: If validate() rejects the order
+        """
+        product = product or self.product
+        validity = validity or self.validity
+        exchange_code = exchange_code or self.exchange_code
+        self.validate(quantity, order_type, action, product, validity, stoploss, right, strike_price, expiry_date)
+
+        with self._lock:
+            client_id = self._next_id
+            self._next_id += 1
+            record = OrderRecord(client_id, stock_code, action, quantity, order_type, price, self.clock(),
+                                 exchange_code, product, expiry_date, right, strike_price)
+            self.orders[client_id] = record
+
+        request = {
+            'stock_code': stock_code,
+            'exchange_code': exchange_code,
+            'product': product,
+            'action': action,
+            'order_type': order_type,
+            'quantity': str(quantity),
+            'price': '' if price is None else str(price),
+            'stoploss': '' if stoploss is None else str(stoploss),
+            'validity': validity,
+        }
+        if expiry_date:
+            request['expiry_date'] = expiry_date
+        if right:
+            request['right'] = right
+        if strike_price is not None:
+            request['strike_price'] = str(strike_price)
+        return self._executor.submit(self._send, record, request)
+
+    def cancel(self, order_id: str, exchange_code: Optional[str] = None) -> 'Future[Dict[str, Any]]':
+        """
+        Cancel an open order without waiting for the broker
+
+        Args:
+            exchange_code (Optional[str]): Defaults to the exchange the order was
+                sent to (e.g. NFO for option legs), or the client's for unknown orders
+
+        Returns:
+            Future[Dict[str, Any]]: Broker response
+        """
+        if not order_id:
+            raise ValueError(ResponseMessage.BLANK_ORDER_ID.value)
+        if exchange_code is None:
+            record = self._by_order_id.get(str(order_id))
+            exchange_code = record.exchange_code if record is not None else self.exchange_code
+        return self._executor.submit(self._send_cancel, str(order_id), exchange_code)
+
+    def _send_cancel(self, order_id: str, exchange_code: str) -> Dict[str, Any]:
+        try:
+            response = self.session.client().cancel_order(exchange_code=exchange_code, order_id=order_id)
+        except Exception:
+            self.session.invalidate()
+            raise
+        record = self._by_order_id.get(order_id)
+        if record is not None and response and response.get('Status') == 200 and record.status == 'acknowledged':
+            record.status = 'cancelled'
+        return response
+
+    async def asubmit(self, *args, **kwargs) -> OrderRecord:
+        """Awaitable form of submit"""
+        return await asyncio.wrap_future(self.submit(*args, **kwargs))
+
+    def _send(self, record: OrderRecord, request: Dict[str, str]) -> OrderRecord:
+        try:
+            api = self.session.client()
+            record.sent_at = self.clock()
+            record.status = 'sent'
+            response = api.place_order(**request)
+        except Exception as e:
+            # Not retried: the order may have reached the exchange
+            record.acked_at = self.clock()
+            record.status = 'failed'
+            record.error = str(e)
+            self.session.invalidate()
+            logger.error(f"Order {record.client_id} ({record.stock_code}) failed: {e}")
+            return record
+
+        record.acked_at = self.clock()
+        record.response = response
+        success = (response or {}).get('Success')
+        if response and response.get('Status') == 200 and success:
+            record.order_id = str(success.get('order_id')) if isinstance(success, dict) else None
+            record.status = 'acknowledged'
+            if record.order_id:
+                with self._lock:
+                    self._by_order_id[record.order_id] = record
+        else:
+            record.status = 'rejected'
+            record.error = (response or {}).get('Error') or 'No response'
+            logger.warning(f"Order {record.client_id} ({record.stock_code}) rejected: {record.error}")
+        return record
+
+    def record_fill(self, order_id: str, price: Optional[float] = None, at: Optional[float] = None) -> Optional[OrderRecord]:
+        """
+        Mark an acknowledged order filled
+
+        Returns:
+            Optional[OrderRecord]: The order, or None if it is not one of ours
+        """
+        with self._lock:
+            # Polling and the order stream may report the same fill at once;
+            # only the first marks it, so listeners see each fill once
+            record = self._by_order_id.get(str(order_id))
+            if record is None or record.filled_at is not None:
+                return record
+            record.filled_at = self.clock() if at is None else at
+            record.fill_price = price
+            record.status = 'filled'
+        for listener in self.fill_listeners:
+            try:
+                listener(record)
+            except Exception as e:
+                logger.error(f"Fill listener failed for order {record.order_id}: {e}")
+        return record
+
+    def on_order_update(self, update: Dict[str, Any]) -> Optional[OrderRecord]:
+        """
+        Handler for broker order notifications, e.g. from the Breeze order stream
+
+        Args:
+            update (Dict[str, Any]): Notification with an order id and status
+
+        Returns:
+            Optional[OrderRecord]: The updated order, if it is one of ours
+        """
+        order_id = update.get('order_id') or update.get('orderReference')
+        status = str(update.get('status') or update.get('orderStatus') or '').lower()
+        if order_id is None:
+            return None
+        if status in FILLED_STATES:
+            price = update.get('average_price') or update.get('averageExecutedRate')
+            return self.record_fill(order_id, float(price) if price else None)
+        record = self._by_order_id.get(str(order_id))
+        if record is not None and status in DEAD_STATES:
+            record.status = status
+        return record
+
+    def open_orders(self) -> List[OrderRecord]:
+        return [record for record in self._by_order_id.values() if record.status == 'acknowledged']
+
+    def poll_fills(self, records: Optional[Iterable[OrderRecord]] = None) -> int:
+        """
+        Query order details of open orders concurrently and record fills
+
+        Returns:
+            int: Orders newly marked filled
+        """
+        records = list(self.open_orders() if records is None else records)
+        api = self.session.client()
+
+        def detail(record: OrderRecord) -> Optional[Dict[str, Any]]:
+            response = api.get_order_detail(exchange_code=record.exchange_code, order_id=record.order_id)
+            rows = (response or {}).get('Success') or []
+            return rows[0] if rows else None
+
+        filled = 0
+        for record, row in zip(records, self._executor.map(detail, records)):
+            if row is None:
+                continue
+            before = record.filled_at
+            self.on_order_update({'order_id': record.order_id, **row})
+            filled += before is None and record.filled_at is not None
+        return filled
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """
+        Milliseconds per stage over every order so far
+
+        Returns:
+            Dict[str, Any]: Order counts by status and p50/p95/max of client
+                overhead (queued to sent), acknowledgement and fill latency
+        """
+        records = list(self.orders.values())
+        stats: Dict[str, Any] = {'orders': len(records)}
+        for record in records:
+            stats[record.status] = stats.get(record.status, 0) + 1
+        stages = {
+            'client': [r.sent_at - r.queued_at for r in records if r.sent_at is not None],
+            'ack': [r.ack_latency for r in records if r.ack_latency is not None],
+            'fill': [r.fill_latency for r in records if r.fill_latency is not None],
+        }
+        for stage, values in stages.items():
+            if values:
+                ms = np.array(values) * 1000
+                stats[f'{stage}_p50_ms'] = float(np.percentile(ms, 50))
+                stats[f'{stage}_p95_ms'] = float(np.percentile(ms, 95))
+                stats[f'{stage}_max_ms'] = float(ms.max())
+        stats['session'] = dict(self.session.stats)
+        return stats
+
+
+_default_client: Optional[ExecutionClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> ExecutionClient:
+    """Process-wide ExecutionClient, started on first use"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = ExecutionClient().start()
+        return _default_client
+
+
+def place_order(stock_code, quantity, order_type, price=None):
+    """
+    Place a buy order over the shared session and wait for the broker's reply
+
+    Returns:
+        Dict[str, Any]: Broker response, or None if the request failed
+    """
+    return get_client().submit(stock_code, quantity, order_type, price=price).result().response
@@ -0,0 +1,334 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+import numpy as np
+
+from aip import APIEndPoint, ResponseMessage
+
+from .order_manager import Instrument, OrderRecord, instrument_key
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_portfolio_positions(response: Optional[Dict[str, Any]]) -> Dict[Instrument, Dict[str, float]]:
+    """
+    Net quantity and average price per instrument from a portfolio positions response
+
+    Args:
+        response (Optional[Dict[str, Any]]): Reply of get_portfolio_positions
+
+    Returns:
+        Dict[Instrument, Dict[str, float]]: {'quantity', 'average_price'} by instrument; sells are negative
+
+    Raises:
+        RuntimeError: If the broker did not answer successfully
+    """
+    if not response or response.get('Status') != 200:
+        raise RuntimeError(f"{APIEndPoint.PORTFOLIO_POSITION.value} failed: {(response or {}).get('Error')}")
+    positions: Dict[Instrument, Dict[str, float]] = {}
+    for row in response.get('Success') or []:
+        quantity = float(row.get('quantity') or 0)
+        if str(row.get('action', 'buy')).lower() == 'sell':
+            quantity = -quantity
+        price = float(row.get('average_price') or 0)
+        instrument = instrument_key(
+            row['stock_code'], row.get('exchange_code'), row.get('product_type') or row.get('product'),
+            row.get('expiry_date'), row.get('right'), row.get('strike_price')
+        )
+        entry = positions.setdefault(instrument, {'quantity': 0.0, 'cost': 0.0})
+        entry['quantity'] += quantity
+        entry['cost'] += quantity * price
+    return {
+        instrument: {
+            'quantity': entry['quantity'],
+            'average_price': entry['cost'] / entry['quantity'] if entry['quantity'] else 0.0,
+        }
+        for instrument, entry in positions.items()
+    }
+
+
+class PositionBook:
+    """
+    Positions and PnL per instrument in flat arrays indexed by instrument.
+
+    Instruments are keyed by stock code, exchange, product, expiry, right and
+    strike (see instrument_key), so each option leg is its own position.
+    Where an instrument is expected a bare stock code means the NSE cash
+    equity.
+
+    A fill touches one slot of each array, so it costs the same however many
+    instruments are held; marking every position to market is one
+    vectorized expression over a price vector in the same index order.
+    A background reconciler compares the book with the broker's portfolio
+    positions and corrects quantity and average price where they disagree;
+    the broker is queried outside the book's lock so fills never wait on it,
+    and instruments filled while the query was in flight are left for the
+    next round.
+    """
+
+    def __init__(self, capacity: int = 256):
+        """
+        Args:
+            capacity (int): Initial number of instrument slots; grows as needed
+        """
+        self.index: Dict[Instrument, int] = {}
+        self.instruments: List[Instrument] = []
+        self.quantity = np.zeros(capacity)
+        self.average_price = np.zeros(capacity)
+        self.realized = np.zeros(capacity)
+        self.last_price = np.full(capacity, np.nan)
+        self.fill_seq = np.zeros(capacity, dtype=np.int64)
+        self.fills = 0
+        self.stats = {'reconciles': 0, 'breaks': 0, 'skipped': 0, 'reconcile_errors': 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reconciler: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config) -> 'PositionBook':
+        """
+        Build a book from the `position_book` section of a ConfigManager, restoring saved state
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        path = config.get('position_book.state_path')
+        if path and os.path.exists(path):
+            return cls.load(path)
+        return cls(capacity=config.get('position_book.capacity', 256))
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self.quantity)
+        for name, fill in (('quantity', 0.0), ('average_price', 0.0), ('realized', 0.0),
+                           ('last_price', np.nan), ('fill_seq', 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    @staticmethod
+    def _key(instrument: Union[Instrument, str]) -> Instrument:
+        return instrument if isinstance(instrument, Instrument) else instrument_key(instrument)
+
+    def slot(self, instrument: Union[Instrument, str]) -> int:
+        """Index of an instrument, allocating one on first use"""
+        instrument = self._key(instrument)
+        i = self.index.get(instrument)
+        if i is None:
+            with self._lock:
+                i = self.index.get(instrument)
+                if i is None:
+                    if len(self.instruments) == len(self.quantity):
+                        self._grow()
+                    i = len(self.instruments)
+                    self.instruments.append(instrument)
+                    self.index[instrument] = i
+        return i
+
+    def apply_fill(self, instrument: Union[Instrument, str], quantity: float, price: float,
+                   fees: float = 0.0) -> float:
+        """
+        Book a fill
+
+        Args:
+            instrument (Union[Instrument, str]): Instrument, or the stock code of an NSE cash equity
+            quantity (float): Signed fill size, positive for buys
+            price (float): Fill price
+            fees (float): Charges, deducted from realized PnL
+
+        Returns:
+            float: Realized PnL of this fill
+
+        Raises:
+            ValueError: If quantity is zero
+        """
+        if not quantity:
+            raise ValueError(ResponseMessage.BLANK_QUANTITY.value)
+        i = self.slot(instrument)
+        with self._lock:
+            held = self.quantity[i]
+            average = self.average_price[i]
+            realized = -fees
+            after = held + quantity
+            if held == 0 or (held > 0) == (quantity > 0):
+                self.average_price[i] = (held * average + quantity * price) / after
+            else:
+                closed = min(abs(quantity), abs(held))
+                realized += closed * (price - average) * (1 if held > 0 else -1)
+                if after == 0:
+                    self.average_price[i] = 0.0
+                elif (after > 0) != (held > 0):
+                    self.average_price[i] = price
+            self.quantity[i] = after
+            self.realized[i] += realized
+            self.fills += 1
+            self.fill_seq[i] = self.fills
+        return realized
+
+    def on_fill(self, record: OrderRecord) -> None:
+        """ExecutionClient fill listener"""
+        if record.fill_price is None:
+            logger.warning(f"Fill of order {record.order_id} has no price; not booked")
+            return
+        quantity = record.quantity if record.action == 'buy' else -record.quantity
+        self.apply_fill(record.instrument, quantity, record.fill_price)
+
+    def position(self, instrument: Union[Instrument, str]) -> float:
+        """Signed quantity held; usable as OrderGateway's position_of"""
+        i = self.index.get(self._key(instrument))
+        return 0.0 if i is None else float(self.quantity[i])
+
+    def price_vector(self, prices: Mapping[Union[Instrument, str], float]) -> np.ndarray:
+        """Prices by instrument as a vector in book order, NaN where missing"""
+        vector = np.full(len(self.instruments), np.nan)
+        for instrument, price in prices.items():
+            i = self.index.get(self._key(instrument))
+            if i is not None:
+                vector[i] = price
+        return vector
+
+    def mark(self, prices: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Unrealized PnL of every position
+
+        Args:
+            prices (Optional[np.ndarray]): Price per instrument in book order; NaN
+                entries keep the last mark. None re-marks at the last prices.
+
+        Returns:
+            np.ndarray: Unrealized PnL per instrument (NaN if never priced)
+        """
+        n = len(self.instruments)
+        with self._lock:
+            last = self.last_price[:n]
+            if prices is not None:
+                prices = np.asarray(prices, dtype=np.float64)[:n]
+                np.copyto(last, prices, where=~np.isnan(prices))
+            unrealized = self.quantity[:n] * (last - self.average_price[:n])
+        return np.where(self.quantity[:n] == 0, 0.0, unrealized)
+
+    def pnl(self, prices: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: Realized, unrealized (over priced positions) and total PnL
+        """
+        unrealized = float(np.nansum(self.mark(prices)))
+        realized = float(self.realized[:len(self.instruments)].sum())
+        return {'realized': realized, 'unrealized': unrealized, 'total': realized + unrealized}
+
+    def snapshot(self) -> Dict[Instrument, Dict[str, float]]:
+        """Open positions by instrument"""
+        n = len(self.instruments)
+        with self._lock:
+            return {
+                instrument: {
+                    'quantity': float(self.quantity[i]),
+                    'average_price': float(self.average_price[i]),
+                    'realized': float(self.realized[i]),
+                }
+                for i, instrument in enumerate(self.instruments[:n]) if self.quantity[i] != 0
+            }
+
+    def reconcile(self, fetch: Callable[[], Dict[str, Any]], tolerance: float = 1e-9) -> List[Instrument]:
+        """
+        Correct the book where it disagrees with the broker
+
+        Args:
+            fetch (Callable[[], Dict[str, Any]]): Returns a portfolio positions response
+            tolerance (float): Quantity difference treated as agreement
+
+        Returns:
+            List[Instrument]: Instruments whose quantity or average price was corrected
+        """
+        seen = self.fills
+        broker = parse_portfolio_positions(fetch())
+        for instrument in broker:
+            self.slot(instrument)
+        corrected = []
+        with self._lock:
+            for i, instrument in enumerate(self.instruments):
+                if self.fill_seq[i] > seen:
+                    # Filled while the broker was queried: its answer may predate the fill
+                    self.stats['skipped'] += 1
+                    continue
+                target = broker.get(instrument, {'quantity': 0.0, 'average_price': 0.0})
+                if abs(self.quantity[i] - target['quantity']) <= tolerance:
+                    continue
+                logger.warning(
+                    f"Position break in {instrument}: book {self.quantity[i]:g} @ {self.average_price[i]:.2f}, "
+                    f"broker {target['quantity']:g} @ {target['average_price']:.2f}"
+                )
+                self.quantity[i] = target['quantity']
+                self.average_price[i] = target['average_price']
+                corrected.append(instrument)
+            self.stats['reconciles'] += 1
+            self.stats['breaks'] += len(corrected)
+        return corrected
+
+    def start_reconciler(self, fetch: Callable[[], Dict[str, Any]], interval: float = 60.0) -> None:
+        """
+        Reconcile every `interval` seconds on a background thread
+
+        Args:
+            fetch (Callable[[], Dict[str, Any]]): Returns a portfolio positions response,
+                e.g. `lambda: session.client().get_portfolio_positions()`
+            interval (float): Seconds between reconciliations
+        """
+        if self._reconciler is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.reconcile(fetch)
+                except Exception as e:
+                    self.stats['reconcile_errors'] += 1
+                    logger.error(f"Position reconciliation failed: {e}")
+
+        self._reconciler = threading.Thread(target=run, name='position-reconciler', daemon=True)
+        self._reconciler.start()
+
+    def stop_reconciler(self) -> None:
+        self._stop.set()
+        if self._reconciler is not None:
+            self._reconciler.join()
+            self._reconciler = None
+
+    def save(self, path: str) -> None:
+        """Write the book atomically so positions survive restarts"""
+        n = len(self.instruments)
+        tmp = f"{path}.tmp"
+        with self._lock, open(tmp, 'wb') as f:
+            instruments = self.instruments[:n]
+            np.savez(
+                f,
+                **{field: np.array([getattr(instrument, field) for instrument in instruments], dtype=str)
+                   for field in Instrument._fields if field != 'strike_price'},
+                strike_price=np.array([instrument.strike_price for instrument in instruments], dtype=np.float64),
+                quantity=self.quantity[:n],
+                average_price=self.average_price[:n],
+                realized=self.realized[:n],
+                last_price=self.last_price[:n],
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'PositionBook':
+        """Book written by save()"""
+        with np.load(path) as saved:
+            columns = [saved[field].tolist() for field in Instrument._fields]
+            instruments = [Instrument(*fields) for fields in zip(*columns)]
+            book = cls(capacity=max(256, 2 * len(instruments)))
+            for instrument in instruments:
+                book.slot(instrument)
+            n = len(instruments)
+            for name in ('quantity', 'average_price', 'realized', 'last_price'):
+                getattr(book, name)[:n] = saved[name]
+        return book
@@ -0,0 +1,98 @@
+"""
+Compare per-symbol pandas rolling/ewm indicator code with the indicator
+graph, evaluated one indicator at a time and as one shared graph over a
+(time x symbol) panel.
+
+Run from the repository root:
+    python -m services.strategy_service.benchmarks.bench_indicators --bars 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from services.strategy_service.src.indicators import DEFAULT_INDICATORS, IndicatorGraph
+
+
+def make_panel(bars: int, symbols: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (bars, symbols)), axis=0))
+    spread = rng.uniform(0, 0.01, (2, bars, symbols))
+    return {
+        'open': close,
+        'high': close * (1 + spread[0]),
+        'low': close * (1 - spread[1]),
+        'close': close,
+        'volume': rng.integers(100, 10000, (bars, symbols)).astype(np.float64),
+    }
+
+
+def pandas_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """The same indicators written the way DataPreprocessor computes them"""
+    close = df['close']
+    out = pd.DataFrame(index=df.index)
+    out['ema_12'] = close.ewm(span=12, adjust=False).mean()
+    out['ema_26'] = close.ewm(span=26, adjust=False).mean()
+    out['macd'] = out['ema_12'] - out['ema_26']
+    out['macd_signal'] = out['macd'].ewm(span=9, adjust=False).mean()
+    out['macd_hist'] = out['macd'] - out['macd_signal']
+    mid = close.rolling(window=20).mean()
+    std = close.rolling(window=20).std()
+    out['bb_mid_20'] = mid
+    out['bb_upper_20'] = mid + 2 * std
+    out['bb_lower_20'] = mid - 2 * std
+    prev_close = close.shift()
+    true_range = pd.concat(
+        [df['high'] - df['low'], (df['high'] - prev_close).abs(), (df['low'] - prev_close).abs()], axis=1
+    ).max(axis=1)
+    out['atr_14'] = true_range.ewm(alpha=1 / 14, adjust=False).mean()
+    typical = (df['high'] + df['low'] + close) / 3
+    out['vwap'] = (typical * df['volume']).cumsum() / df['volume'].cumsum()
+    low = df['low'].rolling(window=14).min()
+    high = df['high'].rolling(window=14).max()
+    out['stoch_k'] = 100 * (close - low) / (high - low)
+    out['stoch_d'] = out['stoch_k'].rolling(window=3).mean()
+    out['obv'] = (np.sign(close.diff()).fillna(0) * df['volume']).cumsum()
+    out['volatility_20'] = close.pct_change().rolling(window=20).std()
+    return out
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--bars', type=int, default=2000)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 50, 500])
+    args = parser.parse_args()
+
+    shared = IndicatorGraph(*DEFAULT_INDICATORS)
+    separate = [IndicatorGraph(indicator) for indicator in DEFAULT_INDICATORS]
+    print(
+        f"graph nodes: {len(shared.nodes)} shared vs "
+        f"{sum(len(graph.nodes) for graph in separate)} evaluated separately"
+    )
+    print(
+        f"{'symbols':>8} {'pandas (s)':>11} {'separate (s)':>13} {'shared (s)':>11} {'speedup':>8}"
+    )
+    for count in args.symbols:
+        panel = make_panel(args.bars, count)
+        frames = [
+            pd.DataFrame({field: values[:, i] for field, values in panel.items()})
+            for i in range(count)
+        ]
+        baseline = timed(lambda: [pandas_indicators(df) for df in frames])
+        unshared = timed(lambda: [graph.compute(panel) for graph in separate])
+        together = timed(shared.compute, panel)
+        print(
+            f"{count:>8} {baseline:>11.3f} {unshared:>13.3f} {together:>11.3f} "
+            f"{baseline / together:>7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
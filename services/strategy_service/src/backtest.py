@@ -0,0 +1,512 @@
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from aip import ACTION_TYPES, ORDER_TYPES, PRODUCT_TYPES, VALIDITY_TYPES, ResponseMessage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Order vocabulary from aip.py, stored as small integer codes
+MARKET = ORDER_TYPES.index('market')
+LIMIT = ORDER_TYPES.index('limit')
+STOPLOSS = ORDER_TYPES.index('stoploss')
+DAY = VALIDITY_TYPES.index('day')
+IOC = VALIDITY_TYPES.index('ioc')
+VTC = VALIDITY_TYPES.index('vtc')
+
+NS_PER_DAY = 86400 * 10**9
+
+
+class BpsSlippage:
+    """Market and stop fills move against the order by a fixed number of basis points."""
+
+    def __init__(self, bps: float = 2.0):
+        self.rate = bps / 1e4
+
+    def adjust(self, price: float, side: int) -> float:
+        return price * (1.0 + side * self.rate)
+
+
+class PercentCommission:
+    """Brokerage as a fraction of notional, with optional floor and cap per fill."""
+
+    def __init__(self, rate: float = 0.0003, minimum: float = 0.0, maximum: Optional[float] = 20.0):
+        self.rate = rate
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def cost(self, notional: float) -> float:
+        fee = max(notional * self.rate, self.minimum)
+        return fee if self.maximum is None else min(fee, self.maximum)
+
+
+class FixedLatency:
+    """Orders reach the market a fixed delay after the bar that produced them closes."""
+
+    def __init__(self, milliseconds: float = 0.0):
+        self.delay_ns = int(milliseconds * 10**6)
+
+
+class EventQueue:
+    """
+    FIFO ring of order events stored column-wise in preallocated lists.
+
+    Pushing writes into the next free slot and popping only moves the head,
+    so steady-state operation allocates nothing. The ring doubles when full.
+    """
+
+    FIELDS = ('ts', 'order_id', 'symbol', 'side', 'quantity', 'order_type', 'validity', 'price', 'stop', 'day')
+
+    __slots__ = ('capacity', 'head', 'size') + FIELDS
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.head = 0
+        self.size = 0
+        for field in self.FIELDS:
+            setattr(self, field, [0] * capacity)
+
+    def _grow(self) -> None:
+        order = [(self.head + i) % self.capacity for i in range(self.size)]
+        for field in self.FIELDS:
+            column = getattr(self, field)
+            setattr(self, field, [column[i] for i in order] + [0] * self.capacity)
+        self.head = 0
+        self.capacity *= 2
+
+    def push(self, ts, order_id, symbol, side, quantity, order_type, validity, price, stop, day) -> None:
+        if self.size == self.capacity:
+            self._grow()
+        slot = (self.head + self.size) % self.capacity
+        self.ts[slot] = ts
+        self.order_id[slot] = order_id
+        self.symbol[slot] = symbol
+        self.side[slot] = side
+        self.quantity[slot] = quantity
+        self.order_type[slot] = order_type
+        self.validity[slot] = validity
+        self.price[slot] = price
+        self.stop[slot] = stop
+        self.day[slot] = day
+        self.size += 1
+
+    def pop(self) -> int:
+        """Remove the head event and return its slot; read it before the next push."""
+        slot = self.head
+        self.head = (slot + 1) % self.capacity
+        self.size -= 1
+        return slot
+
+    def move_head_to(self, other: 'EventQueue') -> None:
+        slot = self.pop()
+        other.push(
+            self.ts[slot], self.order_id[slot], self.symbol[slot], self.side[slot], self.quantity[slot],
+            self.order_type[slot], self.validity[slot], self.price[slot], self.stop[slot], self.day[slot]
+        )
+
+
+class BarData:
+    """Bars of many symbols as aligned (time x symbol) arrays."""
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        symbols: Sequence[str],
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+        bar_ns: int = 60 * 10**9
+    ):
+        """
+        Args:
+            timestamps (np.ndarray): Bar start as datetime64 or epoch nanoseconds, ascending
+            symbols (Sequence[str]): Column order of the price arrays
+            open, high, low, close, volume (np.ndarray): (time x symbol) values,
+                NaN where a symbol has no bar
+            bar_ns (int): Bar width in nanoseconds
+        """
+        timestamps = np.asarray(timestamps)
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            timestamps = timestamps.astype('datetime64[ns]').view(np.int64)
+        self.timestamps = timestamps.astype(np.int64)
+        self.symbols = list(symbols)
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.close = np.ascontiguousarray(close, dtype=np.float64)
+        self.volume = None if volume is None else np.ascontiguousarray(volume, dtype=np.float64)
+        self.bar_ns = bar_ns
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], bar_ns: int = 60 * 10**9) -> 'BarData':
+        """
+        Align historical candle frames (datetime/open/high/low/close/volume) on time
+
+        Args:
+            frames (Dict[str, pd.DataFrame]): Candles per symbol
+            bar_ns (int): Bar width in nanoseconds
+        """
+        panels = {}
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            panels[field] = pd.concat(
+                {
+                    symbol: df.set_index(pd.to_datetime(df['datetime']))[field].astype(float)
+                    for symbol, df in frames.items()
+                },
+                axis=1
+            ).sort_index()
+        index = panels['close'].index
+        return cls(
+            index.to_numpy(dtype='datetime64[ns]').view(np.int64),
+            list(frames),
+            *(panels[field].to_numpy() for field in ('open', 'high', 'low', 'close', 'volume')),
+            bar_ns=bar_ns,
+        )
+
+
+class BarContext:
+    """What a strategy sees on each bar: the cross-section and an order entry point."""
+
+    __slots__ = ('engine', 'index', 'ts', 'open', 'high', 'low', 'close', 'positions')
+
+    def __init__(self, engine: 'BacktestEngine'):
+        self.engine = engine
+        self.positions = engine.positions
+
+    def order(
+        self,
+        symbol: int,
+        quantity: int,
+        action: str = 'buy',
+        order_type: str = 'market',
+        price: float = 0.0,
+        stoploss: float = 0.0,
+        validity: str = 'day'
+    ) -> int:
+        """
+        Submit an order; it reaches the market after the latency model's delay
+
+        Args:
+            symbol (int): Column of the symbol in BarData.symbols
+            quantity (int): Shares, positive
+            action (str): One of aip.ACTION_TYPES
+            order_type (str): One of aip.ORDER_TYPES
+            price (float): Limit price for limit orders (optional cap for stoploss)
+            stoploss (float): Trigger price for stoploss orders
+            validity (str): One of aip.VALIDITY_TYPES
+
+        Returns:
+            int: Order id
+        """
+        return self.engine.submit(self.index, symbol, quantity, action, order_type, price, stoploss, validity)
+
+    def target(self, targets: np.ndarray) -> None:
+        """
+        Send market orders that move every position to `targets`, counting
+        orders already in flight
+        """
+        delta = np.asarray(targets, dtype=np.int64) - self.positions - self.engine.in_flight
+        for symbol in np.flatnonzero(delta):
+            quantity = int(delta[symbol])
+            self.engine.submit(
+                self.index, int(symbol), abs(quantity), 'buy' if quantity > 0 else 'sell', 'market', 0.0, 0.0, 'day'
+            )
+
+
+class Strategy:
+    """Base class; override on_bar."""
+
+    def on_start(self, data: BarData) -> None:
+        pass
+
+    def on_bar(self, ctx: BarContext) -> None:
+        raise NotImplementedError
+
+
+class MovingAverageCrossStrategy(Strategy):
+    """
+    moving_average_strategy for many symbols at once: hold `quantity` shares
+    while the short average is above the long one, flat otherwise.
+    """
+
+    def __init__(self, short_window: int, long_window: int, quantity: int = 1):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.quantity = quantity
+
+    def on_start(self, data: BarData) -> None:
+        symbols = len(data.symbols)
+        self.last = np.full(symbols, np.nan)
+        self.ring = np.zeros((self.long_window, symbols))
+        self.sum_short = np.zeros(symbols)
+        self.sum_long = np.zeros(symbols)
+        self.count = 0
+
+    def on_bar(self, ctx: BarContext) -> None:
+        n = self.count
+        np.copyto(self.last, ctx.close, where=ctx.close == ctx.close)
+        if n == 0 and np.isnan(self.last).any():
+            return
+        close = self.last
+        slot = n % self.long_window
+        if n >= self.long_window:
+            self.sum_long -= self.ring[slot]
+        if n >= self.short_window:
+            self.sum_short -= self.ring[(n - self.short_window) % self.long_window]
+        self.ring[slot] = close
+        self.sum_short += close
+        self.sum_long += close
+        self.count = n + 1
+
+        if self.count >= self.long_window:
+            signal = self.sum_short * self.long_window > self.sum_long * self.short_window
+            ctx.target(np.where(signal, self.quantity, 0))
+
+
+class BacktestEngine:
+    """
+    Event-driven backtest over BarData.
+
+    Each timestamp the engine (1) moves orders whose latency has elapsed
+    by the bar open into the book, so an order never trades on prices from
+    before it reached the market, (2) matches working orders against the bar (market at
+    the open; limit when the range touches the price; stoploss when the
+    trigger is crossed), (3) marks the portfolio to the close and (4) hands
+    the bar to the strategy, whose orders enter the latency queue.
+
+    Bars are processed as a cross-section per timestamp; orders and fills
+    live in array-backed queues, so the loop allocates almost nothing.
+    Fills are for the full quantity (no volume participation limit).
+    """
+
+    def __init__(
+        self,
+        data: BarData,
+        strategy: Strategy,
+        initial_cash: float = 1_000_000.0,
+        slippage: Optional[BpsSlippage] = None,
+        commission: Optional[PercentCommission] = None,
+        latency: Optional[FixedLatency] = None,
+        product: str = 'cash'
+    ):
+        """
+        Initialize the engine
+
+        Args:
+            data (BarData): Bars to replay
+            strategy (Strategy): Strategy receiving every bar
+            initial_cash (float): Starting cash
+            slippage (Optional[BpsSlippage]): Price impact on market/stop fills
+            commission (Optional[PercentCommission]): Cost per fill
+            latency (Optional[FixedLatency]): Delay between signal and market
+            product (str): One of aip.PRODUCT_TYPES, recorded on every fill
+        """
+        if product not in PRODUCT_TYPES:
+            raise ValueError(ResponseMessage.PRODUCT_TYPE_ERROR.value)
+
+        self.data = data
+        self.strategy = strategy
+        self.initial_cash = initial_cash
+        self.slippage = slippage or BpsSlippage(0.0)
+        self.commission = commission or PercentCommission(0.0, maximum=None)
+        self.latency = latency or FixedLatency(0.0)
+        self.product = product
+
+        symbols = len(data.symbols)
+        self.positions = np.zeros(symbols, dtype=np.int64)
+        self.in_flight = np.zeros(symbols, dtype=np.int64)
+        self.cash = initial_cash
+        self.incoming = EventQueue()
+        self.book = EventQueue()
+        self.next_order_id = 1
+        self.fills: Dict[str, List] = {
+            'ts': [], 'order_id': [], 'symbol': [], 'side': [], 'quantity': [], 'price': [], 'commission': [],
+        }
+        self.counts = {'bars': 0, 'orders': 0, 'fills': 0, 'cancels': 0}
+
+    def submit(
+        self,
+        index: int,
+        symbol: int,
+        quantity: int,
+        action: str,
+        order_type: str,
+        price: float,
+        stoploss: float,
+        validity: str
+    ) -> int:
+        if action not in ACTION_TYPES:
+            raise ValueError(ResponseMessage.ACTION_TYPE_ERROR.value)
+        if order_type not in ORDER_TYPES:
+            raise ValueError(ResponseMessage.ORDER_TYPE_ERROR.value)
+        if validity not in VALIDITY_TYPES:
+            raise ValueError(ResponseMessage.VALIDITY_TYPE_ERROR.value)
+        if quantity <= 0:
+            raise ValueError(ResponseMessage.BLANK_QUANTITY.value)
+
+        side = 1 if action == 'buy' else -1
+        arrives = int(self.data.timestamps[index]) + self.data.bar_ns + self.latency.delay_ns
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        # Day orders expire at the end of the day they reach the market
+        self.incoming.push(
+            arrives, order_id, symbol, side, quantity,
+            ORDER_TYPES.index(order_type), VALIDITY_TYPES.index(validity), price, stoploss, arrives // NS_PER_DAY
+        )
+        self.in_flight[symbol] += side * quantity
+        self.counts['orders'] += 1
+        return order_id
+
+    def _fill(self, ts: int, slot: int, price: float) -> None:
+        book = self.book
+        symbol, side, quantity = book.symbol[slot], book.side[slot], book.quantity[slot]
+        fee = self.commission.cost(price * quantity)
+        self.cash -= side * quantity * price + fee
+        self.positions[symbol] += side * quantity
+        self.in_flight[symbol] -= side * quantity
+
+        fills = self.fills
+        fills['ts'].append(ts)
+        fills['order_id'].append(book.order_id[slot])
+        fills['symbol'].append(symbol)
+        fills['side'].append(side)
+        fills['quantity'].append(quantity)
+        fills['price'].append(price)
+        fills['commission'].append(fee)
+        self.counts['fills'] += 1
+
+    def _match(self, index: int, ts: int) -> None:
+        """Match every working order against bar `index`, keeping the unfilled ones."""
+        book = self.book
+        o, h, l = self.data.open[index], self.data.high[index], self.data.low[index]
+        today = ts // NS_PER_DAY
+
+        for _ in range(book.size):
+            slot = book.pop()
+            symbol = book.symbol[slot]
+            side = book.side[slot]
+            bar_open = o[symbol]
+
+            if book.validity[slot] == DAY and book.day[slot] != today:
+                self._cancel(slot)
+                continue
+            if bar_open != bar_open:  # no bar for this symbol yet
+                book.push(*(getattr(book, field)[slot] for field in EventQueue.FIELDS))
+                continue
+
+            order_type = book.order_type[slot]
+            price = None
+            if order_type == MARKET:
+                price = self.slippage.adjust(bar_open, side)
+            elif order_type == LIMIT:
+                limit = book.price[slot]
+                if side > 0 and l[symbol] <= limit:
+                    price = min(bar_open, limit)
+                elif side < 0 and h[symbol] >= limit:
+                    price = max(bar_open, limit)
+            else:
+                trigger = book.stop[slot]
+                if side > 0 and h[symbol] >= trigger:
+                    price = self.slippage.adjust(max(bar_open, trigger), side)
+                elif side < 0 and l[symbol] <= trigger:
+                    price = self.slippage.adjust(min(bar_open, trigger), side)
+                cap = book.price[slot]
+                if price is not None and cap and side * (price - cap) > 0:
+                    price = None
+
+            if price is not None:
+                self._fill(ts, slot, price)
+            elif book.validity[slot] == IOC:
+                self._cancel(slot)
+            else:
+                book.push(*(getattr(book, field)[slot] for field in EventQueue.FIELDS))
+
+    def _cancel(self, slot: int) -> None:
+        book = self.book
+        self.in_flight[book.symbol[slot]] -= book.side[slot] * book.quantity[slot]
+        self.counts['cancels'] += 1
+
+    def run(self) -> 'BacktestResult':
+        """
+        Replay every bar
+
+        Returns:
+            BacktestResult: Equity curve, fills and event statistics
+        """
+        data = self.data
+        timestamps = data.timestamps
+        close = data.close
+        last_close = np.zeros(len(data.symbols))
+        equity = np.empty(len(timestamps))
+        ctx = BarContext(self)
+        incoming, book = self.incoming, self.book
+
+        self.strategy.on_start(data)
+        started = time.perf_counter()
+
+        for index in range(len(timestamps)):
+            ts = int(timestamps[index])
+
+            while incoming.size and incoming.ts[incoming.head] <= ts:
+                incoming.move_head_to(book)
+            if book.size:
+                self._match(index, ts)
+
+            row = close[index]
+            np.copyto(last_close, row, where=row == row)
+            equity[index] = self.cash + float(self.positions @ last_close)
+
+            ctx.index = index
+            ctx.ts = ts
+            ctx.open = data.open[index]
+            ctx.high = data.high[index]
+            ctx.low = data.low[index]
+            ctx.close = row
+            self.strategy.on_bar(ctx)
+
+        elapsed = time.perf_counter() - started
+        self.counts['bars'] = int(np.isfinite(close).sum())
+        events = sum(self.counts.values())
+        stats = dict(self.counts)
+        stats.update({
+            'events': events,
+            'seconds': elapsed,
+            'events_per_second': events / elapsed if elapsed > 0 else 0.0,
+            'final_equity': float(equity[-1]) if len(equity) else self.initial_cash,
+            'total_return': float(equity[-1] / self.initial_cash - 1) if len(equity) else 0.0,
+            'commission': float(sum(self.fills['commission'])),
+        })
+        logger.info(
+            f"Backtest replayed {events} events in {elapsed:.2f}s "
+            f"({stats['events_per_second']:,.0f} events/sec), return {stats['total_return']:.2%}"
+        )
+        return BacktestResult(self, equity, stats)
+
+
+class BacktestResult:
+    """Output of BacktestEngine.run."""
+
+    def __init__(self, engine: BacktestEngine, equity: np.ndarray, stats: Dict[str, float]):
+        self.symbols = engine.data.symbols
+        self.product = engine.product
+        self.equity = pd.Series(equity, index=pd.to_datetime(engine.data.timestamps), name='equity')
+        self.positions = engine.positions.copy()
+        self.stats = stats
+        self._fills = engine.fills
+
+    def fills(self) -> pd.DataFrame:
+        """
+        Fills with aip vocabulary: stock_code, action, quantity, price, commission, product
+        """
+        df = pd.DataFrame(self._fills)
+        df['datetime'] = pd.to_datetime(df['ts'])
+        df['stock_code'] = [self.symbols[symbol] for symbol in df['symbol']]
+        df['action'] = np.where(df['side'] > 0, 'buy', 'sell')
+        df['product'] = self.product
+        return df[['datetime', 'order_id', 'stock_code', 'action', 'quantity', 'price', 'commission', 'product']]
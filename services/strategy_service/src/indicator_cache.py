@@ -0,0 +1,297 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from .indicators import IndicatorGraph, IndicatorStream, Node
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, Node], ...]]
+
+
+class _Entry:
+    """Cached outputs of one indicator over a prefix of a symbol's bars."""
+
+    __slots__ = ('outputs', 'stream', 'length', 'watermark', 'digest', 'nbytes')
+
+    def __init__(self, outputs: Dict[str, np.ndarray], stream: IndicatorStream, length: int,
+                 watermark: Any, digest: Optional[str]):
+        self.outputs = outputs
+        self.stream = stream
+        self.length = length
+        self.watermark = watermark
+        self.digest = digest
+        self.nbytes = sum(values.nbytes for values in outputs.values())
+        for values in outputs.values():
+            values.flags.writeable = False
+
+
+class IndicatorCache:
+    """
+    Memoized indicator results per (symbol, interval, indicator, params).
+
+    An entry remembers how many bars it covers and how to recognise them: the
+    last covered timestamp when timestamps are given (watermark), otherwise a
+    hash of the covered input values. A request on the same bars is a hit; a
+    request whose first bars match an entry extends it by streaming only the
+    new bars through the entry's primed IndicatorStream; anything else is
+    recomputed. Entries live in a byte-bounded LRU and, when `disk_dir` is
+    set, evicted entries are pickled under `<symbol>/<interval>/` there and
+    promoted again on demand.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_extend: int = 1000):
+        """
+        Args:
+            max_bytes (int): Memory budget for cached output arrays
+            disk_dir (Optional[str]): Directory of the on-disk tier, if any
+            max_extend (int): Most new bars to stream into an entry; longer
+                extensions are recomputed in one batch
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_extend = max_extend
+        self.entries: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+        self.bytes = 0
+        self.counters = {
+            'hits': 0, 'extends': 0, 'misses': 0, 'disk_hits': 0,
+            'invalidations': 0, 'evictions': 0, 'spills': 0,
+        }
+        self._lock = threading.RLock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config) -> 'IndicatorCache':
+        """
+        Build a cache from the `indicator_cache` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(
+            max_bytes=int(config.get('indicator_cache.max_mb', 256)) * 1024 * 1024,
+            disk_dir=config.get('indicator_cache.disk_dir'),
+            max_extend=config.get('indicator_cache.max_extend', 1000),
+        )
+
+    @staticmethod
+    def _key(symbol: str, interval: str, indicator: Mapping[str, Node]) -> CacheKey:
+        return symbol, interval, tuple(sorted(indicator.items()))
+
+    def _disk_dir(self, symbol: Optional[str] = None, interval: Optional[str] = None) -> Path:
+        """Disk tier directory of a symbol and interval; None matches any (as a glob)"""
+        return self.disk_dir / (quote(symbol, safe='') if symbol is not None else '*') / (
+            quote(interval, safe='') if interval is not None else '*'
+        )
+
+    def _disk_path(self, key: CacheKey) -> Path:
+        return self._disk_dir(key[0], key[1]) / f"{hashlib.sha1(repr(key).encode()).hexdigest()}.pkl"
+
+    @staticmethod
+    def _digest(columns: Dict[str, np.ndarray], fields: List[str], length: int) -> str:
+        digest = hashlib.sha1()
+        for field in fields:
+            digest.update(np.ascontiguousarray(columns[field][:length]).tobytes())
+        return digest.hexdigest()
+
+    def _matches(self, entry: _Entry, columns: Dict[str, np.ndarray], fields: List[str],
+                 timestamps: Optional[np.ndarray], length: int) -> bool:
+        if entry.length > length:
+            return False
+        if timestamps is not None:
+            return entry.watermark is not None and timestamps[entry.length - 1] == entry.watermark
+        return entry.digest is not None and entry.digest == self._digest(columns, fields, entry.length)
+
+    def _lookup(self, key: CacheKey) -> Optional[_Entry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            with path.open('rb') as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache file {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        self.counters['disk_hits'] += 1
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key: CacheKey, entry: _Entry) -> None:
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old.nbytes
+        self.entries[key] = entry
+        self.bytes += entry.nbytes
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            evicted_key, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.nbytes
+            self.counters['evictions'] += 1
+            self._spill(evicted_key, evicted)
+
+    def _spill(self, key: CacheKey, entry: _Entry) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with tmp.open('wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.counters['spills'] += 1
+
+    def _extend(self, entry: _Entry, columns: Dict[str, np.ndarray], fields: List[str],
+                timestamps: Optional[np.ndarray], length: int) -> _Entry:
+        tail = {field: columns[field][entry.length:length] for field in fields}
+        new_rows = entry.stream.update_many(tail)
+        outputs = {
+            name: np.concatenate([values, new_rows[name]]) for name, values in entry.outputs.items()
+        }
+        return _Entry(
+            outputs, entry.stream, length,
+            timestamps[length - 1] if timestamps is not None else None,
+            self._digest(columns, fields, length) if timestamps is None else None
+        )
+
+    def get(self, symbol: str, interval: str, data: Mapping[str, Any], *indicators: Mapping[str, Node],
+            timestamps: Optional[Any] = None) -> Dict[str, np.ndarray]:
+        """
+        Indicator values for a symbol's bars, computing only what is not cached
+
+        Args:
+            symbol (str): Stock symbol
+            interval (str): Bar interval, e.g. '1minute'
+            data (Mapping[str, Any]): Input columns (dict of arrays or DataFrame), oldest first
+            *indicators (Mapping[str, Node]): Indicators such as rsi(14) or sma(50)
+            timestamps (Optional[Any]): Bar timestamps; enables watermark validation
+                instead of hashing the inputs
+
+        Returns:
+            Dict[str, np.ndarray]: Read-only output arrays by name
+        """
+        fields = sorted({field for indicator in indicators for field in IndicatorGraph(indicator).fields})
+        columns = {field: np.asarray(data[field], dtype=np.float64) for field in fields}
+        length = len(next(iter(columns.values()))) if columns else 0
+        if timestamps is not None:
+            timestamps = np.asarray(timestamps)
+        if length == 0:
+            return IndicatorGraph(*indicators).compute(columns)
+
+        results: Dict[str, np.ndarray] = {}
+        missing = []
+        with self._lock:
+            for indicator in indicators:
+                key = self._key(symbol, interval, indicator)
+                indicator_fields = IndicatorGraph(indicator).fields
+                entry = self._lookup(key)
+                if entry is not None and self._matches(entry, columns, indicator_fields, timestamps, length):
+                    if entry.length == length:
+                        self.counters['hits'] += 1
+                    elif length - entry.length <= self.max_extend:
+                        entry = self._extend(entry, columns, indicator_fields, timestamps, length)
+                        self._store(key, entry)
+                        self.counters['extends'] += 1
+                    else:
+                        entry = None
+                elif entry is not None:
+                    self.counters['invalidations'] += 1
+                    entry = None
+
+                if entry is None:
+                    missing.append((key, indicator))
+                else:
+                    results.update(entry.outputs)
+
+            if missing:
+                # One graph for every miss, so they share intermediates
+                self.counters['misses'] += len(missing)
+                values = IndicatorGraph(*(indicator for _, indicator in missing)).evaluate(columns)
+                for key, indicator in missing:
+                    graph = IndicatorGraph(indicator)
+                    stream = graph.stream()
+                    stream.prime(values)
+                    entry = _Entry(
+                        {name: values[node] for name, node in graph.outputs.items()},
+                        stream, length,
+                        timestamps[length - 1] if timestamps is not None else None,
+                        self._digest(columns, graph.fields, length) if timestamps is None else None
+                    )
+                    self._store(key, entry)
+                    results.update(entry.outputs)
+        return results
+
+    def get_frame(self, symbol: str, interval: str, df: pd.DataFrame, *indicators: Mapping[str, Node],
+                  time_column: str = 'datetime') -> pd.DataFrame:
+        """
+        DataFrame form of get(), using `time_column` (when present) as the watermark
+
+        Returns:
+            pd.DataFrame: One column per indicator output, indexed like `df`
+        """
+        timestamps = df[time_column].to_numpy() if time_column in df.columns else None
+        results = self.get(symbol, interval, df, *indicators, timestamps=timestamps)
+        return pd.DataFrame(results, index=df.index)
+
+    def invalidate(self, symbol: Optional[str] = None, interval: Optional[str] = None) -> int:
+        """
+        Drop memory and disk entries of a symbol and/or interval (all if neither)
+
+        Returns:
+            int: Memory entries removed
+        """
+        with self._lock:
+            doomed = [
+                key for key in self.entries
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval)
+            ]
+            for key in doomed:
+                self.bytes -= self.entries.pop(key).nbytes
+            if self.disk_dir:
+                # Spilled entries are not in memory, so match them by path
+                pattern = self._disk_dir(symbol, interval).relative_to(self.disk_dir) / '*.pkl'
+                for path in self.disk_dir.glob(str(pattern)):
+                    path.unlink(missing_ok=True)
+        return len(doomed)
+
+    def flush(self) -> None:
+        """Write every memory entry to the disk tier, e.g. at the end of a session"""
+        with self._lock:
+            for key, entry in self.entries.items():
+                self._spill(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Counters, hit rate (hits and extensions over lookups),
+                entries and bytes held in memory and on disk
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            lookups = counters['hits'] + counters['extends'] + counters['misses']
+            disk_bytes = sum(path.stat().st_size for path in self.disk_dir.glob('*/*/*.pkl')) if self.disk_dir else 0
+            counters.update({
+                'lookups': lookups,
+                'hit_rate': (counters['hits'] + counters['extends']) / lookups if lookups else 0.0,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'disk_bytes': disk_bytes,
+            })
+        return counters
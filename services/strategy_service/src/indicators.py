@@ -0,0 +1,742 @@
+import logging
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ArrayLike = Union[float, np.ndarray]
+
+# One computation in the indicator graph. Nodes are plain tuples, so the
+# same computation requested by two indicators is one dict key and is
+# evaluated once.
+Node = namedtuple('Node', ['kind', 'inputs', 'params'])
+
+# Bars between exact recomputations of streaming rolling sums, bounding drift
+RESYNC_EVERY = 1000
+
+
+# --- Node constructors -------------------------------------------------------
+
+def source(field: str) -> Node:
+    """Raw input column, e.g. 'close' or 'volume'"""
+    return Node('source', (), (field,))
+
+
+def prev(x: Node) -> Node:
+    """Value of the previous bar, NaN on the first"""
+    return Node('prev', (x,), ())
+
+
+def diff(x: Node) -> Node:
+    return Node('sub', (x, prev(x)), ())
+
+
+def add(a: Node, b: Node) -> Node:
+    return Node('add', (a, b), ())
+
+
+def sub(a: Node, b: Node) -> Node:
+    return Node('sub', (a, b), ())
+
+
+def mul(a: Node, b: Node) -> Node:
+    return Node('mul', (a, b), ())
+
+
+def div(a: Node, b: Node) -> Node:
+    """a / b, NaN where b is zero"""
+    return Node('div', (a, b), ())
+
+
+def scale(x: Node, factor: float) -> Node:
+    return Node('scale', (x,), (float(factor),))
+
+
+def rolling_sum(x: Node, window: int) -> Node:
+    """Sum of the last `window` bars; NaN until full or if any is NaN"""
+    return Node('sum', (x,), (int(window),))
+
+
+def rolling_mean(x: Node, window: int) -> Node:
+    return scale(rolling_sum(x, window), 1.0 / window)
+
+
+def rolling_std(x: Node, window: int) -> Node:
+    """Sample standard deviation from the windowed sums of x and x**2"""
+    sums = rolling_sum(x, window)
+    squares = rolling_sum(mul(x, x), window)
+    variance = scale(sub(squares, scale(mul(sums, sums), 1.0 / window)), 1.0 / (window - 1))
+    return Node('sqrt', (variance,), ())
+
+
+def rolling_max(x: Node, window: int) -> Node:
+    return Node('max', (x,), (int(window),))
+
+
+def rolling_min(x: Node, window: int) -> Node:
+    return Node('min', (x,), (int(window),))
+
+
+def exponential(x: Node, alpha: float) -> Node:
+    """Recursive average y = y + alpha * (x - y), seeded with the first value"""
+    return Node('ema', (x,), (float(alpha),))
+
+
+def cumulative(x: Node) -> Node:
+    """Running total, treating NaN as zero"""
+    return Node('cumsum', (x,), ())
+
+
+# --- Indicators --------------------------------------------------------------
+# Each returns {output name: node}; pass any number of them to IndicatorGraph.
+
+def sma(window: int = 20, field: str = 'close') -> Dict[str, Node]:
+    return {f'sma_{window}': rolling_mean(source(field), window)}
+
+
+def ema(span: int = 20, field: str = 'close') -> Dict[str, Node]:
+    """Exponential moving average, like pandas ewm(span=span, adjust=False)"""
+    return {f'ema_{span}': exponential(source(field), 2.0 / (span + 1))}
+
+
+def macd(fast: int = 12, slow: int = 26, signal: int = 9, field: str = 'close') -> Dict[str, Node]:
+    close = source(field)
+    line = sub(exponential(close, 2.0 / (fast + 1)), exponential(close, 2.0 / (slow + 1)))
+    signal_line = exponential(line, 2.0 / (signal + 1))
+    return {
+        f'macd_{fast}_{slow}': line,
+        f'macd_signal_{fast}_{slow}_{signal}': signal_line,
+        f'macd_hist_{fast}_{slow}_{signal}': sub(line, signal_line),
+    }
+
+
+def bollinger(window: int = 20, k: float = 2.0, field: str = 'close') -> Dict[str, Node]:
+    """Moving average +/- k sample standard deviations"""
+    x = source(field)
+    mid = rolling_mean(x, window)
+    band = scale(rolling_std(x, window), k)
+    return {
+        f'bb_mid_{window}': mid,
+        f'bb_upper_{window}': add(mid, band),
+        f'bb_lower_{window}': sub(mid, band),
+    }
+
+
+def atr(periods: int = 14) -> Dict[str, Node]:
+    """Average true range with Wilder smoothing, seeded with the first true range"""
+    true_range = Node('true_range', (source('high'), source('low'), prev(source('close'))), ())
+    return {f'atr_{periods}': exponential(true_range, 1.0 / periods)}
+
+
+def vwap(window: Optional[int] = None) -> Dict[str, Node]:
+    """
+    Volume-weighted typical price
+
+    Cumulative from the first bar given (pass one session's bars for the
+    session VWAP), or over the last `window` bars.
+    """
+    typical = scale(add(add(source('high'), source('low')), source('close')), 1.0 / 3)
+    weighted = mul(typical, source('volume'))
+    if window is None:
+        return {'vwap': div(cumulative(weighted), cumulative(source('volume')))}
+    return {f'vwap_{window}': div(rolling_sum(weighted, window), rolling_sum(source('volume'), window))}
+
+
+def stochastic(k: int = 14, d: int = 3) -> Dict[str, Node]:
+    """%K of the close within the k-bar high/low range, and its d-bar average %D"""
+    low = rolling_min(source('low'), k)
+    high = rolling_max(source('high'), k)
+    percent_k = scale(div(sub(source('close'), low), sub(high, low)), 100.0)
+    return {f'stoch_k_{k}': percent_k, f'stoch_d_{k}_{d}': rolling_mean(percent_k, d)}
+
+
+def obv() -> Dict[str, Node]:
+    """On-balance volume, starting from zero"""
+    close = source('close')
+    return {'obv': cumulative(mul(Node('sign', (diff(close),), ()), source('volume')))}
+
+
+def rsi(periods: int = 14, field: str = 'close') -> Dict[str, Node]:
+    """Relative strength index of simple average gains and losses, like DataPreprocessor"""
+    delta = diff(source(field))
+    gains = rolling_mean(Node('gain', (delta,), ()), periods)
+    losses = rolling_mean(Node('loss', (delta,), ()), periods)
+    return {f'rsi_{periods}': Node('rsi', (gains, losses), ())}
+
+
+def volatility(window: int = 20, field: str = 'close') -> Dict[str, Node]:
+    """Rolling sample standard deviation of simple returns"""
+    x = source(field)
+    return {f'volatility_{window}': rolling_std(div(diff(x), prev(x)), window)}
+
+
+# --- Batch kernels (time on axis 0, 1-D or 2-D) ------------------------------
+
+def _safe_div(a: ArrayLike, b: ArrayLike) -> ArrayLike:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b != 0, a / b, np.nan)
+
+
+def _sign(x: ArrayLike) -> ArrayLike:
+    return np.where(np.isnan(x), 0.0, np.sign(x))
+
+
+def _true_range(high: ArrayLike, low: ArrayLike, prev_close: ArrayLike) -> ArrayLike:
+    # fmax ignores the NaN previous close of the first bar
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def _rsi(gains: ArrayLike, losses: ArrayLike) -> ArrayLike:
+    # No losses gives 100, a flat window NaN, as in pandas
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + gains / losses)
+
+
+# Stateless kinds: the same function serves batch arrays and streaming rows
+_ELEMENTWISE: Dict[str, Callable[..., ArrayLike]] = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'div': _safe_div,
+    'scale': lambda x, factor: x * factor,
+    'sqrt': lambda x: np.sqrt(np.maximum(x, 0.0)),
+    'sign': _sign,
+    'true_range': _true_range,
+    # The first NaN change counts as neither gain nor loss, as in DataPreprocessor
+    'gain': lambda x: np.where(x > 0, x, 0.0),
+    'loss': lambda x: np.where(x < 0, -x, 0.0),
+    'rsi': _rsi,
+}
+
+
+def _first_finite(x: np.ndarray) -> np.ndarray:
+    """First finite value of each column, 0 for columns without one"""
+    finite = np.isfinite(x)
+    first = np.argmax(finite, axis=0)
+    values = np.take_along_axis(x, np.expand_dims(first, 0), axis=0)[0]
+    return np.where(finite.any(axis=0), values, 0.0)
+
+
+def _batch_prev(x: np.ndarray) -> np.ndarray:
+    out = np.empty_like(x)
+    out[0:1] = np.nan
+    out[1:] = x[:-1]
+    return out
+
+
+def _batch_sum(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] < window:
+        return out
+
+    finite = np.isfinite(x)
+    # Centering on the first value keeps the cumulative sum small
+    reference = _first_finite(x)
+    zeros = np.zeros((1,) + x.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(np.where(finite, x - reference, 0.0), axis=0)])
+    window_sums = sums[window:] - sums[:-window] + window * reference
+
+    if finite.all():
+        out[window - 1:] = window_sums
+    else:
+        counts = np.concatenate([zeros, np.cumsum(finite, axis=0, dtype=np.float64)])
+        out[window - 1:] = np.where(counts[window:] - counts[:-window] == window, window_sums, np.nan)
+    return out
+
+
+def _batch_extreme(x: np.ndarray, window: int, reduce: Callable) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        out[window - 1:] = reduce(windows, axis=-1)
+    return out
+
+
+def _ema_blocks(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t], y[0] = x[0], for finite x
+
+    Within a block of B rows the recursion has the closed form
+    y[s+k] = d**(k+1) * y[s-1] + alpha * d**k * sum_j x[s+j] * d**-j,
+    one cumulative sum per block. B is chosen so d**-B stays below 1e8,
+    which keeps the rescaled sum accurate.
+    """
+    if alpha >= 1.0:
+        return x.copy()
+    decay = 1.0 - alpha
+    block = int(max(1, min(4096, np.floor(np.log(1e8) / -np.log(decay)))))
+    powers = decay ** np.arange(block, dtype=np.float64)
+    shape = (-1,) + (1,) * (x.ndim - 1)
+
+    out = np.empty_like(x)
+    previous = x[0]
+    for start in range(0, x.shape[0], block):
+        rows = x[start:start + block]
+        k = powers[:len(rows)].reshape(shape)
+        weighted = np.cumsum(rows / k, axis=0)
+        out[start:start + len(rows)] = decay * k * previous + alpha * k * weighted
+        previous = out[start + len(rows) - 1]
+    return out
+
+
+def _batch_ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponential average seeded at each column's first finite value
+
+    A NaN bar leaves the average unchanged and outputs NaN. Leading NaNs
+    (warm-up of an upstream indicator) use the closed-form block path; NaNs
+    after the first value fall back to a row loop vectorized over columns.
+    """
+    if x.shape[0] == 0:
+        return x.copy()
+    finite = np.isfinite(x)
+    started = np.cumsum(finite, axis=0) > 0
+
+    if (finite | ~started).all():
+        # Holding the seed over the leading NaNs is the same as starting there
+        out = _ema_blocks(np.where(started, x, _first_finite(x)), alpha)
+        out[~started] = np.nan
+        return out
+
+    out = np.empty_like(x)
+    state = np.full(x.shape[1:], np.nan)
+    for t in range(x.shape[0]):
+        row = x[t]
+        state = np.where(np.isnan(state), row, np.where(np.isnan(row), state, state + alpha * (row - state)))
+        out[t] = np.where(np.isnan(row), np.nan, state)
+    return out
+
+
+_BATCH: Dict[str, Callable[..., np.ndarray]] = {
+    'prev': _batch_prev,
+    'sum': _batch_sum,
+    'max': lambda x, window: _batch_extreme(x, window, np.max),
+    'min': lambda x, window: _batch_extreme(x, window, np.min),
+    'ema': _batch_ema,
+    'cumsum': lambda x: np.cumsum(np.where(np.isfinite(x), x, 0.0), axis=0),
+}
+
+
+# --- Streaming state (one bar at a time, scalar or one row per symbol) -------
+# Every state takes an optional boolean `mask` selecting the columns that have
+# a new bar; the other columns keep their state (their outputs are not
+# meaningful). prime() loads the state from batch values, either for every
+# column or, with `column`, for one symbol of a panel.
+
+def _assign(target: np.ndarray, value: ArrayLike, column: Optional[int]) -> np.ndarray:
+    if column is None:
+        return np.array(value, dtype=np.float64)
+    target[..., column] = value
+    return target
+
+
+class _Prev:
+    __slots__ = ('last',)
+
+    def __init__(self):
+        self.last = None
+
+    def init(self, shape: Tuple[int, ...]) -> None:
+        self.last = np.full(shape, np.nan)
+
+    def update(self, x: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.last is None:
+            self.init(x.shape)
+        out = self.last
+        self.last = x if mask is None else np.where(mask, x, out)
+        return out
+
+    def prime(self, x: np.ndarray, out: np.ndarray, column: Optional[int] = None) -> None:
+        self.last = _assign(self.last, x[-1], column)
+
+
+class _Window:
+    """Ring of the last `window` rows, with a fill count per column."""
+
+    __slots__ = ('window', 'ring', 'counts', 'columns')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.ring = None
+        self.counts = None
+        self.columns = None
+
+    def init(self, shape: Tuple[int, ...]) -> None:
+        self.ring = np.zeros((self.window,) + shape)
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.columns = np.arange(int(np.prod(shape)))
+
+    def _push(self, x: np.ndarray, mask: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Write x into each column's next slot; returns (evicted, written)"""
+        if self.ring is None:
+            self.init(x.shape)
+        # Slots start as zeros, so an eviction before the ring is full removes nothing
+        flat = self.ring.reshape(self.window, -1)
+        slots = (self.counts % self.window).reshape(-1)
+        old = flat[slots, self.columns].reshape(x.shape)
+        new = x if mask is None else np.where(mask, x, old)
+        flat[slots, self.columns] = np.reshape(new, -1)
+        self.counts += 1 if mask is None else mask
+        return old, new
+
+    def _fill(self, x: np.ndarray, column: Optional[int]) -> np.ndarray:
+        """Load the ring as if every row of `x` had been pushed; returns the kept rows"""
+        tail = x[-self.window:]
+        ring = np.zeros((self.window,) + x.shape[1:])
+        ring[(np.arange(len(tail)) + len(x) - len(tail)) % self.window] = tail
+        if column is None:
+            self.init(x.shape[1:])
+            self.ring = ring
+            self.counts[...] = len(x)
+        else:
+            self.ring[:, column] = ring
+            self.counts[column] = len(x)
+        return tail
+
+
+class _Sum(_Window):
+    __slots__ = ('total', 'missing', 'updates')
+
+    def __init__(self, window: int):
+        super().__init__(window)
+        self.total = None
+        self.missing = None
+        self.updates = 0
+
+    def init(self, shape: Tuple[int, ...]) -> None:
+        super().init(shape)
+        self.total = np.zeros(shape)
+        self.missing = np.zeros(shape)
+
+    def update(self, x: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        old, new = self._push(x, mask)
+        old_finite = np.isfinite(old)
+        new_finite = np.isfinite(new)
+        self.total = self.total + np.where(new_finite, new, 0.0) - np.where(old_finite, old, 0.0)
+        self.missing = self.missing + old_finite - new_finite
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self.total = np.where(np.isfinite(self.ring), self.ring, 0.0).sum(axis=0)
+        return np.where((self.counts >= self.window) & (self.missing == 0), self.total, np.nan)
+
+    def prime(self, x: np.ndarray, out: np.ndarray, column: Optional[int] = None) -> None:
+        tail = self._fill(x, column)
+        finite = np.isfinite(tail)
+        self.total = _assign(self.total, np.where(finite, tail, 0.0).sum(axis=0), column)
+        self.missing = _assign(self.missing, (~finite).sum(axis=0), column)
+
+
+class _Extreme(_Window):
+    """Rolling max/min by scanning the ring: O(window) per bar, vectorized."""
+
+    __slots__ = ('reduce',)
+
+    def __init__(self, window: int, reduce: Callable):
+        super().__init__(window)
+        self.reduce = reduce
+
+    def update(self, x: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        self._push(x, mask)
+        return np.where(self.counts >= self.window, self.reduce(self.ring, axis=0), np.nan)
+
+    def prime(self, x: np.ndarray, out: np.ndarray, column: Optional[int] = None) -> None:
+        self._fill(x, column)
+
+
+class _Ema:
+    __slots__ = ('alpha', 'state')
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.state = None
+
+    def init(self, shape: Tuple[int, ...]) -> None:
+        self.state = np.full(shape, np.nan)
+
+    def update(self, x: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.state is None:
+            self.init(x.shape)
+        state = self.state
+        missing = np.isnan(x) if mask is None else np.isnan(x) | ~mask
+        self.state = np.where(np.isnan(state), np.where(missing, np.nan, x),
+                              np.where(missing, state, state + self.alpha * (x - state)))
+        return np.where(missing, np.nan, self.state)
+
+    def prime(self, x: np.ndarray, out: np.ndarray, column: Optional[int] = None) -> None:
+        # The state is the last non-NaN output: NaN bars leave it unchanged
+        seen = ~np.isnan(out)
+        last = len(out) - 1 - np.argmax(seen[::-1], axis=0)
+        values = np.take_along_axis(out, np.expand_dims(last, 0), axis=0)[0]
+        self.state = _assign(self.state, np.where(seen.any(axis=0), values, np.nan), column)
+
+
+class _Cumsum:
+    __slots__ = ('total',)
+
+    def __init__(self):
+        self.total = None
+
+    def init(self, shape: Tuple[int, ...]) -> None:
+        self.total = np.zeros(shape)
+
+    def update(self, x: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.total is None:
+            self.init(x.shape)
+        keep = np.isfinite(x) if mask is None else np.isfinite(x) & mask
+        self.total = self.total + np.where(keep, x, 0.0)
+        return self.total
+
+    def prime(self, x: np.ndarray, out: np.ndarray, column: Optional[int] = None) -> None:
+        self.total = _assign(self.total, out[-1], column)
+
+
+_STREAM: Dict[str, Callable[..., Any]] = {
+    'prev': _Prev,
+    'sum': _Sum,
+    'max': lambda window: _Extreme(window, np.max),
+    'min': lambda window: _Extreme(window, np.min),
+    'ema': _Ema,
+    'cumsum': _Cumsum,
+}
+
+
+# --- Graph -------------------------------------------------------------------
+
+class IndicatorGraph:
+    """
+    A set of indicators evaluated as one dependency graph.
+
+    Indicators are built from shared primitive nodes (rolling sums, previous
+    values, exponential averages, ...). Identical nodes are merged, so for
+    example sma(20), bollinger(20) and a 20-bar VWAP's volume sum are one
+    rolling sum each, computed once per series. Inputs are arrays with time
+    on axis 0: one series, or a (time x symbol) panel.
+    """
+
+    def __init__(self, *indicators: Mapping[str, Node]):
+        """
+        Args:
+            *indicators (Mapping[str, Node]): Outputs of sma(), macd(), ...
+        """
+        self.outputs: Dict[str, Node] = {}
+        for outputs in indicators:
+            for name, node in outputs.items():
+                if self.outputs.get(name, node) != node:
+                    raise ValueError(f"Conflicting definitions for indicator output '{name}'")
+                self.outputs[name] = node
+
+        self.nodes: List[Node] = []
+        seen = set()
+
+        def visit(node: Node) -> None:
+            if node in seen:
+                return
+            seen.add(node)
+            for dependency in node.inputs:
+                visit(dependency)
+            self.nodes.append(node)
+
+        for node in self.outputs.values():
+            visit(node)
+
+        self.fields = sorted({node.params[0] for node in self.nodes if node.kind == 'source'})
+        self.last_run_stats: Dict[str, Any] = {}
+
+    def evaluate(self, data: Mapping[str, Any]) -> Dict[Node, np.ndarray]:
+        """
+        Evaluate every node over whole series
+
+        Args:
+            data (Mapping[str, Any]): Input columns by field name (a dict of
+                arrays or a DataFrame), each 1-D or (time x symbol)
+
+        Returns:
+            Dict[Node, np.ndarray]: Values of every node, including intermediates
+        """
+        started = time.perf_counter()
+        values: Dict[Node, np.ndarray] = {}
+        shape = None
+        for node in self.nodes:
+            inputs = [values[dependency] for dependency in node.inputs]
+            if node.kind == 'source':
+                value = np.asarray(data[node.params[0]], dtype=np.float64)
+                if shape is not None and value.shape != shape:
+                    raise ValueError(
+                        f"Field '{node.params[0]}' has shape {value.shape}, expected {shape}"
+                    )
+                shape = value.shape
+            elif node.kind in _ELEMENTWISE:
+                value = _ELEMENTWISE[node.kind](*inputs, *node.params)
+            else:
+                value = _BATCH[node.kind](*inputs, *node.params)
+            values[node] = value
+
+        elapsed = time.perf_counter() - started
+        self.last_run_stats = {
+            'outputs': len(self.outputs),
+            'nodes': len(self.nodes),
+            'shape': shape,
+            'seconds': elapsed,
+        }
+        return values
+
+    def compute(self, data: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every indicator over whole series
+
+        Args:
+            data (Mapping[str, Any]): Input columns by field name (a dict of
+                arrays or a DataFrame), each 1-D or (time x symbol)
+
+        Returns:
+            Dict[str, np.ndarray]: Output arrays, same shape as the inputs
+        """
+        values = self.evaluate(data)
+        return {name: values[node] for name, node in self.outputs.items()}
+
+    def stream(self) -> 'IndicatorStream':
+        """Fresh incremental evaluator of this graph"""
+        return IndicatorStream(self)
+
+
+class IndicatorStream:
+    """
+    Incremental evaluation of an IndicatorGraph, one bar per update.
+
+    Every stateful node keeps O(window) state, so an update costs the same
+    regardless of history length, and outputs match IndicatorGraph.compute
+    on the same bars within floating point tolerance. A panel stream takes
+    one value per symbol and updates every symbol with a single pass of
+    vector operations; `mask` limits an update to the symbols with a bar.
+    """
+
+    def __init__(self, graph: IndicatorGraph):
+        self.graph = graph
+        self.states = {
+            node: _STREAM[node.kind](*node.params)
+            for node in graph.nodes if node.kind in _STREAM
+        }
+        self.shape: Optional[Tuple[int, ...]] = None
+        self.count = 0
+        self._build_plan()
+
+    def _build_plan(self) -> None:
+        # (kind, function or state, input positions, params) per node
+        graph = self.graph
+        position = {node: i for i, node in enumerate(graph.nodes)}
+        self._plan = []
+        for node in graph.nodes:
+            inputs = tuple(position[dependency] for dependency in node.inputs)
+            if node.kind == 'source':
+                self._plan.append((0, node.params[0], inputs, ()))
+            elif node.kind in _ELEMENTWISE:
+                self._plan.append((1, _ELEMENTWISE[node.kind], inputs, node.params))
+            else:
+                self._plan.append((2, self.states[node].update, inputs, ()))
+        self._outputs = [(name, position[node]) for name, node in graph.outputs.items()]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The plan holds unpicklable kernels; it is rebuilt on load
+        state = self.__dict__.copy()
+        del state['_plan'], state['_outputs']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._build_plan()
+
+    def prime(self, values: Mapping[Node, np.ndarray], column: Optional[int] = None,
+              width: Optional[int] = None) -> None:
+        """
+        Continue from a batch evaluation instead of replaying its bars
+
+        Args:
+            values (Mapping[Node, np.ndarray]): IndicatorGraph.evaluate output of
+                this graph or of any graph containing it
+            column (Optional[int]): Load only this symbol of a panel stream, from
+                1-D values of that symbol's history
+            width (Optional[int]): Symbols in the panel, when priming a column first
+        """
+        if column is not None and self.shape is None:
+            self.shape = (width,)
+            for state in self.states.values():
+                state.init(self.shape)
+        length = 0
+        for node, state in self.states.items():
+            out = values[node]
+            length = len(out)
+            if length:
+                state.prime(values[node.inputs[0]], out, column)
+        if column is None:
+            self.count = length
+            self.shape = next(iter(values.values())).shape[1:] if values else None
+
+    def update(self, bar: Mapping[str, Any], mask: Optional[np.ndarray] = None) -> Dict[str, ArrayLike]:
+        """
+        Add one bar and return every indicator's latest value
+
+        Args:
+            bar (Mapping[str, Any]): Field values of the new bar; scalars for a
+                single series or one value per symbol for a panel
+            mask (Optional[np.ndarray]): Panel symbols that have a new bar; the
+                others keep their state and get meaningless outputs
+
+        Returns:
+            Dict[str, ArrayLike]: Latest values, floats for a single series
+        """
+        values: List[Any] = []
+        for kind, target, inputs, params in self._plan:
+            if kind == 0:
+                value = np.asarray(bar[target], dtype=np.float64)
+            elif kind == 1:
+                value = target(*[values[i] for i in inputs], *params)
+            elif mask is None:
+                value = target(values[inputs[0]])
+            else:
+                value = target(values[inputs[0]], mask)
+            values.append(value)
+        self.count += 1
+
+        outputs = {}
+        for name, i in self._outputs:
+            value = values[i]
+            outputs[name] = float(value) if np.ndim(value) == 0 else np.array(value)
+        return outputs
+
+    def update_many(self, data: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Feed several bars in order, e.g. to warm up from history
+
+        Returns:
+            Dict[str, np.ndarray]: Output rows stacked along axis 0
+        """
+        columns = {field: np.asarray(data[field], dtype=np.float64) for field in self.graph.fields}
+        length = len(next(iter(columns.values()))) if columns else 0
+        rows: Dict[str, List[ArrayLike]] = {name: [] for name in self.graph.outputs}
+        for t in range(length):
+            for name, value in self.update({field: values[t] for field, values in columns.items()}).items():
+                rows[name].append(value)
+        return {name: np.array(values) for name, values in rows.items()}
+
+
+DEFAULT_INDICATORS: Tuple[Dict[str, Node], ...] = (
+    ema(12), ema(26), macd(), bollinger(20), atr(14), vwap(), stochastic(), obv(), volatility(20),
+)
+
+
+def compute_indicators(data: Mapping[str, Any], *indicators: Mapping[str, Node]) -> Dict[str, np.ndarray]:
+    """
+    One-off batch evaluation; defaults to DEFAULT_INDICATORS
+
+    Args:
+        data (Mapping[str, Any]): Input columns by field name
+        *indicators (Mapping[str, Node]): Indicators to compute
+
+    Returns:
+        Dict[str, np.ndarray]: Output arrays by name
+    """
+    return IndicatorGraph(*(indicators or DEFAULT_INDICATORS)).compute(data)
@@ -0,0 +1,369 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import IndicatorGraph, IndicatorStream, Node, rsi, sma
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One row per emitted signal; symbols and strategies are indexes into the batch's name lists
+SIGNAL_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ns]'),
+    ('symbol', np.int32),
+    ('strategy', np.int16),
+    ('signal', np.float32),
+])
+
+
+class SignalStrategy:
+    """
+    Base class for strategies run by SignalEngine.
+
+    Declare the indicators the strategy reads in `indicators`; the engine
+    keeps them up to date per symbol, shared with every other strategy on
+    that symbol. `on_bar` returns the signal for the new bar, or None to
+    emit nothing.
+    """
+
+    name = 'strategy'
+
+    def indicators(self) -> Tuple[Mapping[str, Node], ...]:
+        return ()
+
+    def on_bar(self, symbol: str, bar: Mapping[str, Any], values: Mapping[str, float],
+               state: Dict[str, Any]) -> Optional[float]:
+        """
+        Args:
+            symbol (str): Symbol whose bar closed
+            bar (Mapping[str, Any]): The closed bar
+            values (Mapping[str, float]): Latest value of every indicator on the symbol
+            state (Dict[str, Any]): Scratch space kept per (strategy, symbol)
+
+        Returns:
+            Optional[float]: Signal to emit
+        """
+        raise NotImplementedError
+
+
+class MovingAverageCrossSignal(SignalStrategy):
+    """Incremental moving_average_strategy: 1 while the short MA is above the long MA, else 0."""
+
+    def __init__(self, short_window: int = 50, long_window: int = 200, name: Optional[str] = None):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.name = name or f'ma_cross_{short_window}_{long_window}'
+
+    def indicators(self) -> Tuple[Mapping[str, Node], ...]:
+        return sma(self.short_window), sma(self.long_window)
+
+    def on_bar(self, symbol, bar, values, state):
+        short_ma = values[f'sma_{self.short_window}']
+        long_ma = values[f'sma_{self.long_window}']
+        # NaN compares False, so the warm-up is flat like the batch strategy
+        return 1.0 if short_ma > long_ma else 0.0
+
+
+class RsiSignal(SignalStrategy):
+    """1 when RSI is oversold, -1 when overbought, else 0."""
+
+    def __init__(self, periods: int = 14, lower: float = 30.0, upper: float = 70.0, name: Optional[str] = None):
+        self.periods = periods
+        self.lower = lower
+        self.upper = upper
+        self.name = name or f'rsi_{periods}'
+
+    def indicators(self) -> Tuple[Mapping[str, Node], ...]:
+        return (rsi(self.periods),)
+
+    def on_bar(self, symbol, bar, values, state):
+        value = values[f'rsi_{self.periods}']
+        if np.isnan(value):
+            return None
+        if value < self.lower:
+            return 1.0
+        if value > self.upper:
+            return -1.0
+        return 0.0
+
+
+class SignalBatch:
+    """Every signal emitted in one engine cycle."""
+
+    def __init__(self, signals: np.ndarray, symbols: List[str], strategies: List[str], stats: Dict[str, Any]):
+        self.signals = signals
+        self.symbols = symbols
+        self.strategies = strategies
+        self.stats = stats
+
+    def __len__(self) -> int:
+        return len(self.signals)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns:
+            pd.DataFrame: timestamp, symbol, strategy and signal, with names resolved
+        """
+        return pd.DataFrame({
+            'timestamp': self.signals['timestamp'],
+            'symbol': np.asarray(self.symbols, dtype=object)[self.signals['symbol']] if len(self) else [],
+            'strategy': np.asarray(self.strategies, dtype=object)[self.signals['strategy']] if len(self) else [],
+            'signal': self.signals['signal'],
+        })
+
+
+class _Panel:
+    """Symbols of one interval that run the same strategies, updated as one row per cycle."""
+
+    __slots__ = ('strategies', 'symbols', 'graph', 'stream', 'states')
+
+    def __init__(self, strategies: Tuple[int, ...], symbols: List[str], graph: IndicatorGraph):
+        self.strategies = strategies
+        self.symbols = symbols
+        self.graph = graph
+        self.stream: IndicatorStream = graph.stream()
+        # Scratch state per strategy, per symbol column
+        self.states = {index: [{} for _ in symbols] for index in strategies}
+
+
+class SignalEngine:
+    """
+    Runs many strategies over many symbols one closed bar at a time.
+
+    Strategies register once for the symbols and interval they trade.
+    Symbols of an interval that run the same set of strategies form a panel
+    with one IndicatorStream over the union of those strategies' indicators,
+    so a cycle updates the rolling state of all its symbols with one pass of
+    vector operations, masked to the symbols whose bar closed. Only those
+    symbols' subscribers are evaluated. Bars are queued by `on_bar`
+    (compatible with BarAggregator) and processed together by `run_cycle`,
+    which returns the cycle's signals as one SignalBatch and times every
+    strategy against the cycle's latency budget. `on_bar` may run on the
+    feed thread while `run_cycle` runs elsewhere; the queue is guarded by
+    a lock held only to append or swap it.
+    """
+
+    def __init__(self, budget_ms: float = 50.0, history: int = 1000,
+                 clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            budget_ms (float): Latency budget of one cycle, and of any single strategy in it
+            history (int): Cycles kept for latency_report
+            clock (Callable[[], float]): Seconds timer
+        """
+        self.budget_ms = budget_ms
+        self.clock = clock
+        self.strategies: List[SignalStrategy] = []
+        self.symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self.subscriptions: Dict[Tuple[str, str], List[int]] = {}
+        self._routes: Dict[Tuple[str, str], Tuple[_Panel, int]] = {}
+        self._started: set = set()
+        self._pending: Dict[Tuple[str, str], List[Mapping[str, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        self.cycles: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.errors: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'SignalEngine':
+        """
+        Build an engine from the `signal_engine` section of a ConfigManager
+
+        Args:
+            config: ConfigManager (or anything with a dot-key `get`)
+        """
+        return cls(budget_ms=config.get('signal_engine.budget_ms', 50.0))
+
+    def register(self, strategy: SignalStrategy, symbols: Iterable[str], interval: str = '1minute') -> None:
+        """
+        Subscribe a strategy to new bars of the given symbols
+
+        Raises:
+            ValueError: On a duplicate strategy name
+            RuntimeError: If the interval has already started streaming
+        """
+        if any(existing.name == strategy.name for existing in self.strategies):
+            raise ValueError(f"Strategy '{strategy.name}' is already registered")
+        if interval in self._started:
+            raise RuntimeError(f"Register strategies before streaming {interval} bars")
+
+        symbols = list(symbols)
+        index = len(self.strategies)
+        self.strategies.append(strategy)
+        for symbol in symbols:
+            if symbol not in self._symbol_ids:
+                self._symbol_ids[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            self.subscriptions.setdefault((symbol, interval), []).append(index)
+        logger.info(f"Registered {strategy.name} on {len(symbols)} symbols ({interval})")
+
+    def _start(self, interval: str) -> None:
+        groups: Dict[Tuple[int, ...], List[str]] = {}
+        for (symbol, symbol_interval), strategies in self.subscriptions.items():
+            if symbol_interval == interval:
+                groups.setdefault(tuple(strategies), []).append(symbol)
+        for strategies, symbols in groups.items():
+            graph = IndicatorGraph(*(
+                indicator for index in strategies for indicator in self.strategies[index].indicators()
+            ))
+            panel = _Panel(strategies, symbols, graph)
+            for column, symbol in enumerate(symbols):
+                self._routes[(symbol, interval)] = (panel, column)
+        self._started.add(interval)
+
+    def _route(self, symbol: str, interval: str) -> Optional[Tuple[_Panel, int]]:
+        if interval not in self._started:
+            self._start(interval)
+        return self._routes.get((symbol, interval))
+
+    def warm_up(self, symbol: str, data: Mapping[str, Any], interval: str = '1minute') -> None:
+        """
+        Load a symbol's history in one vectorized pass instead of bar by bar
+
+        Args:
+            symbol (str): Stock symbol
+            data (Mapping[str, Any]): Historical columns (dict of arrays or DataFrame), oldest first
+            interval (str): Bar interval
+        """
+        route = self._route(symbol, interval)
+        if route is None:
+            return
+        panel, column = route
+        fields = panel.graph.fields
+        if fields and len(data[fields[0]]):
+            panel.stream.prime(
+                panel.graph.evaluate({field: data[field] for field in fields}),
+                column=column, width=len(panel.symbols)
+            )
+
+    def on_bar(self, symbol: str, interval: str, bar: Mapping[str, Any]) -> None:
+        """Queue a closed bar for the next cycle; bars nobody subscribes to are dropped"""
+        if (symbol, interval) in self.subscriptions:
+            with self._pending_lock:
+                self._pending.setdefault((symbol, interval), []).append(bar)
+
+    def run_cycle(self) -> SignalBatch:
+        """
+        Evaluate the subscribers of every queued bar
+
+        Returns:
+            SignalBatch: Signals of this cycle, by panel and bar order
+        """
+        started = self.clock()
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        rows = []
+        spent = [0.0] * len(self.strategies)
+        indicator_seconds = 0.0
+        bars = 0
+
+        queues: Dict[int, Tuple[_Panel, Dict[int, List[Mapping[str, Any]]]]] = {}
+        for (symbol, interval), queued in pending.items():
+            panel, column = self._route(symbol, interval)
+            queues.setdefault(id(panel), (panel, {}))[1][column] = queued
+
+        for panel, columns in queues.values():
+            width = len(panel.symbols)
+            symbol_ids = [self._symbol_ids[symbol] for symbol in panel.symbols]
+            # A symbol with several queued bars catches up over several rounds
+            for depth in range(max(len(queued) for queued in columns.values())):
+                current = [(column, queued[depth]) for column, queued in columns.items() if depth < len(queued)]
+                bars += len(current)
+                mask = np.zeros(width, dtype=bool)
+                row = {field: np.full(width, np.nan) for field in panel.graph.fields}
+                for column, bar in current:
+                    mask[column] = True
+                    for field, values in row.items():
+                        values[column] = bar[field]
+
+                mark = self.clock()
+                outputs = {name: values.tolist() for name, values in panel.stream.update(row, mask).items()}
+                indicator_seconds += self.clock() - mark
+
+                for column, bar in current:
+                    symbol = panel.symbols[column]
+                    values = {name: values[column] for name, values in outputs.items()}
+                    timestamp = np.datetime64(bar['datetime'], 'ns') if 'datetime' in bar else np.datetime64('NaT')
+                    for index in panel.strategies:
+                        strategy = self.strategies[index]
+                        mark = self.clock()
+                        try:
+                            signal = strategy.on_bar(symbol, bar, values, panel.states[index][column])
+                        except Exception as e:
+                            signal = None
+                            self.errors[strategy.name] = self.errors.get(strategy.name, 0) + 1
+                            logger.error(f"{strategy.name} failed on {symbol}: {e}")
+                        spent[index] += self.clock() - mark
+                        if signal is not None:
+                            rows.append((timestamp, symbol_ids[column], index, signal))
+
+        elapsed = self.clock() - started
+        strategy_ms = {strategy.name: seconds * 1000 for strategy, seconds in zip(self.strategies, spent)}
+        over_budget = [name for name, ms in strategy_ms.items() if ms > self.budget_ms]
+        stats = {
+            'bars': bars,
+            'signals': len(rows),
+            'latency_ms': elapsed * 1000,
+            'indicator_ms': indicator_seconds * 1000,
+            'strategy_ms': strategy_ms,
+            'over_budget': elapsed * 1000 > self.budget_ms,
+            'slow_strategies': over_budget,
+        }
+        self.cycles.append(stats)
+        if stats['over_budget']:
+            slowest = sorted(strategy_ms.items(), key=lambda item: item[1], reverse=True)[:3]
+            logger.warning(
+                f"Signal cycle took {stats['latency_ms']:.1f}ms over a {self.budget_ms:.1f}ms budget "
+                f"({bars} bars); slowest: " + ', '.join(f"{name} {ms:.1f}ms" for name, ms in slowest)
+            )
+
+        return SignalBatch(
+            np.array(rows, dtype=SIGNAL_DTYPE),
+            self.symbols,
+            [strategy.name for strategy in self.strategies],
+            stats
+        )
+
+    def process(self, bars: Mapping[str, Mapping[str, Any]], interval: str = '1minute') -> SignalBatch:
+        """
+        Queue one closed bar per symbol and run a cycle
+
+        Args:
+            bars (Mapping[str, Mapping[str, Any]]): Bar by symbol
+            interval (str): Bar interval
+
+        Returns:
+            SignalBatch: Signals of this cycle
+        """
+        for symbol, bar in bars.items():
+            self.on_bar(symbol, interval, bar)
+        return self.run_cycle()
+
+    def latency_report(self) -> pd.DataFrame:
+        """
+        Per-strategy latency over the kept cycles, slowest first
+
+        Returns:
+            pd.DataFrame: mean_ms, p95_ms and max_ms per cycle, cycles over
+                the budget, and errors
+        """
+        if not self.cycles:
+            return pd.DataFrame()
+        rows = []
+        for strategy in self.strategies:
+            times = np.array([cycle['strategy_ms'].get(strategy.name, 0.0) for cycle in self.cycles])
+            rows.append({
+                'strategy': strategy.name,
+                'mean_ms': float(times.mean()),
+                'p95_ms': float(np.percentile(times, 95)),
+                'max_ms': float(times.max()),
+                'over_budget': int((times > self.budget_ms).sum()),
+                'errors': self.errors.get(strategy.name, 0),
+            })
+        report = pd.DataFrame(rows).set_index('strategy')
+        return report.sort_values('max_ms', ascending=False)
@@ -0,0 +1,198 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+METRICS = ['total_return', 'sharpe', 'max_drawdown', 'trades']
+
+
+def rolling_means(close: np.ndarray, windows: Iterable[int]) -> np.ndarray:
+    """
+    Simple moving averages for many windows from one cumulative sum
+
+    Args:
+        close (np.ndarray): Prices, oldest first
+        windows (Iterable[int]): Window lengths
+
+    Returns:
+        np.ndarray: (windows x bars) averages, NaN until a window is full
+    """
+    close = np.asarray(close, dtype=np.float64)
+    windows = np.asarray(list(windows), dtype=np.int64)
+    n = len(close)
+    csum = np.concatenate(([0.0], np.cumsum(close)))
+
+    t = np.arange(n)
+    lagged = t[None, :] + 1 - windows[:, None]
+    means = (csum[None, 1:] - csum[np.clip(lagged, 0, n)]) / windows[:, None]
+    means[lagged < 0] = np.nan
+    return means
+
+
+def performance(pnl: np.ndarray, periods_per_year: int = 252) -> Dict[str, np.ndarray]:
+    """
+    Total return, annualized Sharpe ratio and max drawdown along the last axis
+
+    Args:
+        pnl (np.ndarray): Per-bar strategy returns; any leading shape
+        periods_per_year (int): Bars per year
+
+    Returns:
+        Dict[str, np.ndarray]: Metrics with the leading shape of `pnl`
+    """
+    equity = np.cumprod(1.0 + pnl, axis=-1)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    std = pnl.std(axis=-1, ddof=1) if pnl.shape[-1] > 1 else np.zeros(pnl.shape[:-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, pnl.mean(axis=-1) / std * np.sqrt(periods_per_year), 0.0)
+    return {
+        'total_return': equity[..., -1] - 1.0,
+        'sharpe': sharpe,
+        'max_drawdown': (equity / peak - 1.0).min(axis=-1),
+    }
+
+
+def strategy_returns(close: np.ndarray, short_window: int, long_window: int, cost: float = 0.0) -> np.ndarray:
+    """
+    Per-bar returns of moving_average_strategy for one parameter pair
+
+    Args:
+        close (np.ndarray): Prices, oldest first
+        short_window (int): Short MA window
+        long_window (int): Long MA window
+        cost (float): Fractional cost charged per position change
+
+    Returns:
+        np.ndarray: len(close) - 1 returns; element t is earned from bar t to t + 1
+    """
+    return pair_returns(close, [(short_window, long_window)], cost)[0]
+
+
+def pair_returns(close: np.ndarray, pairs: Sequence[Tuple[int, int]], cost: float = 0.0) -> np.ndarray:
+    """
+    Per-bar returns of moving_average_strategy for many parameter pairs at once
+
+    Each distinct window's average is computed once, however many pairs use it.
+
+    Args:
+        close (np.ndarray): Prices, oldest first
+        pairs (Sequence[Tuple[int, int]]): (short_window, long_window) pairs
+        cost (float): Fractional cost charged per position change
+
+    Returns:
+        np.ndarray: (pairs x len(close) - 1) returns, rows in `pairs` order
+    """
+    close = np.asarray(close, dtype=np.float64)
+    shorts = np.array([short for short, _ in pairs], dtype=np.int64)
+    longs = np.array([long for _, long in pairs], dtype=np.int64)
+    windows, inverse = np.unique(np.concatenate([shorts, longs]), return_inverse=True)
+    means = rolling_means(close, windows)
+    short_ma, long_ma = means[inverse[:len(pairs)]], means[inverse[len(pairs):]]
+
+    # NaN comparisons are False, so warm-up bars stay flat
+    signal = short_ma > long_ma
+    signal &= np.arange(len(close))[None, :] >= shorts[:, None]
+    pnl = np.where(signal[:, :-1], np.diff(close) / close[:-1], 0.0)
+    if cost:
+        pnl -= cost * np.diff(signal, axis=1, prepend=False)[:, :-1]
+    return pnl
+
+
+class SweepResult:
+    """Metric grids of a moving-average sweep, indexed [short, long]."""
+
+    def __init__(self, short_windows: np.ndarray, long_windows: np.ndarray, grids: Dict[str, np.ndarray]):
+        self.short_windows = short_windows
+        self.long_windows = long_windows
+        self.grids = grids
+
+    def ranked(self, by: str = 'sharpe', top: Optional[int] = None) -> pd.DataFrame:
+        """
+        Valid parameter pairs sorted best first
+
+        Args:
+            by (str): Metric to sort on; max_drawdown sorts smallest loss first
+            top (Optional[int]): Keep only the best `top` rows
+
+        Returns:
+            pd.DataFrame: short_window, long_window and every metric
+        """
+        shorts, longs = np.meshgrid(self.short_windows, self.long_windows, indexing='ij')
+        df = pd.DataFrame({'short_window': shorts.ravel(), 'long_window': longs.ravel()})
+        for metric in METRICS:
+            df[metric] = self.grids[metric].ravel()
+        df = df.dropna(subset=[by])
+        df = df.sort_values(by, ascending=False, kind='stable').reset_index(drop=True)
+        return df if top is None else df.head(top)
+
+
+def moving_average_sweep(
+    close: np.ndarray,
+    short_windows: Iterable[int],
+    long_windows: Iterable[int],
+    periods_per_year: int = 252,
+    cost: float = 0.0,
+    chunk_size: int = 8
+) -> SweepResult:
+    """
+    Evaluate moving_average_strategy over a whole (short, long) grid at once
+
+    Every average comes from one cumulative-sum pass. Signals, positions and
+    PnL are then (short x long x bars) arrays; short windows are processed
+    `chunk_size` at a time to bound memory. The signal follows
+    moving_average_strategy (long while short MA > long MA, flat before
+    `short_window`) and is traded on the next bar's return.
+
+    Args:
+        close (np.ndarray): Prices, oldest first
+        short_windows (Iterable[int]): Short MA windows
+        long_windows (Iterable[int]): Long MA windows; pairs with short >= long are NaN
+        periods_per_year (int): Bars per year, for the annualized Sharpe ratio
+        cost (float): Fractional cost charged per position change
+        chunk_size (int): Short windows evaluated per block
+
+    Returns:
+        SweepResult: total_return, sharpe, max_drawdown and trades per pair
+    """
+    started = time.perf_counter()
+    close = np.asarray(close, dtype=np.float64)
+    short_windows = np.asarray(list(short_windows), dtype=np.int64)
+    long_windows = np.asarray(list(long_windows), dtype=np.int64)
+    n = len(close)
+
+    short_ma = rolling_means(close, short_windows)
+    long_ma = rolling_means(close, long_windows)
+    returns = np.diff(close) / close[:-1]
+    t = np.arange(n)
+
+    grids = {metric: np.full((len(short_windows), len(long_windows)), np.nan) for metric in METRICS}
+    for lo in range(0, len(short_windows), chunk_size):
+        hi = min(lo + chunk_size, len(short_windows))
+        # NaN comparisons are False, so warm-up bars stay flat
+        signal = short_ma[lo:hi, None, :] > long_ma[None, :, :]
+        signal &= (t[None, None, :] >= short_windows[lo:hi, None, None])
+
+        held = signal[:, :, :-1]
+        pnl = np.where(held, returns, 0.0)
+        changes = np.diff(signal, axis=2, prepend=False)[:, :, :-1].astype(np.int8)
+        if cost:
+            pnl -= cost * changes
+
+        for metric, values in performance(pnl, periods_per_year).items():
+            grids[metric][lo:hi] = values
+        grids['trades'][lo:hi] = changes.sum(axis=2)
+
+    invalid = short_windows[:, None] >= long_windows[None, :]
+    for grid in grids.values():
+        grid[invalid] = np.nan
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Swept {len(short_windows)}x{len(long_windows)} windows over {n} bars in {elapsed:.3f}s"
+    )
+    return SweepResult(short_windows, long_windows, grids)
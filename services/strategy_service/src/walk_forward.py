@@ -0,0 +1,311 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sweep import pair_returns, performance
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (symbol index, window index, short window, long window)
+Task = Tuple[int, int, int, int]
+# (symbol index, tasks of that symbol sharing one parameter grid evaluation)
+Job = Tuple[int, List[Task]]
+
+# Worker-side view of the shared close prices, set by _attach
+_shared: Dict[str, Any] = {}
+
+
+def _attach(name: str, size: int, offsets: List[Tuple[int, int]], windows: List[Tuple[int, int, int]],
+            periods_per_year: int, cost: float) -> None:
+    """Process pool initializer: map the shared block once per worker."""
+    block = shared_memory.SharedMemory(name=name)
+    _shared.update({
+        'block': block,
+        'closes': np.ndarray((size,), dtype=np.float64, buffer=block.buf),
+        'offsets': offsets,
+        'windows': windows,
+        'periods_per_year': periods_per_year,
+        'cost': cost,
+    })
+
+
+def _evaluate(job: Job) -> List[Tuple[Task, Dict[str, float], Dict[str, float]]]:
+    """
+    Train and test metrics of every task of one symbol
+
+    The strategy returns of all the job's parameter pairs are computed once
+    over the symbol's history up to the latest test span, sharing each
+    moving average between pairs; a window only slices them. Returns at a
+    bar depend on earlier prices alone, so a window sees exactly what a run
+    on its own prefix would: warm averages when the train span starts and
+    nothing after the test span.
+    """
+    symbol, tasks = job
+    offset, length = _shared['offsets'][symbol]
+    windows = _shared['windows']
+    end = max(windows[window][2] for _, window, _, _ in tasks)
+    close = _shared['closes'][offset:offset + min(end, length)]
+
+    pairs = sorted({(short, long) for _, _, short, long in tasks})
+    rows = {pair: i for i, pair in enumerate(pairs)}
+    pnl = pair_returns(close, pairs, _shared['cost'])
+
+    by_window: Dict[int, List[Task]] = {}
+    for task in tasks:
+        by_window.setdefault(task[1], []).append(task)
+
+    results = []
+    for window, window_tasks in by_window.items():
+        train_start, test_start, test_end = windows[window]
+        selected = pnl[[rows[task[2:]] for task in window_tasks]]
+        # pnl[t] is earned from bar t to t + 1
+        train = performance(selected[:, train_start:test_start - 1], _shared['periods_per_year'])
+        test = performance(selected[:, test_start - 1:test_end - 1], _shared['periods_per_year'])
+        for i, task in enumerate(window_tasks):
+            results.append((
+                task,
+                {metric: float(values[i]) for metric, values in train.items()},
+                {metric: float(values[i]) for metric, values in test.items()},
+            ))
+    return results
+
+
+class WalkForwardReport:
+    """Per-window selections and out-of-sample summary of a walk-forward run."""
+
+    def __init__(self, windows: pd.DataFrame, stats: Dict[str, Any]):
+        self.windows = windows
+        self.stats = stats
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Out-of-sample performance per symbol
+
+        Returns:
+            pd.DataFrame: Windows, compounded OOS return, mean OOS Sharpe, worst
+                OOS drawdown and mean in-sample Sharpe (to judge overfitting)
+        """
+        if self.windows.empty:
+            return pd.DataFrame()
+        grouped = self.windows.groupby('symbol', sort=False)
+        return pd.DataFrame({
+            'windows': grouped.size(),
+            'oos_return': grouped['test_total_return'].apply(lambda r: float(np.prod(1 + r) - 1)),
+            'oos_sharpe': grouped['test_sharpe'].mean(),
+            'oos_max_drawdown': grouped['test_max_drawdown'].min(),
+            'is_sharpe': grouped['train_sharpe'].mean(),
+        })
+
+
+class WalkForwardOptimizer:
+    """
+    Rolling walk-forward validation of moving_average_strategy parameters.
+
+    Every (symbol, window, parameter set) is a task; a symbol's pending
+    tasks run on a process pool in jobs of up to `chunk_size` parameter
+    sets, each evaluated once over the symbol's history and sliced per
+    window. Close prices of all symbols are packed into one shared memory
+    block that workers map once. Each job's results are appended to a
+    JSON-lines cache keyed by the data, windows and grid, so rerunning an
+    interrupted optimization only computes the missing tasks. For every
+    window the parameter set with the best in-sample metric is scored on
+    the following out-of-sample span.
+    """
+
+    def __init__(
+        self,
+        train_bars: int,
+        test_bars: int,
+        step: Optional[int] = None,
+        workers: Optional[int] = None,
+        chunk_size: int = 64,
+        cache_dir: str = 'data/cache/walk_forward',
+        periods_per_year: int = 252,
+        cost: float = 0.0,
+        select_by: str = 'sharpe'
+    ):
+        """
+        Initialize the optimizer
+
+        Args:
+            train_bars (int): In-sample bars per window
+            test_bars (int): Out-of-sample bars per window
+            step (Optional[int]): Bars between window starts. Defaults to test_bars.
+            workers (Optional[int]): Worker processes. Defaults to the CPU count.
+            chunk_size (int): Parameter sets evaluated together in one job
+            cache_dir (str): Root of the per-run task caches
+            periods_per_year (int): Bars per year, for Sharpe ratios
+            cost (float): Fractional cost per position change
+            select_by (str): In-sample metric used to pick parameters
+        """
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step = step or test_bars
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache_dir = Path(cache_dir)
+        self.periods_per_year = periods_per_year
+        self.cost = cost
+        self.select_by = select_by
+
+    def windows(self, bars: int) -> List[Tuple[int, int, int]]:
+        """
+        (train_start, test_start, test_end) of every full window in `bars` bars
+        """
+        windows = []
+        start = 0
+        while start + self.train_bars + self.test_bars <= bars:
+            windows.append((start, start + self.train_bars, start + self.train_bars + self.test_bars))
+            start += self.step
+        return windows
+
+    def _run_key(self, closes: Dict[str, np.ndarray], grid: List[Tuple[int, int]]) -> str:
+        digest = hashlib.sha1()
+        for symbol, close in closes.items():
+            digest.update(symbol.encode())
+            digest.update(np.ascontiguousarray(close, dtype=np.float64).tobytes())
+        digest.update(json.dumps([
+            self.train_bars, self.test_bars, self.step, self.periods_per_year, self.cost, grid
+        ]).encode())
+        return digest.hexdigest()[:16]
+
+    @staticmethod
+    def _load_cache(path: Path) -> Dict[Task, Tuple[Dict[str, float], Dict[str, float]]]:
+        done = {}
+        if not path.exists():
+            return done
+        with path.open() as f:
+            lines = f.readlines()
+        valid = []
+        for number, line in enumerate(lines, 1):
+            if not line.endswith('\n'):
+                # Partial record of an interrupted run
+                continue
+            try:
+                record = json.loads(line)
+                done[tuple(record['task'])] = (record['train'], record['test'])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping corrupt walk-forward cache line {number} of {path}: {e}")
+                continue
+            valid.append(line)
+        if len(valid) < len(lines):
+            # Drop unusable records before appending
+            with path.open('w') as f:
+                f.writelines(valid)
+        return done
+
+    def run(self, closes: Dict[str, np.ndarray], param_grid: Iterable[Tuple[int, int]]) -> WalkForwardReport:
+        """
+        Optimize every symbol over rolling windows
+
+        Args:
+            closes (Dict[str, np.ndarray]): Close prices per symbol, oldest first
+            param_grid (Iterable[Tuple[int, int]]): (short_window, long_window) pairs
+
+        Returns:
+            WalkForwardReport: Selected parameters and OOS metrics per window
+        """
+        started = time.perf_counter()
+        symbols = list(closes)
+        grid = [(int(short), int(long)) for short, long in param_grid if short < long]
+        longest = max(len(close) for close in closes.values())
+        windows = self.windows(longest)
+
+        cache_path = self.cache_dir / self._run_key(closes, grid) / 'tasks.jsonl'
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        done = self._load_cache(cache_path)
+
+        offsets = []
+        total = 0
+        for symbol in symbols:
+            offsets.append((total, len(closes[symbol])))
+            total += len(closes[symbol])
+
+        tasks = [
+            (s, w, short, long)
+            for s, symbol in enumerate(symbols)
+            for w, (_, _, test_end) in enumerate(windows)
+            if test_end <= len(closes[symbol])
+            for short, long in grid
+        ]
+        pending = [task for task in tasks if task not in done]
+        cached = len(tasks) - len(pending)
+
+        by_pair: Dict[Tuple[int, int, int], List[Task]] = {}
+        for task in pending:
+            by_pair.setdefault((task[0],) + task[2:], []).append(task)
+        jobs: List[Job] = []
+        for s in range(len(symbols)):
+            pairs = [key for key in by_pair if key[0] == s]
+            for lo in range(0, len(pairs), self.chunk_size):
+                jobs.append((s, [task for key in pairs[lo:lo + self.chunk_size] for task in by_pair[key]]))
+
+        if pending:
+            block = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+            try:
+                packed = np.ndarray((total,), dtype=np.float64, buffer=block.buf)
+                for symbol, (offset, length) in zip(symbols, offsets):
+                    packed[offset:offset + length] = closes[symbol]
+
+                with ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_attach,
+                    initargs=(block.name, total, offsets, windows, self.periods_per_year, self.cost)
+                ) as executor, cache_path.open('a') as cache:
+                    for results in executor.map(_evaluate, jobs):
+                        for task, train, test in results:
+                            done[task] = (train, test)
+                        cache.writelines(
+                            json.dumps({'task': list(task), 'train': train, 'test': test}) + '\n'
+                            for task, train, test in results
+                        )
+                        cache.flush()
+                del packed
+            finally:
+                block.close()
+                block.unlink()
+
+        rows = []
+        for s, symbol in enumerate(symbols):
+            for w, (train_start, test_start, test_end) in enumerate(windows):
+                candidates = [(short, long) for short, long in grid if (s, w, short, long) in done]
+                if not candidates:
+                    continue
+                short, long = max(
+                    candidates,
+                    key=lambda params: done[(s, w) + params][0][self.select_by]
+                )
+                train, test = done[(s, w, short, long)]
+                row = {
+                    'symbol': symbol, 'window': w,
+                    'train_start': train_start, 'test_start': test_start, 'test_end': test_end,
+                    'short_window': short, 'long_window': long,
+                }
+                row.update({f'train_{metric}': value for metric, value in train.items()})
+                row.update({f'test_{metric}': value for metric, value in test.items()})
+                rows.append(row)
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            'tasks': len(tasks),
+            'cached': cached,
+            'computed': len(pending),
+            'jobs': len(jobs),
+            'seconds': elapsed,
+            'cache_path': str(cache_path),
+        }
+        logger.info(
+            f"Walk-forward: {len(tasks)} tasks ({cached} cached, {len(pending)} computed) "
+            f"over {len(symbols)} symbols x {len(windows)} windows in {elapsed:.2f}s"
+        )
+        return WalkForwardReport(pd.DataFrame(rows), stats)
@@ -0,0 +1,499 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from services.execution_service.src.order_gateway import OrderGateway, four_leg_legs, straddle_legs
+from services.execution_service.src.order_manager import BrokerSession, ExecutionClient, Instrument, instrument_key
+from services.execution_service.src.position_manager import PositionBook, parse_portfolio_positions
+
+
+class FakeBreeze:
+    """Breeze-shaped API with simulated network latency"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.placed = []
+        self.status = {}
+        self.exchanges = {}
+        self.cancel_exchanges = []
+        self.healthy = True
+        self.log = []
+        self._lock = threading.Lock()
+
+    def place_order(self, **request):
+        time.sleep(self.latency)
+        with self._lock:
+            order_id = f"2024{len(self.placed):08d}"
+            self.placed.append(request)
+            self.exchanges[order_id] = request['exchange_code']
+            self.log.append(('order', request['stock_code']))
+        return {'Success': {'order_id': order_id, 'message': 'Successfully Placed the order'},
+                'Status': 200, 'Error': None}
+
+    def cancel_order(self, exchange_code, order_id):
+        time.sleep(self.latency)
+        with self._lock:
+            self.log.append(('cancel', order_id))
+            self.cancel_exchanges.append(exchange_code)
+        return {'Success': {'order_id': order_id, 'message': 'Successfully cancelled the order'},
+                'Status': 200, 'Error': None}
+
+    def get_order_detail(self, exchange_code, order_id):
+        if self.exchanges.get(order_id, exchange_code) != exchange_code:
+            return {'Success': [], 'Status': 200, 'Error': None}
+        row = {'order_id': order_id, 'status': self.status.get(order_id, 'Ordered'), 'average_price': '101.5'}
+        return {'Success': [row], 'Status': 200, 'Error': None}
+
+    def get_funds(self):
+        if not self.healthy:
+            return {'Success': None, 'Status': 401, 'Error': 'Session key is expired'}
+        return {'Success': {'total_bank_balance': 100000.0}, 'Status': 200, 'Error': None}
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestExecutionClient(unittest.TestCase):
+    def setUp(self):
+        self.logins = []
+
+    def connect(self, latency=0.0, login_seconds=0.0):
+        def login():
+            time.sleep(login_seconds)
+            api = FakeBreeze(latency)
+            self.logins.append(api)
+            return api
+        return login
+
+    def test_many_orders_share_one_login(self):
+        session = BrokerSession(connect=self.connect(latency=0.02, login_seconds=0.2))
+        with ExecutionClient(session, max_workers=10) as client:
+            started = time.perf_counter()
+            futures = [client.submit(f'STK{i}', 1, 'market') for i in range(50)]
+            submit_seconds = time.perf_counter() - started
+            records = [future.result() for future in futures]
+            stats = client.latency_stats()
+
+        self.assertEqual(len(self.logins), 1)
+        self.assertEqual(len(self.logins[0].placed), 50)
+        self.assertTrue(all(record.status == 'acknowledged' for record in records))
+        self.assertEqual(len({record.order_id for record in records}), 50)
+        self.assertLess(submit_seconds, 0.05)
+        self.assertEqual(stats['acknowledged'], 50)
+        self.assertGreaterEqual(stats['ack_p50_ms'], 20)
+        self.assertEqual(stats['session']['logins'], 1)
+
+    def test_order_request_matches_breeze_signature(self):
+        session = BrokerSession(connect=self.connect())
+        with ExecutionClient(session) as client:
+            client.submit('RELIND', 5, 'limit', price=2500.5, action='sell').result()
+        request = self.logins[0].placed[0]
+        self.assertEqual(request['stock_code'], 'RELIND')
+        self.assertEqual(request['action'], 'sell')
+        self.assertEqual(request['quantity'], '5')
+        self.assertEqual(request['price'], '2500.5')
+        self.assertEqual(request['exchange_code'], 'NSE')
+        self.assertEqual(request['product'], 'cash')
+        self.assertEqual(request['validity'], 'day')
+
+    def test_invalid_orders_raise_before_sending(self):
+        session = BrokerSession(connect=self.connect())
+        client = ExecutionClient(session)
+        try:
+            for kwargs in [
+                {'order_type': 'market', 'action': 'hold'},
+                {'order_type': 'bracket'},
+                {'order_type': 'market', 'product': 'crypto'},
+                {'order_type': 'market', 'validity': 'gtc'},
+                {'order_type': 'market', 'quantity': 0},
+                {'order_type': 'stoploss'},
+            ]:
+                with self.assertRaises(ValueError):
+                    client.submit('RELIND', kwargs.pop('quantity', 1), **kwargs)
+        finally:
+            client.close()
+        self.assertEqual(self.logins, [])
+
+    def test_session_refreshes_before_expiry(self):
+        clock = ManualClock()
+        session = BrokerSession(connect=self.connect(), ttl_seconds=3600, refresh_margin=300, clock=clock)
+        first = session.client()
+        clock.now = 3000
+        self.assertIs(session.client(), first)
+        clock.now = 3301
+        session.maintain()
+        self.assertEqual(len(self.logins), 2)
+        self.assertIsNot(session.client(), first)
+
+    def test_failed_health_probe_reconnects(self):
+        clock = ManualClock()
+        session = BrokerSession(connect=self.connect(), health_interval=60, clock=clock)
+        first = session.client()
+        first.healthy = False
+        clock.now = 30
+        session.maintain()
+        self.assertEqual(session.stats['health_checks'], 0)
+        clock.now = 61
+        session.maintain()
+        self.assertEqual(session.stats['health_failures'], 1)
+        self.assertEqual(len(self.logins), 2)
+        self.assertTrue(session.probe(session.client()))
+
+    def test_failed_order_is_not_retried_and_drops_session(self):
+        def login():
+            api = FakeBreeze()
+            api.place_order = lambda **request: (_ for _ in ()).throw(ConnectionError('reset'))
+            self.logins.append(api)
+            return api
+        client = ExecutionClient(BrokerSession(connect=login))
+        try:
+            record = client.submit('RELIND', 1, 'market').result()
+            self.assertEqual(record.status, 'failed')
+            self.assertIn('reset', record.error)
+            self.assertIsNone(client.session.api)
+        finally:
+            client.close()
+        self.assertEqual(len(self.logins), 1)
+
+    def test_fills_record_timestamps(self):
+        session = BrokerSession(connect=self.connect())
+        with ExecutionClient(session) as client:
+            records = [client.submit('RELIND', 1, 'market').result() for _ in range(3)]
+            api = self.logins[0]
+            api.status[records[0].order_id] = 'Executed'
+            self.assertEqual(client.poll_fills(), 1)
+            client.on_order_update({'order_id': records[1].order_id, 'status': 'Cancelled'})
+            self.assertEqual(client.poll_fills(), 0)
+
+        self.assertEqual(records[0].status, 'filled')
+        self.assertEqual(records[0].fill_price, 101.5)
+        self.assertLessEqual(records[0].queued_at, records[0].sent_at)
+        self.assertLessEqual(records[0].acked_at, records[0].filled_at)
+        self.assertEqual(records[1].status, 'cancelled')
+        self.assertEqual(records[2].status, 'acknowledged')
+        self.assertEqual(client.latency_stats()['filled'], 1)
+
+    def test_asubmit(self):
+        session = BrokerSession(connect=self.connect(latency=0.01))
+
+        async def place(client):
+            return await asyncio.gather(*(client.asubmit('RELIND', 1, 'market') for _ in range(5)))
+
+        with ExecutionClient(session) as client:
+            records = asyncio.run(place(client))
+        self.assertEqual([record.status for record in records], ['acknowledged'] * 5)
+
+
+class TestOrderGateway(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeBreeze()
+        self.client = ExecutionClient(BrokerSession(connect=lambda: self.api), max_workers=8)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_cancels_then_reductions_then_new_entries(self):
+        positions = {instrument_key('HOLD'): 10}
+        gateway = OrderGateway(self.client, rate=200, burst=1, reserve=0, position_of=positions.get)
+        futures = [gateway.submit(f'NEW{i}', 1, 'market') for i in range(5)]
+        futures.append(gateway.submit('HOLD', 5, 'market', action='sell'))
+        futures.append(gateway.cancel('20240000'))
+        self.assertEqual(gateway.pending(), {'cancel': 1, 'reduce': 1, 'new': 5})
+        with gateway:
+            for future in futures:
+                future.result(timeout=5)
+        self.assertEqual(self.api.log[0], ('cancel', '20240000'))
+        self.assertEqual(self.api.log[1], ('order', 'HOLD'))
+        self.assertEqual([name for _, name in self.api.log[2:]], [f'NEW{i}' for i in range(5)])
+
+    def test_cancel_under_load_skips_the_backlog(self):
+        with OrderGateway(self.client, rate=20, burst=2, reserve=1) as gateway:
+            orders = [gateway.submit(f'NEW{i}', 1, 'market') for i in range(20)]
+            time.sleep(0.1)
+            started = time.monotonic()
+            gateway.cancel('20240000').result(timeout=5)
+            cancel_seconds = time.monotonic() - started
+            self.assertGreater(gateway.pending()['new'], 10)
+            for future in orders:
+                future.result(timeout=5)
+            stats = gateway.wait_stats()
+        self.assertLess(cancel_seconds, 0.1)
+        self.assertEqual(stats['cancel']['count'], 1)
+        self.assertEqual(stats['new']['count'], 20)
+        self.assertLess(stats['cancel']['max_ms'], stats['new']['p50_ms'])
+
+    def test_throttle_limits_request_rate(self):
+        with OrderGateway(self.client, rate=50, burst=5, reserve=0) as gateway:
+            started = time.monotonic()
+            for future in [gateway.submit(f'NEW{i}', 1, 'market') for i in range(20)]:
+                future.result(timeout=5)
+            elapsed = time.monotonic() - started
+        self.assertGreaterEqual(elapsed, (20 - 5) / 50 * 0.9)
+
+    def test_basket_legs_are_sent_in_order(self):
+        legs = four_leg_legs('NIFTY', 25, '2024-08-14T06:00:00.000Z', 24900, 23000, 24850, 23050)
+        with OrderGateway(self.client, rate=100, burst=5, reserve=1) as gateway:
+            records = gateway.submit_basket(legs).result(timeout=5)
+        self.assertEqual([record.status for record in records], ['acknowledged'] * 4)
+        self.assertEqual([(r['action'], r['right']) for r in self.api.placed],
+                         [('buy', 'call'), ('buy', 'put'), ('sell', 'call'), ('sell', 'put')])
+        self.assertEqual(self.api.placed[0]['strike_price'], '24850')
+        self.assertEqual(self.api.placed[0]['product'], 'options')
+
+    def test_rejected_leg_stops_the_basket(self):
+        place = self.api.place_order
+
+        def reject_puts(**request):
+            if request['right'] == 'put':
+                return {'Success': None, 'Status': 500, 'Error': 'Insufficient margin'}
+            return place(**request)
+
+        self.api.place_order = reject_puts
+        legs = four_leg_legs('NIFTY', 25, '2024-08-14T06:00:00.000Z', 24900, 23000, 24850, 23050)
+        with OrderGateway(self.client, rate=100, burst=5, reserve=1) as gateway:
+            records = gateway.submit_basket(legs).result(timeout=5)
+            self.assertEqual(gateway.in_flight, 0)
+        self.assertEqual([record.status for record in records], ['acknowledged', 'rejected'])
+        self.assertEqual(len(self.api.placed), 1)
+
+    def test_basket_validation(self):
+        gateway = OrderGateway(self.client, rate=100, burst=5, reserve=1)
+        legs = straddle_legs('NIFTY', 18700, 50, '2023-06-29T06:00:00.000Z')
+        with self.assertRaises(ValueError):
+            gateway.submit_basket([dict(legs[0], right=None), legs[1]])
+        with self.assertRaises(ValueError):
+            gateway.submit_basket(legs * 3)
+        with self.assertRaises(ValueError):
+            gateway.submit('NIFTY', 50, 'market', product='options')
+
+    def test_option_legs_are_polled_and_cancelled_on_their_exchange(self):
+        legs = straddle_legs('NIFTY', 24000, 25, '2024-08-29T06:00:00.000Z')
+        with OrderGateway(self.client, rate=100, burst=5, reserve=1) as gateway:
+            call, put = gateway.submit_basket(legs).result(timeout=5)
+            self.api.status[call.order_id] = 'Executed'
+            self.assertEqual(self.client.poll_fills(), 1)
+            gateway.cancel(put.order_id).result(timeout=5)
+        self.assertEqual(call.status, 'filled')
+        self.assertEqual(put.status, 'cancelled')
+        self.assertEqual(self.api.cancel_exchanges, ['NFO'])
+
+    def test_withdrawn_and_undrained_requests_are_not_sent(self):
+        gateway = OrderGateway(self.client, rate=100, burst=5, reserve=0)
+        withdrawn = gateway.submit('A', 1, 'market')
+        kept = gateway.submit('B', 1, 'market')
+        self.assertTrue(withdrawn.cancel())
+        with gateway:
+            kept.result(timeout=5)
+        self.assertEqual(self.api.log, [('order', 'B')])
+
+        gateway = OrderGateway(self.client, rate=100, burst=5, reserve=0)
+        queued = gateway.submit('C', 1, 'market')
+        gateway.close(drain=False)
+        self.assertTrue(queued.cancelled())
+        with self.assertRaises(RuntimeError):
+            gateway.submit('D', 1, 'market')
+
+
+def portfolio(*rows):
+    return {'Success': [
+        {'stock_code': code, 'action': action, 'quantity': str(quantity), 'average_price': str(price)}
+        for code, action, quantity, price in rows
+    ], 'Status': 200, 'Error': None}
+
+
+class TestPositionBook(unittest.TestCase):
+    def test_fills_update_average_price_and_realized_pnl(self):
+        book = PositionBook(capacity=1)
+        self.assertEqual(book.apply_fill('INFY', 10, 100), 0)
+        book.apply_fill('INFY', 10, 110)
+        self.assertEqual(book.average_price[0], 105)
+        self.assertEqual(book.apply_fill('INFY', -15, 120), 225)
+        self.assertEqual((book.position('INFY'), book.average_price[0]), (5, 105))
+        self.assertEqual(book.apply_fill('INFY', -10, 100, fees=1), -26)
+        self.assertEqual((book.position('INFY'), book.average_price[0]), (-5, 100))
+        self.assertEqual(book.apply_fill('INFY', 5, 90), 50)
+        self.assertEqual((book.position('INFY'), book.average_price[0]), (0, 0))
+        self.assertEqual(book.realized[0], 249)
+        with self.assertRaises(ValueError):
+            book.apply_fill('INFY', 0, 100)
+
+        book.apply_fill('TCS', -3, 50)
+        self.assertEqual(len(book), 2)
+        self.assertEqual(book.position('TCS'), -3)
+        self.assertEqual(book.position('WIPRO'), 0)
+
+    def test_mark_to_market_is_vectorized_over_book(self):
+        rng = np.random.default_rng(0)
+        book = PositionBook(capacity=4)
+        symbols = [f'S{i}' for i in range(500)]
+        for _ in range(3):
+            for symbol in symbols:
+                book.apply_fill(symbol, float(rng.choice([-10, -3, 2, 7])), float(rng.uniform(90, 110)))
+        prices = rng.uniform(90, 110, len(symbols))
+        unrealized = book.mark(prices)
+        expected = [
+            book.position(s) * (prices[i] - book.average_price[i]) if book.position(s) else 0.0
+            for i, s in enumerate(symbols)
+        ]
+        np.testing.assert_allclose(unrealized, expected)
+
+        partial = book.price_vector({'S0': 200.0})
+        self.assertTrue(np.isnan(partial[1]))
+        again = book.mark(partial)
+        self.assertAlmostEqual(again[1], unrealized[1])
+        pnl = book.pnl()
+        self.assertAlmostEqual(pnl['total'], pnl['realized'] + pnl['unrealized'])
+
+    def test_parse_portfolio_positions_nets_rows(self):
+        positions = parse_portfolio_positions(portfolio(('INFY', 'Buy', 10, 100), ('INFY', 'Buy', 10, 110),
+                                                        ('TCS', 'Sell', 4, 50)))
+        self.assertEqual(positions[instrument_key('INFY')], {'quantity': 20, 'average_price': 105})
+        self.assertEqual(positions[instrument_key('TCS')], {'quantity': -4, 'average_price': 50})
+        with self.assertRaises(RuntimeError):
+            parse_portfolio_positions({'Success': None, 'Status': 500, 'Error': 'down'})
+
+    def test_reconcile_corrects_breaks_but_not_fresh_fills(self):
+        book = PositionBook()
+        book.apply_fill('INFY', 10, 100)
+        book.apply_fill('TCS', 5, 50)
+        book.apply_fill('HDFC', 2, 10)
+
+        def fetch():
+            book.apply_fill('TCS', 5, 60)  # lands while the broker is queried
+            return portfolio(('INFY', 'Buy', 8, 100), ('TCS', 'Buy', 5, 50), ('SBIN', 'Sell', 3, 20))
+
+        self.assertEqual(sorted(i.stock_code for i in book.reconcile(fetch)), ['HDFC', 'INFY', 'SBIN'])
+        self.assertEqual(book.position('INFY'), 8)
+        self.assertEqual(book.position('TCS'), 10)
+        self.assertEqual(book.position('HDFC'), 0)
+        self.assertEqual(book.position('SBIN'), -3)
+        self.assertEqual(book.stats['breaks'], 3)
+        self.assertEqual(book.stats['skipped'], 1)
+        self.assertEqual(book.reconcile(lambda: portfolio(('INFY', 'Buy', 8, 100), ('TCS', 'Buy', 10, 55),
+                                                          ('SBIN', 'Sell', 3, 20))), [])
+
+    def test_background_reconcile_does_not_block_fills(self):
+        book = PositionBook()
+        queried = threading.Event()
+
+        def slow_fetch():
+            queried.set()
+            time.sleep(0.3)
+            return portfolio(('INFY', 'Buy', 1, 100))
+
+        book.start_reconciler(slow_fetch, interval=0.01)
+        try:
+            self.assertTrue(queried.wait(1))
+            started = time.perf_counter()
+            for _ in range(1000):
+                book.apply_fill('TCS', 1, 100)
+            self.assertLess(time.perf_counter() - started, 0.2)
+        finally:
+            book.stop_reconciler()
+        self.assertEqual(book.position('TCS'), 1000)
+        self.assertEqual(book.position('INFY'), 1)
+
+    def test_save_and_load(self):
+        book = PositionBook()
+        book.apply_fill('INFY', 10, 100)
+        book.apply_fill('INFY', -4, 110)
+        book.mark(np.array([105.0]))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'positions.npz')
+            book.save(path)
+            restored = PositionBook.load(path)
+        self.assertEqual(restored.snapshot(), book.snapshot())
+        self.assertEqual(restored.pnl(), book.pnl())
+
+    def test_books_client_fills_and_feeds_gateway_priority(self):
+        api = FakeBreeze()
+        book = PositionBook()
+        client = ExecutionClient(BrokerSession(connect=lambda: api))
+        client.fill_listeners.append(book.on_fill)
+        try:
+            record = client.submit('INFY', 10, 'market').result()
+            client.on_order_update({'order_id': record.order_id, 'status': 'Executed', 'average_price': '101.5'})
+            self.assertEqual(book.position('INFY'), 10)
+            self.assertEqual(book.average_price[book.slot('INFY')], 101.5)
+
+            gateway = OrderGateway(client, rate=100, burst=5, position_of=book.position)
+            gateway.submit('INFY', 5, 'market')
+            gateway.submit('INFY', 5, 'market', action='sell')
+            self.assertEqual(gateway.pending(), {'cancel': 0, 'reduce': 1, 'new': 1})
+            gateway.close(drain=False)
+        finally:
+            client.close()
+
+    def test_a_fill_reported_twice_at_once_is_booked_once(self):
+        api = FakeBreeze()
+        book = PositionBook()
+        client = ExecutionClient(BrokerSession(connect=lambda: api))
+        client.fill_listeners.append(book.on_fill)
+        try:
+            record = client.submit('INFY', 10, 'market').result()
+            # A slow clock widens the window between the filled check and the update
+            client.clock = lambda: time.sleep(0.01) or time.monotonic()
+            update = {'order_id': record.order_id, 'status': 'Executed', 'average_price': '101.5'}
+            threads = [threading.Thread(target=client.on_order_update, args=(update,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(book.position('INFY'), 10)
+            self.assertEqual(book.fills, 1)
+        finally:
+            client.close()
+
+    def test_option_legs_are_separate_instruments(self):
+        api = FakeBreeze()
+        book = PositionBook()
+        client = ExecutionClient(BrokerSession(connect=lambda: api))
+        client.fill_listeners.append(book.on_fill)
+        expiry = '2024-08-14T06:00:00.000Z'
+        try:
+            legs = straddle_legs('NIFTY', 24000, 25, expiry)
+            for leg in legs:
+                record = client.submit(**leg).result()
+                client.on_order_update({'order_id': record.order_id, 'status': 'Executed', 'average_price': '100'})
+            call = instrument_key('NIFTY', 'NFO', 'options', expiry, 'call', 24000)
+            put = instrument_key('NIFTY', 'NFO', 'options', expiry, 'put', 24000)
+            self.assertEqual((book.position(call), book.position(put), len(book)), (25, 25, 2))
+            self.assertEqual(book.position('NIFTY'), 0)
+
+            # Selling a call at another strike opens a naked short: not a reduction
+            gateway = OrderGateway(client, rate=100, burst=5, position_of=book.position)
+            gateway.submit('NIFTY', 25, 'market', action='sell', product='options', exchange_code='NFO',
+                           right='call', strike_price=24500, expiry_date=expiry)
+            gateway.submit('NIFTY', 25, 'market', action='sell', product='options', exchange_code='NFO',
+                           right='call', strike_price=24000, expiry_date=expiry)
+            self.assertEqual(gateway.pending(), {'cancel': 0, 'reduce': 1, 'new': 1})
+            gateway.close(drain=False)
+        finally:
+            client.close()
+
+        # The broker's rows for the same legs build the same keys
+        row = {'stock_code': 'NIFTY', 'exchange_code': 'NFO', 'product_type': 'Options', 'expiry_date': '14-Aug-2024',
+               'strike_price': '24000', 'action': 'Buy', 'quantity': '25', 'average_price': '100'}
+        response = {'Success': [dict(row, right='Call'), dict(row, right='Put')], 'Status': 200, 'Error': None}
+        self.assertEqual(set(parse_portfolio_positions(response)), {call, put})
+        self.assertEqual(book.reconcile(lambda: response), [])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'positions.npz')
+            book.save(path)
+            self.assertEqual(PositionBook.load(path).snapshot(), book.snapshot())
+        self.assertIsInstance(next(iter(book.snapshot())), Instrument)
+
+
+if __name__ == '__main__':
+    unittest.main()
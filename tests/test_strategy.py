@@ -0,0 +1,540 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from services.strategy_service.src.backtest import (
+    BacktestEngine, BarData, BpsSlippage, FixedLatency, MovingAverageCrossStrategy, PercentCommission, Strategy
+)
+from services.strategy_service.src.indicator_cache import IndicatorCache
+from services.strategy_service.src.indicators import (
+    DEFAULT_INDICATORS, IndicatorGraph, atr, bollinger, ema, macd, obv, rsi, sma, stochastic, volatility, vwap
+)
+from services.strategy_service.src.signal_engine import (
+    SIGNAL_DTYPE, MovingAverageCrossSignal, RsiSignal, SignalEngine, SignalStrategy
+)
+from services.strategy_service.src.strategy import moving_average_strategy
+from services.strategy_service.src.sweep import moving_average_sweep, performance, rolling_means, strategy_returns
+from services.strategy_service.src.walk_forward import WalkForwardOptimizer
+
+
+def daily_closes(n=1260, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, n)))
+
+
+class TestMovingAverageSweep(unittest.TestCase):
+    def test_rolling_means_match_pandas(self):
+        close = daily_closes(300)
+        means = rolling_means(close, [5, 50])
+        expected = pd.Series(close).rolling(50).mean().to_numpy()
+        np.testing.assert_allclose(means[1], expected, rtol=1e-10)
+        self.assertTrue(np.isnan(means[0, :4]).all())
+
+    def test_grid_matches_single_strategy_runs(self):
+        close = daily_closes(500)
+        result = moving_average_sweep(close, [5, 20, 60], [30, 100], cost=0.001)
+
+        for i, short in enumerate([5, 20, 60]):
+            for j, long in enumerate([30, 100]):
+                if short >= long:
+                    self.assertTrue(np.isnan(result.grids['sharpe'][i, j]))
+                    continue
+                data = moving_average_strategy(pd.DataFrame({'close': close}), short, long)
+                held = data['signal'].shift(1).fillna(0)
+                pnl = held * data['close'].pct_change().fillna(0)
+                pnl -= 0.001 * data['position'].abs().shift(1).fillna(0)
+                pnl = pnl.iloc[1:]
+                equity = (1 + pnl).cumprod()
+
+                self.assertAlmostEqual(result.grids['total_return'][i, j], equity.iloc[-1] - 1, places=10)
+                self.assertAlmostEqual(
+                    result.grids['sharpe'][i, j], pnl.mean() / pnl.std() * np.sqrt(252), places=8
+                )
+                self.assertAlmostEqual(
+                    result.grids['max_drawdown'][i, j], (equity / equity.cummax() - 1).min(), places=10
+                )
+
+    def test_ranking_and_speed(self):
+        close = daily_closes()
+        started = time.perf_counter()
+        result = moving_average_sweep(close, range(2, 102), range(10, 310, 3))
+        elapsed = time.perf_counter() - started
+
+        ranked = result.ranked('sharpe', top=10)
+        self.assertEqual(len(ranked), 10)
+        self.assertTrue((ranked['short_window'] < ranked['long_window']).all())
+        self.assertTrue(ranked['sharpe'].is_monotonic_decreasing)
+        self.assertLess(elapsed, 2.0)
+
+
+class ScriptedStrategy(Strategy):
+    """Submits pre-set orders on given bar indexes."""
+
+    def __init__(self, orders):
+        self.orders = orders
+
+    def on_bar(self, ctx):
+        for kwargs in self.orders.get(ctx.index, []):
+            ctx.order(**kwargs)
+
+
+def minute_bars(opens, highs, lows, closes, start='2024-01-02 09:15'):
+    ts = pd.date_range(start, periods=len(opens), freq='min').to_numpy()
+    column = lambda values: np.asarray(values, dtype=float)[:, None]
+    return BarData(ts, ['INFY'], column(opens), column(highs), column(lows), column(closes))
+
+
+class TestBacktestEngine(unittest.TestCase):
+    def run_orders(self, orders, bars=None, **kwargs):
+        bars = bars or minute_bars(
+            [100, 101, 102, 103, 104], [101, 103, 104, 105, 106], [99, 100, 95, 102, 103], [100, 102, 103, 104, 105]
+        )
+        return BacktestEngine(bars, ScriptedStrategy(orders), initial_cash=10_000, **kwargs).run()
+
+    def test_market_order_fills_at_next_open_with_costs(self):
+        result = self.run_orders(
+            {0: [dict(symbol=0, quantity=10)]},
+            slippage=BpsSlippage(10), commission=PercentCommission(0.001, maximum=None)
+        )
+
+        fills = result.fills()
+        self.assertEqual(fills['stock_code'].tolist(), ['INFY'])
+        self.assertAlmostEqual(fills['price'].iat[0], 101 * 1.001)
+        self.assertAlmostEqual(fills['commission'].iat[0], 101 * 1.001 * 10 * 0.001)
+        self.assertEqual(result.positions.tolist(), [10])
+        self.assertAlmostEqual(result.equity.iat[-1], 10_000 - 10 * 101 * 1.001 * 1.001 + 10 * 105)
+
+    def test_limit_orders_rest_and_ioc_cancels(self):
+        result = self.run_orders({0: [
+            dict(symbol=0, quantity=5, order_type='limit', price=96.0),
+            dict(symbol=0, quantity=5, order_type='limit', price=96.0, validity='ioc'),
+        ]})
+
+        fills = result.fills()
+        self.assertEqual(len(fills), 1)
+        self.assertEqual(fills['price'].iat[0], 96.0)
+        self.assertEqual(fills['datetime'].iat[0], pd.Timestamp('2024-01-02 09:17'))
+        self.assertEqual(result.stats['cancels'], 1)
+
+    def test_stoploss_sell_triggers_below_trigger(self):
+        result = self.run_orders({0: [
+            dict(symbol=0, quantity=1),
+            dict(symbol=0, quantity=1, action='sell', order_type='stoploss', stoploss=98.0, validity='vtc'),
+        ]})
+
+        self.assertEqual(result.fills()['price'].tolist(), [101.0, 98.0])
+        self.assertEqual(result.positions.tolist(), [0])
+
+    def test_latency_and_day_expiry(self):
+        # Orders leave at the 09:16 close of the 09:15 bar and fill at the first open at or after arrival
+        for latency, expected in [(0, '09:16'), (50, '09:17'), (59_000, '09:17'), (60_000, '09:17'),
+                                  (90_000, '09:18'), (120_000, '09:18')]:
+            filled = self.run_orders({0: [dict(symbol=0, quantity=1)]}, latency=FixedLatency(latency))
+            self.assertEqual(filled.fills()['datetime'].iat[0], pd.Timestamp('2024-01-02 ' + expected), latency)
+
+        bars = minute_bars([100, 100], [101, 101], [99, 99], [100, 100], start='2024-01-02 15:29')
+        bars.timestamps[1] += 86400 * 10**9 - 60 * 10**9
+        expired = self.run_orders({0: [dict(symbol=0, quantity=1, order_type='limit', price=50.0)]}, bars=bars)
+        self.assertEqual(expired.stats['cancels'], 1)
+
+    def test_rejects_unknown_vocabulary(self):
+        with self.assertRaisesRegex(ValueError, "Order-type should be either"):
+            self.run_orders({0: [dict(symbol=0, quantity=1, order_type='bracket')]})
+
+    def test_moving_average_cross_follows_the_signal(self):
+        close = daily_closes(400)
+        ts = pd.date_range('2020-01-01', periods=400, freq='D').to_numpy()
+        bars = BarData(ts, ['A', 'B'], *([np.column_stack([close, close[::-1]])] * 4), bar_ns=86400 * 10**9)
+
+        result = BacktestEngine(bars, MovingAverageCrossStrategy(10, 50, quantity=3)).run()
+
+        for column, series in enumerate([close, close[::-1]]):
+            signal = moving_average_strategy(pd.DataFrame({'close': series}), 10, 50)['signal']
+            self.assertEqual(result.positions[column], 3 * signal.iat[-2])
+        self.assertEqual(result.stats['bars'], 800)
+        self.assertGreater(result.stats['events_per_second'], 0)
+
+
+def ohlcv(n=600, seed=3):
+    rng = np.random.default_rng(seed)
+    close = daily_closes(n, seed)
+    return {
+        'high': close * (1 + rng.uniform(0, 0.01, n)),
+        'low': close * (1 - rng.uniform(0, 0.01, n)),
+        'close': close,
+        'volume': rng.integers(100, 1000, n).astype(np.float64),
+    }
+
+
+class TestIndicators(unittest.TestCase):
+    def assertSeriesClose(self, actual, expected, rtol=1e-9):
+        np.testing.assert_allclose(actual, np.asarray(expected, dtype=np.float64), rtol=rtol, atol=1e-9)
+
+    def test_batch_matches_pandas(self):
+        data = ohlcv()
+        out = IndicatorGraph(*DEFAULT_INDICATORS).compute(data)
+        df = pd.DataFrame(data)
+        close = df['close']
+
+        ema_12 = close.ewm(span=12, adjust=False).mean()
+        line = ema_12 - close.ewm(span=26, adjust=False).mean()
+        self.assertSeriesClose(out['ema_12'], ema_12)
+        self.assertSeriesClose(out['macd_signal_12_26_9'], line.ewm(span=9, adjust=False).mean())
+        self.assertSeriesClose(
+            out['bb_lower_20'], close.rolling(20).mean() - 2 * close.rolling(20).std(), rtol=1e-7
+        )
+
+        prev_close = close.shift()
+        true_range = pd.concat(
+            [df['high'] - df['low'], (df['high'] - prev_close).abs(), (df['low'] - prev_close).abs()], axis=1
+        ).max(axis=1)
+        self.assertSeriesClose(out['atr_14'], true_range.ewm(alpha=1 / 14, adjust=False).mean())
+
+        typical = (df['high'] + df['low'] + close) / 3
+        self.assertSeriesClose(out['vwap'], (typical * df['volume']).cumsum() / df['volume'].cumsum())
+        stoch_k = 100 * (close - df['low'].rolling(14).min()) / (
+            df['high'].rolling(14).max() - df['low'].rolling(14).min()
+        )
+        self.assertSeriesClose(out['stoch_d_14_3'], stoch_k.rolling(3).mean())
+        self.assertSeriesClose(out['obv'], (np.sign(close.diff()).fillna(0) * df['volume']).cumsum())
+        self.assertSeriesClose(out['volatility_20'], close.pct_change().rolling(20).std(), rtol=1e-7)
+
+    def test_shared_intermediates_are_computed_once(self):
+        graph = IndicatorGraph(sma(20), bollinger(20), vwap(20), ema(12), macd())
+        sums = [node for node in graph.nodes if node.kind == 'sum']
+        emas = [node for node in graph.nodes if node.kind == 'ema']
+        # close, close**2, price * volume and volume; EMA 12, 26 and the MACD signal
+        self.assertEqual(len(sums), 4)
+        self.assertEqual(len(emas), 3)
+        self.assertEqual(graph.outputs['sma_20'], graph.outputs['bb_mid_20'])
+        with self.assertRaises(ValueError):
+            IndicatorGraph(sma(20), {'sma_20': graph.outputs['ema_12']})
+
+    def test_panel_matches_single_series(self):
+        first, second = ohlcv(seed=4), ohlcv(seed=5)
+        panel = {field: np.column_stack([first[field], second[field]]) for field in first}
+        graph = IndicatorGraph(*DEFAULT_INDICATORS)
+        out = graph.compute(panel)
+        for column, data in enumerate([first, second]):
+            single = graph.compute(data)
+            for name, values in single.items():
+                np.testing.assert_allclose(out[name][:, column], values, rtol=1e-9, err_msg=name)
+
+    def test_stream_matches_batch_with_gaps(self):
+        data = ohlcv(1500)
+        data['close'] = data['close'].copy()
+        data['close'][:5] = np.nan
+        data['close'][700] = np.nan
+        graph = IndicatorGraph(*DEFAULT_INDICATORS, atr(5), stochastic(5, 2), obv(), volatility(10))
+        batch = graph.compute(data)
+        streamed = graph.stream().update_many(data)
+        for name, values in batch.items():
+            np.testing.assert_allclose(streamed[name], values, rtol=1e-8, atol=1e-8, err_msg=name)
+        # A NaN bar blanks the average for that bar only
+        self.assertTrue(np.isnan(batch['ema_12'][700]))
+        self.assertFalse(np.isnan(batch['ema_12'][701]))
+
+    def test_masked_panel_stream_matches_each_symbol(self):
+        series = [ohlcv(400, seed=seed) for seed in (8, 9, 10)]
+        graph = IndicatorGraph(rsi(), stochastic(), atr(), vwap(10), macd())
+        expected = [graph.compute(data) for data in series]
+        stream = graph.stream()
+        positions = [120, 150, 200]
+        for column, (data, start) in enumerate(zip(series, positions)):
+            history = {field: values[:start] for field, values in data.items()}
+            stream.prime(graph.evaluate(history), column=column, width=3)
+
+        rng = np.random.default_rng(0)
+        while min(positions) < 400:
+            mask = (rng.random(3) < 0.5) & (np.array(positions) < 400)
+            row = {
+                field: np.array([
+                    data[field][min(position, 399)] for data, position in zip(series, positions)
+                ])
+                for field in graph.fields
+            }
+            out = stream.update(row, mask)
+            for column in np.flatnonzero(mask):
+                for name, values in out.items():
+                    np.testing.assert_allclose(
+                        values[column], expected[column][name][positions[column]], rtol=1e-8, err_msg=name
+                    )
+                positions[column] += 1
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = ohlcv(800)
+        self.timestamps = pd.date_range('2024-01-02 09:15', periods=800, freq='min').to_numpy()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def head(self, n):
+        return {field: values[:n] for field, values in self.data.items()}
+
+    def test_hits_and_extends_match_a_full_computation(self):
+        cache = IndicatorCache()
+        expected = IndicatorGraph(rsi(14), macd(), bollinger(20)).compute(self.data)
+
+        cache.get('INFY', '1minute', self.head(700), rsi(14), macd(), timestamps=self.timestamps[:700])
+        cache.get('INFY', '1minute', self.head(700), rsi(14), macd(), timestamps=self.timestamps[:700])
+        out = cache.get('INFY', '1minute', self.data, rsi(14), macd(), bollinger(20), timestamps=self.timestamps)
+
+        for name in ['rsi_14', 'macd_12_26', 'bb_upper_20']:
+            np.testing.assert_allclose(out[name], expected[name], rtol=1e-8, err_msg=name)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['extends'], stats['misses']), (2, 2, 3))
+        self.assertAlmostEqual(stats['hit_rate'], 4 / 7)
+        self.assertEqual(stats['bytes'], 800 * 8 * 7)
+        with self.assertRaises(ValueError):
+            out['rsi_14'][0] = 0.0
+
+    def test_changed_history_is_recomputed(self):
+        cache = IndicatorCache()
+        cache.get('INFY', '1minute', self.head(500), sma(50))
+        revised = self.head(600)
+        revised['close'] = revised['close'] * 1.01
+
+        out = cache.get('INFY', '1minute', revised, sma(50))
+        np.testing.assert_allclose(out['sma_50'], pd.Series(revised['close']).rolling(50).mean(), rtol=1e-9)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+        cache.get('INFY', '1minute', self.head(600), sma(50), timestamps=self.timestamps[:600])
+        cache.get('INFY', '1minute', revised, sma(50), timestamps=self.timestamps[100:700])
+        self.assertEqual(cache.stats()['invalidations'], 3)
+
+    def test_lru_spills_to_disk_and_promotes_back(self):
+        one_entry = 800 * 8
+        cache = IndicatorCache(max_bytes=2 * one_entry, disk_dir=self.tmp.name)
+        for symbol in ['INFY', 'TCS', 'WIPRO']:
+            cache.get(symbol, '1day', self.data, sma(20), timestamps=self.timestamps)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertNotIn('INFY', [key[0] for key in cache.entries])
+
+        out = cache.get('INFY', '1day', self.data, sma(20), timestamps=self.timestamps)
+        stats = cache.stats()
+        self.assertEqual((stats['disk_hits'], stats['hits'], stats['entries']), (1, 1, 2))
+        self.assertGreater(stats['disk_bytes'], 0)
+        np.testing.assert_allclose(out['sma_20'], pd.Series(self.data['close']).rolling(20).mean(), rtol=1e-9)
+
+        cache.flush()
+        fresh = IndicatorCache(disk_dir=self.tmp.name)
+        fresh.get('TCS', '1day', self.data, sma(20), timestamps=self.timestamps)
+        self.assertEqual(fresh.stats()['disk_hits'], 1)
+
+    def test_invalidate_removes_spilled_entries(self):
+        one_entry = 800 * 8
+        cache = IndicatorCache(max_bytes=one_entry, disk_dir=self.tmp.name)
+        cache.get('INFY', '1minute', self.data, sma(5), timestamps=self.timestamps)
+        cache.get('INFY', '1day', self.data, sma(5), timestamps=self.timestamps)
+        cache.get('TCS', '1minute', self.data, sma(5), timestamps=self.timestamps)
+        self.assertEqual(cache.stats()['spills'], 2)
+
+        cache.invalidate(symbol='INFY', interval='1minute')
+        cache.get('INFY', '1minute', self.data, sma(5), timestamps=self.timestamps)
+        self.assertEqual(cache.stats()['disk_hits'], 0)
+
+        cache.invalidate(interval='1day')
+        cache.get('INFY', '1day', self.data, sma(5), timestamps=self.timestamps)
+        self.assertEqual(cache.stats()['disk_hits'], 0)
+        self.assertEqual(cache.stats()['misses'], 5)
+
+
+class CountingStrategy(SignalStrategy):
+    def __init__(self, name, clock=None, cost=0.0, fail_on=None):
+        self.name = name
+        self.clock = clock
+        self.cost = cost
+        self.fail_on = fail_on
+        self.calls = []
+
+    def on_bar(self, symbol, bar, values, state):
+        self.calls.append(symbol)
+        if self.clock is not None:
+            self.clock.now += self.cost
+        if symbol == self.fail_on:
+            raise RuntimeError("bad bar")
+        state['bars'] = state.get('bars', 0) + 1
+        return float(state['bars'])
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def bar_rows(close, start='2024-01-02 09:15'):
+    stamps = pd.date_range(start, periods=len(close), freq='min').strftime('%Y-%m-%d %H:%M:%S')
+    return [{'datetime': stamp, 'close': value} for stamp, value in zip(stamps, close)]
+
+
+class TestSignalEngine(unittest.TestCase):
+    def test_incremental_signals_match_batch_strategies(self):
+        closes = {'INFY': daily_closes(400, seed=6), 'TCS': daily_closes(400, seed=7)}
+        engine = SignalEngine()
+        engine.register(MovingAverageCrossSignal(10, 40), ['INFY', 'TCS'])
+        engine.register(RsiSignal(14), ['INFY'])
+        for symbol, close in closes.items():
+            engine.warm_up(symbol, {'close': close[:300]})
+
+        rows = {symbol: bar_rows(close) for symbol, close in closes.items()}
+        for t in range(300, 400):
+            batch = engine.process({symbol: rows[symbol][t] for symbol in closes})
+            self.assertEqual(batch.signals.dtype, SIGNAL_DTYPE)
+            self.assertEqual(len(batch), 3)
+
+        frame = batch.to_frame()
+        for symbol, close in closes.items():
+            expected = moving_average_strategy(pd.DataFrame({'close': close}), 10, 40)['signal'].iloc[-1]
+            signal = frame[(frame['symbol'] == symbol) & (frame['strategy'] == 'ma_cross_10_40')]['signal']
+            self.assertEqual(signal.item(), expected)
+        self.assertEqual(frame['timestamp'].iloc[0], pd.Timestamp('2024-01-02 09:15') + pd.Timedelta(minutes=399))
+
+    def test_only_subscribers_of_closed_bars_run(self):
+        engine = SignalEngine()
+        infy_only = CountingStrategy('infy_only')
+        both = CountingStrategy('both')
+        engine.register(infy_only, ['INFY'])
+        engine.register(both, ['INFY', 'TCS'])
+        bar = {'datetime': '2024-01-02 09:15:00', 'close': 100.0}
+
+        engine.on_bar('TCS', '1minute', bar)
+        engine.on_bar('WIPRO', '1minute', bar)
+        engine.on_bar('TCS', '5minute', bar)
+        batch = engine.run_cycle()
+        self.assertEqual((infy_only.calls, both.calls), ([], ['TCS']))
+        self.assertEqual(batch.stats['bars'], 1)
+
+        engine.on_bar('INFY', '1minute', bar)
+        engine.on_bar('TCS', '1minute', bar)
+        batch = engine.run_cycle()
+        # Per-(strategy, symbol) state persists between cycles
+        self.assertEqual(batch.to_frame()['signal'].tolist(), [1.0, 1.0, 2.0])
+        with self.assertRaises(RuntimeError):
+            engine.register(CountingStrategy('late'), ['TCS'])
+
+    def test_bars_queued_during_a_cycle_are_not_lost(self):
+        engine = SignalEngine()
+        counting = CountingStrategy('counting')
+        engine.register(counting, ['INFY', 'TCS'])
+        bar = {'datetime': '2024-01-02 09:15:00', 'close': 100.0}
+        fed = 2000
+
+        def feed():
+            for i in range(fed):
+                engine.on_bar('INFY' if i % 2 else 'TCS', '1minute', bar)
+
+        feeder = threading.Thread(target=feed)
+        feeder.start()
+        processed = 0
+        while feeder.is_alive():
+            processed += engine.run_cycle().stats['bars']
+        feeder.join()
+        processed += engine.run_cycle().stats['bars']
+
+        self.assertEqual(processed, fed)
+        self.assertEqual(len(counting.calls), fed)
+
+    def test_latency_budget_and_failures_are_reported(self):
+        clock = ManualClock()
+        engine = SignalEngine(budget_ms=10.0, clock=clock)
+        engine.register(CountingStrategy('fast', clock, cost=0.001), ['INFY', 'TCS'])
+        engine.register(CountingStrategy('slow', clock, cost=0.008, fail_on='TCS'), ['INFY', 'TCS'])
+        bar = {'datetime': '2024-01-02 09:15:00', 'close': 100.0}
+
+        with self.assertLogs('services.strategy_service.src.signal_engine', level='WARNING'):
+            batch = engine.process({'INFY': bar, 'TCS': bar})
+        self.assertTrue(batch.stats['over_budget'])
+        self.assertEqual(batch.stats['slow_strategies'], ['slow'])
+        self.assertEqual(len(batch), 3)
+
+        engine.process({'INFY': bar})
+        report = engine.latency_report()
+        self.assertEqual(report.index[0], 'slow')
+        self.assertEqual(report.loc['slow', 'over_budget'], 1)
+        self.assertEqual(report.loc['slow', 'errors'], 1)
+        self.assertAlmostEqual(report.loc['fast', 'max_ms'], 2.0)
+
+
+class TestWalkForwardOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.closes = {'INFY': daily_closes(700, seed=1), 'TCS': daily_closes(600, seed=2)}
+        self.grid = [(5, 20), (10, 50), (20, 100), (50, 20)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def optimizer(self):
+        return WalkForwardOptimizer(
+            train_bars=250, test_bars=100, workers=2, chunk_size=4, cache_dir=self.tmp.name, cost=0.001
+        )
+
+    def test_windows_roll_by_the_test_span(self):
+        self.assertEqual(self.optimizer().windows(600), [(0, 250, 350), (100, 350, 450), (200, 450, 550)])
+
+    def test_selection_matches_a_serial_run(self):
+        report = self.optimizer().run(self.closes, self.grid)
+
+        # INFY fits 4 windows, TCS 3; (50, 20) is not a valid pair
+        self.assertEqual(report.stats['tasks'], 7 * 3)
+        # Each symbol's three pairs fit one job: averages are shared across windows
+        self.assertEqual(report.stats['jobs'], 2)
+        for row in report.windows.itertuples():
+            pnl = {
+                params: strategy_returns(self.closes[row.symbol][:row.test_end], *params, cost=0.001)
+                for params in self.grid[:3]
+            }
+            train = {
+                params: performance(values[row.train_start:row.test_start - 1])['sharpe']
+                for params, values in pnl.items()
+            }
+            best = max(train, key=train.get)
+            self.assertEqual((row.short_window, row.long_window), best)
+            test = performance(pnl[best][row.test_start - 1:row.test_end - 1])
+            self.assertAlmostEqual(row.test_sharpe, float(test['sharpe']))
+            self.assertAlmostEqual(row.test_total_return, float(test['total_return']))
+
+        summary = report.summary()
+        infy = report.windows[report.windows['symbol'] == 'INFY']
+        self.assertAlmostEqual(
+            summary.loc['INFY', 'oos_return'], float(np.prod(1 + infy['test_total_return']) - 1)
+        )
+
+    def test_interrupted_run_resumes_from_cache(self):
+        first = self.optimizer().run(self.closes, self.grid)
+        path = first.stats['cache_path']
+        with open(path) as f:
+            lines = f.readlines()
+        # Keep a third of the tasks, one corrupt record and a torn final line
+        with open(path, 'w') as f:
+            f.writelines(lines[:7])
+            f.write('{"task": [0, 0, 5\n')
+            f.write(lines[7][:10])
+
+        with self.assertLogs('services.strategy_service.src.walk_forward', level='WARNING') as logs:
+            resumed = self.optimizer().run(self.closes, self.grid)
+        self.assertIn('corrupt walk-forward cache line 8', logs.output[0])
+        self.assertEqual(resumed.stats['cached'], 7)
+        self.assertEqual(resumed.stats['computed'], 14)
+        pd.testing.assert_frame_equal(resumed.windows, first.windows)
+
+        again = self.optimizer().run(self.closes, self.grid)
+        self.assertEqual(again.stats['computed'], 0)
+        with open(path) as f:
+            records = [json.loads(line) for line in f if line.endswith('\n')]
+        self.assertGreaterEqual(len(records), 21)
+
+
+if __name__ == "__main__":
+    unittest.main()